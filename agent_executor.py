@@ -0,0 +1,446 @@
+"""
+Nexus Agent - ReAct Execution Engine
+Dispatches agent tools by name and runs independent actions concurrently
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Callable, AsyncIterator, Awaitable, Set
+import asyncio
+import copy
+import inspect
+import json
+import time
+
+import agent_tools
+from budget import tool_costs
+from financial_batch import financial_data_coalescer
+from metrics import observe_step, observe_tool_call
+from react_execution_sequence import react_execution_sequence
+from risk_engine import risk_analyzer
+from text_streaming import finish_text_output, stream_text_output
+from timeseries_store import financial_store
+from trace_context import TraceManager
+
+if TYPE_CHECKING:
+    from budget import RunBudget
+    from prefetch import SpeculativePrefetcher
+
+# Tools the executor may dispatch, keyed by the name used in plan actions
+TOOL_REGISTRY: Dict[str, Callable[..., Any]] = {
+    "get_financial_data": financial_data_coalescer.get_financial_data,
+    "get_financial_data_many": financial_data_coalescer.get_financial_data_many,
+    "get_financial_history": financial_store.get_financial_history,
+    "generate_text_output": agent_tools.generate_text_output,
+    "analyze_investment_risks": risk_analyzer.analyze_investment_risks,
+}
+
+# Streaming variants, used instead of the plain tool when the caller wants deltas
+STREAMING_TOOLS: Dict[str, Callable[..., AsyncIterator[str]]] = {
+    "generate_text_output": stream_text_output,
+}
+
+# Per-tool timeouts in seconds
+TOOL_TIMEOUTS: Dict[str, float] = {
+    "get_financial_data": 10.0,
+    "get_financial_data_many": 15.0,
+    "get_financial_history": 5.0,
+    "analyze_investment_risks": 20.0,
+    "generate_text_output": 30.0,
+    "final_response": 1.0,
+}
+DEFAULT_TOOL_TIMEOUT = 15.0
+
+# Tools that synthesize earlier observations and so wait on every prior step
+SYNTHESIS_TOOLS = {"generate_text_output", "final_response"}
+
+
+def load_plan(query: str) -> List[Dict[str, Any]]:
+    """
+    Build the action plan for a query.
+
+    Until an LLM planner is wired in, every query is answered with the sample
+    ReAct sequence. A deep copy is returned so callers may mutate it freely.
+
+    Args:
+        query (str): The user's natural language query
+
+    Returns:
+        List[Dict[str, Any]]: Plan steps in react_execution_sequence format
+    """
+    return copy.deepcopy(react_execution_sequence)
+
+
+def infer_dependencies(plan: List[Dict[str, Any]]) -> Dict[int, Set[int]]:
+    """
+    Work out which plan steps must finish before each step can start.
+
+    A step may declare its prerequisites explicitly with a "depends_on" list of
+    step numbers. Otherwise data-gathering tools are treated as independent and
+    synthesis tools (see SYNTHESIS_TOOLS) depend on every earlier step.
+
+    Args:
+        plan (List[Dict[str, Any]]): Plan steps in react_execution_sequence format
+
+    Returns:
+        Dict[int, Set[int]]: Step number -> step numbers it waits on
+    """
+    numbers = {step["step"] for step in plan}
+    dependencies: Dict[int, Set[int]] = {}
+    seen: List[int] = []
+    for step in plan:
+        number = step["step"]
+        if "depends_on" in step:
+            dependencies[number] = set(step["depends_on"]) & numbers - {number}
+        elif step["action"]["tool"] in SYNTHESIS_TOOLS:
+            dependencies[number] = set(seen)
+        else:
+            dependencies[number] = set()
+        seen.append(number)
+    return dependencies
+
+
+def format_observation(step: Dict[str, Any], result: Any) -> str:
+    """Render a tool result as the observation text shown to the user"""
+    if result is None:
+        # Tool stubs return nothing yet; fall back to the planned observation,
+        # which re-bound (cached) plans do not carry
+        return step.get("observation") or f"{step['action']['tool']} returned no data"
+    if isinstance(result, str):
+        return result
+    return json.dumps(result, default=str)
+
+
+def _percent(value: float) -> str:
+    return f"{value:+.0%}"
+
+
+class RunSummary:
+    """
+    What a run found, collected from tool results as its steps finish.
+
+    Only the figures reported in final_result are kept (revenue, growth,
+    risk score and key risk per symbol, the generated text and the final
+    summary), so the executor never holds on to whole tool results.
+
+    Example:
+        >>> summary.add("get_financial_data", {"symbol": "INTC", "period": "Q2 2024"}, result)
+        >>> summary.comparison()
+        [{"symbol": "INTC", "period": "Q2 2024", "revenue": 12830000000, "growth": -0.01}]
+    """
+
+    def __init__(self):
+        self.companies: Dict[str, Dict[str, Any]] = {}
+        self.generated_content: Optional[Dict[str, Any]] = None
+        self.conclusion: Optional[str] = None
+
+    def _company(self, symbol: str) -> Dict[str, Any]:
+        symbol = symbol.upper()
+        return self.companies.setdefault(symbol, {"symbol": symbol})
+
+    def _add_financials(self, symbol: Optional[str], period: Optional[str], result: Any) -> None:
+        if not symbol:
+            return
+        company = self._company(symbol)
+        data = result.get("data") if isinstance(result, dict) else None
+        period = period or (result.get("period") if isinstance(result, dict) else None)
+        if period:
+            company["period"] = period
+        if not isinstance(data, dict):
+            return
+        if data.get("revenue") is not None:
+            company["revenue"] = data["revenue"]
+        growth = data.get("year_over_year_growth", data.get("revenue_growth"))
+        if growth is not None:
+            company["growth"] = growth
+
+    def add(self, tool: str, parameters: Dict[str, Any], result: Any) -> None:
+        """Take what final_result needs from one finished step"""
+        if tool == "get_financial_data":
+            symbol = parameters.get("symbol") or (result.get("symbol") if isinstance(result, dict) else None)
+            self._add_financials(symbol, parameters.get("period"), result)
+        elif tool == "get_financial_data_many":
+            results = result if isinstance(result, dict) else {}
+            for symbol in parameters.get("symbols", []):
+                self._add_financials(symbol, parameters.get("period"), results.get(symbol.upper()))
+        elif tool == "analyze_investment_risks" and isinstance(result, dict):
+            for symbol, score in (result.get("risk_scores") or {}).items():
+                self._company(symbol)["risk_score"] = score
+            for symbol, risks in (result.get("key_risks") or {}).items():
+                if risks:
+                    self._company(symbol)["key_risk"] = risks[0] if isinstance(risks, list) else risks
+        elif tool == "generate_text_output" and isinstance(result, dict):
+            self.generated_content = {"type": result.get("content_type"), "content": result.get("generated_text")}
+        elif tool == "final_response" and isinstance(result, dict):
+            self.conclusion = result.get("summary")
+
+    def comparison(self) -> List[Dict[str, Any]]:
+        """Per-symbol figures, in the order the run first touched each symbol"""
+        return list(self.companies.values())
+
+    def recommendation(self) -> Optional[Dict[str, Any]]:
+        """The symbol with clearly the highest revenue growth, or None if fewer than two can be compared"""
+        growth = {
+            symbol: company["growth"] for symbol, company in self.companies.items()
+            if isinstance(company.get("growth"), (int, float))
+        }
+        if len(growth) < 2:
+            return None
+        ranked = sorted(growth, key=growth.get, reverse=True)
+        best, runner_up = ranked[0], ranked[1]
+        if growth[best] == growth[runner_up]:
+            return None
+        others = ", ".join(f"{symbol} {_percent(growth[symbol])}" for symbol in ranked[1:])
+        return {
+            "symbol": best,
+            "basis": "revenue_growth",
+            "reasoning": f"Highest year-over-year revenue growth: {best} {_percent(growth[best])} vs {others}",
+        }
+
+    def risks_summary(self) -> Dict[str, str]:
+        return {symbol: company["key_risk"] for symbol, company in self.companies.items() if "key_risk" in company}
+
+
+class ReActExecutor:
+    """
+    Executes a ReAct plan, running independent actions concurrently.
+
+    Each step is started as soon as the steps it depends on have finished, so
+    wall-clock time tracks the critical path of the plan rather than the sum of
+    every step. Sync tools run in worker threads; async tools are awaited.
+    Finished steps are recorded in a compacting trace, which synthesis tools
+    receive as context_data["trace"] in place of the raw step history.
+
+    With a RunBudget, each step is checked against the run's latency and
+    cost limits before dispatch: it may run as a cheaper variant, or be
+    skipped (status "skipped"), and tool calls are cut off at the deadline.
+
+    Example:
+        >>> executor = ReActExecutor(load_plan(query))
+        >>> async for event in executor.run():
+        ...     print(event["step"], event["status"])
+    """
+
+    def __init__(
+        self,
+        plan: List[Dict[str, Any]],
+        tools: Optional[Dict[str, Callable[..., Any]]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        streaming_tools: Optional[Dict[str, Callable[..., AsyncIterator[str]]]] = None,
+        prefetcher: Optional["SpeculativePrefetcher"] = None,
+        budget: Optional["RunBudget"] = None
+    ):
+        self.plan = plan
+        self.prefetcher = prefetcher
+        self.budget = budget
+        self.tools = TOOL_REGISTRY if tools is None else tools
+        self.streaming_tools = STREAMING_TOOLS if streaming_tools is None else streaming_tools
+        self.timeouts = TOOL_TIMEOUTS if timeouts is None else timeouts
+        self.dependencies = infer_dependencies(plan)
+        self.observations: Dict[int, str] = {}
+        self.errors: Dict[int, str] = {}
+        self.skipped: Dict[int, str] = {}
+        self.summary = RunSummary()
+        self.trace = TraceManager()
+        self._dispatched: Set[int] = set()
+
+    async def _consume_stream(
+        self,
+        tool: str,
+        parameters: Dict[str, Any],
+        on_delta: Callable[[str], Awaitable[None]]
+    ) -> Any:
+        chunks: List[str] = []
+        async for chunk in self.streaming_tools[tool](**parameters):
+            chunks.append(chunk)
+            await on_delta(chunk)
+        return finish_text_output(
+            parameters.get("content_type", ""),
+            parameters.get("tone", "professional"),
+            chunks
+        )
+
+    async def call_tool(
+        self,
+        tool: str,
+        parameters: Dict[str, Any],
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Any:
+        """
+        Dispatch a single tool call by name, honouring its timeout.
+
+        When on_delta is given and the tool has a streaming variant, each
+        generated chunk is passed to on_delta as it arrives and the timeout
+        covers the whole stream. A call already started speculatively by the
+        run's prefetcher is awaited instead of being made again.
+        """
+        if tool == "final_response":
+            return parameters
+
+        func = self.tools.get(tool)
+        if func is None:
+            raise ValueError(f"Unknown tool: {tool}")
+
+        speculative = self.prefetcher.claim(tool, parameters) if self.prefetcher is not None else None
+        if speculative is not None:
+            call = speculative
+        elif on_delta is not None and tool in self.streaming_tools:
+            call = self._consume_stream(tool, parameters, on_delta)
+        elif inspect.iscoroutinefunction(func):
+            call = func(**parameters)
+        else:
+            call = asyncio.to_thread(func, **parameters)
+
+        timeout = self.timeouts.get(tool, DEFAULT_TOOL_TIMEOUT)
+        if self.budget is not None:
+            timeout = self.budget.timeout(timeout)
+
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            result = await asyncio.wait_for(call, timeout=timeout)
+            if speculative is None:
+                tool_costs.observe(tool, parameters, time.perf_counter() - started)
+            return result
+        except asyncio.TimeoutError:
+            status = "timeout"
+            raise
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            observe_tool_call(tool, status, time.perf_counter() - started)
+
+    async def _run_step(
+        self,
+        step: Dict[str, Any],
+        done: Dict[int, asyncio.Event],
+        events: "asyncio.Queue[Dict[str, Any]]"
+    ) -> None:
+        number = step["step"]
+        recorded = finished = False
+        try:
+            for dependency in self.dependencies[number]:
+                await done[dependency].wait()
+
+            action = step["action"]
+            if self.budget is not None:
+                chosen = self.budget.choose(number, action, self._pending_synthesis(number))
+                if chosen is None:
+                    self.skipped[number] = f"Skipped to stay within the {self.budget.skipped[number]}"
+                    self.trace.record(step, None, "", error=self.skipped[number], status="skipped")
+                    recorded = finished = True
+                    await events.put({"step": number, "observation": self.skipped[number], "status": "skipped"})
+                    return
+                if chosen is not action:
+                    step = {**step, "action": chosen}
+                    action = chosen
+            self._dispatched.add(number)
+
+            await events.put({
+                "step": number,
+                "thought": step.get("thought", ""),
+                "action": action,
+                "status": "in_progress"
+            })
+
+            async def forward_delta(chunk: str) -> None:
+                await events.put({"step": number, "delta": chunk, "status": "streaming"})
+
+            parameters = action.get("parameters", {})
+            if action["tool"] in SYNTHESIS_TOOLS and isinstance(parameters.get("context_data"), dict):
+                parameters = {**parameters, "context_data": {**parameters["context_data"], "trace": self.trace.render()}}
+
+            started = time.perf_counter()
+            started_ns = time.monotonic_ns()
+            try:
+                result = await self.call_tool(action["tool"], parameters, forward_delta)
+            except asyncio.TimeoutError:
+                if self.budget is not None and self.budget.deadline_reached():
+                    self.budget.exhausted = True
+                    self.errors[number] = f"{action['tool']} stopped at the latency budget"
+                else:
+                    self.errors[number] = f"{action['tool']} timed out"
+                self.trace.record(step, None, "", error=self.errors[number], started_ns=started_ns)
+            except Exception as e:
+                self.errors[number] = str(e)
+                self.trace.record(step, None, "", error=self.errors[number], started_ns=started_ns)
+            else:
+                self.observations[number] = format_observation(step, result)
+                self.trace.record(step, result, self.observations[number], started_ns=started_ns)
+                self.summary.add(action["tool"], parameters, result)
+            recorded = True
+
+            observe_step(action["tool"], "error" if number in self.errors else "completed", time.perf_counter() - started)
+            finished = True
+            if number in self.errors:
+                await events.put({"step": number, "observation": self.errors[number], "status": "error"})
+            else:
+                await events.put({"step": number, "observation": self.observations[number], "status": "completed"})
+        except Exception as e:
+            # Budget choice, observation formatting or trace bookkeeping failed:
+            # the step fails, but run() still gets its terminal event
+            if finished:
+                raise
+            self.observations.pop(number, None)
+            self.errors[number] = f"{step['action']['tool']} step failed: {e}"
+            if not recorded:
+                self.trace.record(step, None, "", error=self.errors[number])
+            await events.put({"step": number, "observation": self.errors[number], "status": "error"})
+        finally:
+            done[number].set()
+
+    def final_result(self) -> Dict[str, Any]:
+        """
+        The run's final_result, built from what its steps returned.
+
+        Returns:
+            Dict[str, Any]: comparison (per-symbol figures), recommendation,
+            generated_content, risks_summary and execution_summary
+        """
+        return {
+            "comparison": self.summary.comparison(),
+            "recommendation": self.summary.recommendation(),
+            "generated_content": self.summary.generated_content,
+            "risks_summary": self.summary.risks_summary(),
+            "execution_summary": {
+                "steps": len(self.plan),
+                "completed": len(self.observations),
+                "errors": len(self.errors),
+                "skipped": len(self.skipped),
+                "conclusion": self.summary.conclusion,
+            },
+        }
+
+    def _pending_synthesis(self, number: int) -> List[Dict[str, Any]]:
+        """Actions of synthesis steps other than number that have not been dispatched yet"""
+        return [
+            step["action"] for step in self.plan
+            if step["step"] != number and step["step"] not in self._dispatched
+            and step["step"] not in self.skipped and step["action"]["tool"] in SYNTHESIS_TOOLS
+        ]
+
+    async def run(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the plan, yielding step events as they happen.
+
+        Yields:
+            Dict[str, Any]: An "in_progress" event carrying the thought and action
+            when a step is dispatched, "streaming" events carrying a text delta
+            while a streaming tool generates, then a "completed" or "error" event
+            carrying the observation when its result arrives. A step skipped
+            to stay within the run's budget yields a single "skipped" event
+        """
+        done = {step["step"]: asyncio.Event() for step in self.plan}
+        events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        tasks = [asyncio.create_task(self._run_step(step, done, events)) for step in self.plan]
+
+        try:
+            remaining = len(self.plan)
+            while remaining:
+                event = await events.get()
+                if event["status"] in ("completed", "error", "skipped"):
+                    remaining -= 1
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
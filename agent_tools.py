@@ -60,6 +60,88 @@ def get_financial_data(
     pass
 
 
+# Tool 1b: Batched Financial Data Retrieval
+def get_financial_data_many(
+    symbols: List[str],
+    data_type: str = "quarterly_financials",
+    period: Optional[str] = None,
+    metrics: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Retrieves financial data for many stock symbols in a single provider call.
+    
+    Bulk counterpart of get_financial_data for screens and comparisons that
+    cover many tickers. One request is made per data type, instead of one
+    round trip per symbol.
+    
+    Args:
+        symbols (List[str]): Stock ticker symbols (e.g., ["NVDA", "AMD"])
+        data_type (str): Type of data to retrieve, as for get_financial_data
+        period (Optional[str]): Specific time period (e.g., "Q3 2024", "2023")
+        metrics (Optional[List[str]]): Specific metrics to retrieve
+    
+    Returns:
+        Dict[str, Dict[str, Any]]: Mapping of symbol to the same structure
+        returned by get_financial_data
+    
+    Example:
+        >>> get_financial_data_many(["NVDA", "AMD"], "quarterly_financials", "Q3 2024", ["revenue"])
+        {
+            "NVDA": {"symbol": "NVDA", "data": {"revenue": 35082000000, ...}, ...},
+            "AMD": {"symbol": "AMD", "data": {"revenue": 6819000000, ...}, ...}
+        }
+    """
+    # Tool implementation would use the provider's bulk quote/fundamentals
+    # endpoints (e.g. batch requests supported by most market data APIs)
+    pass
+
+
+# Tool 1c: Historical Financial Series
+def get_financial_history(
+    symbols: List[str],
+    metric: str,
+    data_type: str = "quarterly_financials",
+    last: int = 12,
+    end: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Retrieves the history of one metric for many symbols over consecutive periods.
+    
+    Served from the local columnar store (see timeseries_store.py), which is
+    filled as closed-period financials are fetched, so multi-year lookbacks
+    need no provider calls.
+    
+    Args:
+        symbols (List[str]): Stock ticker symbols (e.g., ["NVDA", "AMD"])
+        metric (str): Metric to retrieve (e.g., "revenue", "gross_margin")
+        data_type (str): "quarterly_financials", "annual_financials" or "key_metrics"
+        last (int): Number of periods to return
+        end (Optional[str]): Last period of the range (e.g., "Q3 2024"),
+            defaults to the most recent stored period
+    
+    Returns:
+        Dict[str, Any]: History including:
+            - data_type: Type of data retrieved
+            - metric: Metric name
+            - periods: Period labels, oldest first
+            - data: Mapping of symbol to values aligned with periods (None if missing)
+            - last_updated: When the store was last written
+            - source: Data provider information
+    
+    Example:
+        >>> get_financial_history(["NVDA", "AMD"], "revenue", last=4, end="Q3 2024")
+        {
+            "data_type": "quarterly_financials",
+            "metric": "revenue",
+            "periods": ["Q4 2023", "Q1 2024", "Q2 2024", "Q3 2024"],
+            "data": {"NVDA": [22103000000, 26044000000, 30040000000, 35082000000], "AMD": [...]},
+            "source": "local_timeseries_store"
+        }
+    """
+    # Tool implementation is timeseries_store.financial_store.get_financial_history
+    pass
+
+
 # Tool 2: Text Generation/Email Drafting
 def generate_text_output(
     content_type: str,
@@ -160,6 +242,9 @@ def analyze_investment_risks(
             "analysis_date": "2024-10-26T17:53:54Z"
         }
     """
-    # Tool implementation would integrate with news APIs (NewsAPI, Bloomberg),
-    # sentiment analysis services, and risk modeling algorithms
+    # Implemented by risk_engine.RiskAnalyzer, which scores the whole symbol
+    # list at once with risk_engine.score_risks; the executor's tool registry
+    # points there. Sentiment is read from the pre-aggregated sentiment_index,
+    # kept current by the background news ingest, and a price feed plugs in
+    # as its returns provider.
     pass
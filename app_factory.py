@@ -0,0 +1,215 @@
+"""
+Nexus Agent - App Factory and Startup Profiling
+Builds the FastAPI app with an import-time breakdown, and prewarms pools in the background
+"""
+
+from typing import Dict, List, Optional, Any, Awaitable, Callable
+import asyncio
+import builtins
+import importlib
+import importlib.util
+import inspect
+import os
+import sys
+import threading
+import time
+
+# Modules deferred to first use; the warmup imports them in a worker thread
+DEFERRED_MODULES = ("numpy", "httpx")
+
+# Modules listed by the diagnostics endpoint, slowest first
+MAX_REPORTED_MODULES = 40
+
+
+def process_age() -> Optional[float]:
+    """Seconds since this process was started, from /proc where available"""
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name (field 2) may contain spaces; fields after it are fixed
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ImportProfiler:
+    """
+    Records how long each module takes to import, like python -X importtime.
+
+    While installed, builtins.__import__ is wrapped; every import statement
+    that actually loads a module is timed. cumulative includes the modules
+    it imports in turn, self excludes them. Imports already in sys.modules
+    pass straight through, and only the installing thread is timed.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self._original: Optional[Callable[..., Any]] = None
+        self._thread: Optional[int] = None
+        self._children: List[float] = []
+
+    def install(self) -> None:
+        if self._original is not None:
+            return
+        self._original = builtins.__import__
+        self._thread = threading.get_ident()
+        builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name: str, globals: Optional[Dict[str, Any]] = None, locals: Any = None, fromlist: Any = (), level: int = 0) -> Any:
+        original = self._original or importlib.__import__
+        module = name
+        if level and globals:
+            try:
+                module = importlib.util.resolve_name("." * level + name, globals.get("__package__") or "")
+            except (ImportError, ValueError):
+                pass
+        if module in sys.modules or threading.get_ident() != self._thread:
+            return original(name, globals, locals, fromlist, level)
+
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            self.timings.setdefault(module, {
+                "cumulative_ms": round(elapsed * 1e3, 3),
+                "self_ms": round((elapsed - children) * 1e3, 3),
+            })
+
+    def top(self, count: int = MAX_REPORTED_MODULES) -> List[Dict[str, Any]]:
+        """Slowest imports by cumulative time"""
+        ranked = sorted(self.timings.items(), key=lambda item: item[1]["cumulative_ms"], reverse=True)
+        return [{"module": module, **timing} for module, timing in ranked[:count]]
+
+
+class StartupProfile:
+    """
+    Where a worker's cold start went.
+
+    Phases are wall-clock spans in milliseconds: process start (interpreter
+    and server) up to create_app(), then importing main, which builds the
+    app. Per-module import times come from ImportProfiler. Warmup tasks run
+    after the app starts serving and are reported separately, with their
+    duration and outcome.
+    """
+
+    def __init__(self):
+        self.imports = ImportProfiler()
+        self.entrypoint = "module"
+        self.phases: Dict[str, float] = {}
+        self.warmup: Dict[str, Dict[str, Any]] = {}
+        self._started: Optional[float] = None
+
+    def begin(self) -> None:
+        self.entrypoint = "factory"
+        age = process_age()
+        if age is not None:
+            self.phases["process_start_ms"] = round(age * 1e3, 1)
+        self._started = time.perf_counter()
+        self.imports.install()
+
+    def mark(self, phase: str) -> None:
+        """Close the phase that ended now"""
+        now = time.perf_counter()
+        if self._started is not None:
+            self.phases[f"{phase}_ms"] = round((now - self._started) * 1e3, 1)
+        self._started = now
+
+    def end(self) -> None:
+        self.imports.uninstall()
+        self.phases["total_ms"] = round(sum(ms for name, ms in self.phases.items() if name != "total_ms"), 1)
+
+    async def run_warmup(self, name: str, task: Callable[[], Awaitable[Any]]) -> None:
+        start = time.perf_counter()
+        try:
+            detail = await task()
+            outcome: Dict[str, Any] = {"status": "skipped" if detail is False else "ok"}
+        except Exception as exc:
+            outcome = {"status": "error", "error": str(exc)}
+        outcome["ms"] = round((time.perf_counter() - start) * 1e3, 1)
+        self.warmup[name] = outcome
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "entrypoint": self.entrypoint,
+            "phases": self.phases,
+            "imports": self.imports.top(),
+            "deferred_modules": {name: name in sys.modules for name in DEFERRED_MODULES},
+            "warmup": self.warmup,
+        }
+
+
+startup_profile = StartupProfile()
+
+
+async def _import_deferred() -> None:
+    for name in DEFERRED_MODULES:
+        if importlib.util.find_spec(name) is not None:
+            await asyncio.to_thread(importlib.import_module, name)
+
+
+async def _ping(client: Any) -> Any:
+    """Import a lazy Redis client's library off the loop, then open its first connection"""
+    if client is None:
+        return False
+    module = getattr(client, "module", None)
+    if module is not None:
+        await asyncio.to_thread(importlib.import_module, module)
+    # A sync client connects in the worker thread; an async one returns an awaitable
+    result = await asyncio.to_thread(client.ping)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def warm_up() -> None:
+    """
+    Prewarm what the first requests would otherwise pay for.
+
+    Runs as a background task once the app is serving: imports the deferred
+    modules, creates the upstream connection pool and opens the first
+    connection to every configured Redis client. Failures are recorded in
+    the startup profile and otherwise ignored; the same work happens lazily
+    on first use.
+    """
+    from financial_cache import financial_data_cache
+    from http_client import upstream
+    from session_store import session_store
+    from work_queue import work_queue
+
+    await startup_profile.run_warmup("modules", _import_deferred)
+    await startup_profile.run_warmup("upstream_pool", upstream.start)
+    await asyncio.gather(
+        startup_profile.run_warmup("redis_sessions", lambda: _ping(getattr(session_store, "redis", None))),
+        startup_profile.run_warmup("redis_cache", lambda: _ping(financial_data_cache.redis)),
+        startup_profile.run_warmup("redis_work_queue", lambda: _ping(getattr(work_queue, "redis", None))),
+    )
+
+
+def create_app():
+    """
+    Build the app, recording where cold start time goes.
+
+    Serve with:
+        uvicorn app_factory:create_app --factory
+
+    The breakdown is served at /api/diagnostics/startup.
+    """
+    startup_profile.begin()
+    try:
+        main = importlib.import_module("main")
+        startup_profile.mark("import")
+    finally:
+        startup_profile.end()
+    return main.app
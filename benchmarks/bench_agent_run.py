@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Benchmark - /api/agent/run throughput, latency and memory with mocked tools
+Replays a query corpus in streaming and non-streaming modes and saves a JSON baseline
+
+Usage:
+    python benchmarks/bench_agent_run.py --requests 500 --concurrency 32
+    python benchmarks/bench_agent_run.py --latency get_financial_data=lognormal:0.2,0.5 --save baselines/slow_data.json
+    python benchmarks/bench_agent_run.py --compare benchmarks/baselines/agent_run.json
+
+Latency distributions (seconds):
+    fixed:S             always S
+    uniform:LO,HI       uniform between LO and HI
+    lognormal:MED,SIG   log-normal with median MED and shape SIG
+    exp:MEAN            exponential with mean MEAN
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import httpx
+import uvicorn
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import agent_executor
+import main
+
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmarks", "queries.jsonl")
+DEFAULT_QUERY = (
+    "Compare the Q3 2024 revenue growth of NVIDIA and AMD, and then draft a summary email "
+    "to my manager about which stock is a better buy right now, citing a key risk for each."
+)
+DEFAULT_LATENCIES = {
+    "get_financial_data": "lognormal:0.08,0.5",
+    "get_financial_data_many": "lognormal:0.12,0.5",
+    "get_financial_history": "fixed:0.002",
+    "analyze_investment_risks": "lognormal:0.15,0.4",
+    "generate_text_output": "lognormal:0.6,0.3",
+}
+STREAM_CHUNKS = 20
+# Relative change in a metric beyond which --compare reports a regression
+DEFAULT_TOLERANCE = 0.10
+# Latency changes smaller than this are treated as noise whatever their relative size
+MIN_LATENCY_CHANGE_MS = 5.0
+
+
+def parse_distribution(spec):
+    """Turn "lognormal:0.08,0.5" into a zero-argument sampler"""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+    samplers = {
+        "fixed": lambda: values[0],
+        "uniform": lambda: random.uniform(values[0], values[1]),
+        "lognormal": lambda: random.lognormvariate(0, values[1]) * values[0],
+        "exp": lambda: random.expovariate(1 / values[0]),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution: {spec!r}")
+    return samplers[kind]
+
+
+def load_corpus(path, limit=None):
+    """Queries to replay: the query (or title) of each JSONL line, or a built-in query"""
+    queries = []
+    if path and os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    queries.append(record.get("query") or record.get("title") or DEFAULT_QUERY)
+    return (queries or [DEFAULT_QUERY])[:limit]
+
+
+def install_mock_tools(latencies):
+    """Replace every tool in the executor's registries with a sleep of sampled latency"""
+    samplers = {tool: parse_distribution(spec) for tool, spec in latencies.items()}
+
+    def mock(tool):
+        async def call(**parameters):
+            await asyncio.sleep(samplers[tool]())
+            return None  # the executor falls back to the plan's observation
+        return call
+
+    def mock_stream(tool):
+        async def stream(**parameters):
+            per_chunk = samplers[tool]() / STREAM_CHUNKS
+            for i in range(STREAM_CHUNKS):
+                await asyncio.sleep(per_chunk)
+                yield f"token{i} "
+        return stream
+
+    for tool in list(agent_executor.TOOL_REGISTRY):
+        samplers.setdefault(tool, parse_distribution("fixed:0.01"))
+        agent_executor.TOOL_REGISTRY[tool] = mock(tool)
+    for tool in list(agent_executor.STREAMING_TOOLS):
+        agent_executor.STREAMING_TOOLS[tool] = mock_stream(tool)
+
+
+def disable_response_cache():
+    """Make every request run the agent rather than replay a cached run"""
+    main.response_cache.clear()
+    main.response_cache.enabled = False
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def one_request(client, query, streaming, user):
+    payload = {"query": query, "user_id": f"user-{user}", "streaming": streaming}
+    start = time.perf_counter()
+    first_event = None
+    if streaming:
+        async with client.stream("POST", "/api/agent/run", json=payload) as response:
+            if response.status_code != 200:
+                return response.status_code, None, None
+            async for chunk in response.aiter_raw():
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                if b'"type":"execution_complete"' in chunk or b'"type":"error"' in chunk:
+                    break
+    else:
+        response = await client.post("/api/agent/run", json=payload)
+        if response.status_code != 200:
+            return response.status_code, None, None
+    return 200, time.perf_counter() - start, first_event
+
+
+async def run_phase(base_url, queries, requests, concurrency, streaming, track_memory=False):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300.0, limits=limits) as client:
+        gate = asyncio.Semaphore(concurrency)
+
+        async def bounded(i):
+            async with gate:
+                return await one_request(client, queries[i % len(queries)], streaming, i % 50)
+
+        if track_memory:
+            tracemalloc.start()
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(bounded(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+        if track_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    latencies = [latency for status, latency, _ in outcomes if status == 200]
+    first_events = [first for status, _, first in outcomes if status == 200 and first is not None]
+    result = {
+        "requests": requests,
+        "completed": len(latencies),
+        "rejected": sum(1 for status, _, _ in outcomes if status == 429),
+        "failed": sum(1 for status, _, _ in outcomes if status not in (200, 429)),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_p50_ms": _ms(percentile(latencies, 0.50)),
+        "latency_p95_ms": _ms(percentile(latencies, 0.95)),
+        "latency_p99_ms": _ms(percentile(latencies, 0.99)),
+        "ttfe_p50_ms": _ms(percentile(first_events, 0.50)),
+        "ttfe_p95_ms": _ms(percentile(first_events, 0.95)),
+        "ttfe_p99_ms": _ms(percentile(first_events, 0.99)),
+    }
+    if track_memory:
+        # Peak in-flight allocations (client and server share this process)
+        result["memory_per_session_kb"] = (peak - baseline) / min(concurrency, requests) / 1024
+    return result
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1e3, 2)
+
+
+async def run_benchmark(args, queries):
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=args.port, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = {}
+    try:
+        for mode in args.modes:
+            streaming = mode == "streaming"
+            # Warm-up: plan cache, connection pools, first-call imports
+            await run_phase(base_url, queries, min(20, args.requests), args.concurrency, streaming)
+            # Answers cached by one phase must not be replayed in the next
+            main.response_cache.clear()
+            phase = await run_phase(base_url, queries, args.requests, args.concurrency, streaming)
+            main.response_cache.clear()
+            memory = await run_phase(
+                base_url, queries, args.concurrency, args.concurrency, streaming, track_memory=True
+            )
+            main.response_cache.clear()
+            phase["memory_per_session_kb"] = round(memory["memory_per_session_kb"], 1)
+            results[mode] = phase
+    finally:
+        server.should_exit = True
+        await serving
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, current, tolerance):
+    """Print relative changes against a baseline; True if any metric regressed beyond tolerance"""
+    regressed = False
+    higher_is_better = {"throughput_rps"}
+    for mode, metrics in current["results"].items():
+        previous = baseline["results"].get(mode, {})
+        for name, value in metrics.items():
+            before = previous.get(name)
+            if not isinstance(value, (int, float)) or not before or name in ("requests", "completed"):
+                continue
+            change = (value - before) / before
+            worse = -change if name in higher_is_better else change
+            noise = name.endswith("_ms") and abs(value - before) < MIN_LATENCY_CHANGE_MS
+            flag = "REGRESSION" if worse > tolerance and not noise else ""
+            regressed = regressed or bool(flag)
+            print(f"  {mode:<13} {name:<24} {before:>10.2f} -> {value:>10.2f}  {change:+7.1%}  {flag}")
+    return regressed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL file of queries (query or title field)")
+    parser.add_argument("--corpus-limit", type=int, default=None)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--modes", nargs="+", default=["streaming", "non_streaming"],
+                        choices=["streaming", "non_streaming"])
+    parser.add_argument("--latency", action="append", default=[], metavar="TOOL=DIST",
+                        help="Override a tool's latency distribution, e.g. get_financial_data=fixed:0.05")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Keep the semantic response cache on (repeated corpus queries then replay cached runs)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8920)
+    parser.add_argument("--save", help="Write results to this JSON baseline file")
+    parser.add_argument("--compare", help="Baseline JSON to diff against; exits 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    latencies = dict(DEFAULT_LATENCIES)
+    for override in args.latency:
+        tool, _, spec = override.partition("=")
+        latencies[tool] = spec
+    random.seed(args.seed)
+    install_mock_tools(latencies)
+    if not args.response_cache:
+        disable_response_cache()
+    queries = load_corpus(args.corpus, args.corpus_limit)
+
+    results = asyncio.run(run_benchmark(args, queries))
+    report = {
+        "benchmark": "agent_run",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "corpus_queries": len(queries),
+            "latencies": latencies,
+            "seed": args.seed,
+            "response_cache": args.response_cache,
+            "max_concurrent_runs": main.agent_scheduler.max_concurrent,
+        },
+        "results": results,
+    }
+
+    for mode, metrics in results.items():
+        print(f"{mode}:")
+        for name, value in metrics.items():
+            print(f"  {name:<24} {value}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"against {args.compare} ({baseline.get('git_revision')}):")
+        if compare(baseline, report, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark - one client per call vs the shared pooled upstream client
+Also checks that retries and the circuit breaker behave against a flaky host
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import CircuitOpenError, UpstreamClient
+
+PORT = 8903
+CALLS = 500
+CONCURRENCY = 20
+BODY = b'{"symbol":"NVDA","price":135.2}'
+
+
+async def handle(reader, writer):
+    # Minimal keep-alive HTTP/1.1 server; /flaky answers 503 to every request
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            path = head.split(b" ", 2)[1]
+            status = b"503 Service Unavailable" if path.startswith(b"/flaky") else b"200 OK"
+            writer.write(
+                b"HTTP/1.1 " + status + b"\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: %d\r\n\r\n" % len(BODY) + BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run(fetch):
+    limit = asyncio.Semaphore(CONCURRENCY)
+
+    async def one():
+        async with limit:
+            await fetch()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(CALLS)))
+    return time.perf_counter() - start
+
+
+async def main():
+    url = f"http://127.0.0.1:{PORT}/quote"
+    server = await asyncio.start_server(handle, "127.0.0.1", PORT)
+    async with server:
+        async def fresh_client():
+            async with httpx.AsyncClient() as client:
+                (await client.get(url)).raise_for_status()
+
+        pooled = UpstreamClient()
+
+        async def pooled_client():
+            (await pooled.request("GET", url)).raise_for_status()
+
+        fresh = await run(fresh_client)
+        shared = await run(pooled_client)
+
+        flaky = UpstreamClient(retry_attempts=2)
+        for _ in range(10):
+            try:
+                await flaky.request("GET", f"http://127.0.0.1:{PORT}/flaky", provider="flaky")
+            except CircuitOpenError:
+                pass
+        await pooled.close()
+        await flaky.close()
+
+    print(f"{CALLS} GETs, concurrency {CONCURRENCY} (plain HTTP; TLS handshakes widen the gap)")
+    print(f"client per call: {fresh * 1e3:8.1f} ms  ({CALLS / fresh:8.0f} req/s)")
+    print(f"pooled client:   {shared * 1e3:8.1f} ms  ({CALLS / shared:8.0f} req/s)")
+    print(f"speedup:         {fresh / shared:8.2f}x")
+    print(f"flaky host:      {flaky.snapshot()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark - white-label icon sets rendered per second
+Per-line ImageDraw gradients rendered sequentially vs NumPy gradients across a process pool
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location("create_icons", os.path.join(ROOT, "icons", "create-icons.py"))
+create_icons = importlib.util.module_from_spec(spec)
+sys.modules["create_icons"] = create_icons  # so pool workers can unpickle its functions
+spec.loader.exec_module(create_icons)
+
+THEMES = 48
+SIZES = [16, 32, 48, 128, 256, 512]
+
+
+def themes():
+    return [
+        {"name": f"brand-{i:02d}", "top": [(37 * i) % 256, (91 * i) % 256, 200], "bottom": [120, (53 * i) % 256, 90],
+         "glyph": chr(ord("A") + i % 26), "sizes": SIZES}
+        for i in range(THEMES)
+    ]
+
+
+def render_per_line(size, filename, top, bottom, glyph):
+    # The gradient as drawn before: one ImageDraw.line per row
+    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for y in range(size):
+        color = tuple(int(t + (b - t) * y / size) for t, b in zip(top, bottom)) + (255,)
+        draw.line([(0, y), (size, y)], fill=color)
+    font = create_icons.load_font(size // 2)
+    bbox = draw.textbbox((0, 0), glyph, font=font)
+    draw.text(((size - bbox[2] + bbox[0]) // 2, (size - bbox[3] + bbox[1]) // 2), glyph, fill=(255, 255, 255, 255), font=font)
+    img.save(filename, "PNG")
+
+
+def run(label, render, count):
+    start = time.perf_counter()
+    render()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed:>7.2f} s {count / elapsed:>9.0f} icons/s")
+    return elapsed
+
+
+def main():
+    out = tempfile.mkdtemp(prefix="icons-")
+    try:
+        jobs = create_icons.plan_jobs(themes(), out)
+        for directory in {os.path.dirname(job[1]) for job in jobs}:
+            os.makedirs(directory, exist_ok=True)
+        count = len(jobs)
+        workers = os.cpu_count() or 1
+        print(f"{THEMES} themes x {len(SIZES)} sizes = {count} icons, {workers} CPUs")
+
+        run("per-line gradient, sequential", lambda: [render_per_line(*job[:5]) for job in jobs], count)
+        run("numpy gradient, sequential", lambda: create_icons.create_icon_batch(themes(), out, workers=1, force=True), count)
+        if workers > 1:
+            run(f"numpy gradient, {workers} processes", lambda: create_icons.create_icon_batch(themes(), out, workers=workers, force=True), count)
+        run("unchanged inputs, skipped", lambda: create_icons.create_icon_batch(themes(), out, workers=workers), count)
+    finally:
+        shutil.rmtree(out)
+
+
+if __name__ == "__main__":
+    main()
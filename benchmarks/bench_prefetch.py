@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark - sequential ReAct run with LLM reasoning turns, with and without speculative prefetch
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_executor import TOOL_REGISTRY, ReActExecutor
+from financial_batch import FinancialDataCoalescer
+from financial_cache import FinancialDataCache
+from prefetch import PrefetchStats, SpeculativePrefetcher
+
+QUERY = "Compare the Q3 2024 revenue growth of NVIDIA and AMD and recommend one"
+REASONING_SECONDS = 0.5
+FETCH_SECONDS = 0.3
+
+
+def slow_fetch(symbol, data_type="quarterly_financials", period=None, metrics=None):
+    time.sleep(FETCH_SECONDS)
+    return {"symbol": symbol, "data_type": data_type, "period": period,
+            "data": {"revenue": 1.0, "revenue_growth": 0.5, "gross_margin": 0.6}}
+
+
+async def reason(**parameters):
+    await asyncio.sleep(REASONING_SECONDS)
+    return "decided next action"
+
+
+def plan():
+    # Each action is chosen by a reasoning turn that follows the previous step
+    steps = []
+    for symbol in ("NVDA", "AMD"):
+        steps.append({"action": {"tool": "reason", "parameters": {}}})
+        steps.append({"action": {"tool": "get_financial_data", "parameters": {
+            "symbol": symbol, "data_type": "quarterly_financials", "period": "Q3 2024",
+            "metrics": ["revenue", "revenue_growth"]}}})
+    steps.append({"action": {"tool": "reason", "parameters": {}}})
+    for number, step in enumerate(steps, 1):
+        step["step"] = number
+        step["depends_on"] = [number - 1] if number > 1 else []
+    return steps
+
+
+async def run(prefetch):
+    coalescer = FinancialDataCoalescer(cache=FinancialDataCache(fetch=slow_fetch), fetch_many=lambda *a: None, store=None)
+    tools = {**TOOL_REGISTRY, "reason": reason, "get_financial_data": coalescer.get_financial_data}
+    stats = PrefetchStats()
+    start = time.perf_counter()
+    prefetcher = SpeculativePrefetcher(QUERY, tools=tools, stats=stats) if prefetch else None
+    executor = ReActExecutor(plan(), tools=tools, prefetcher=prefetcher)
+    async for _ in executor.run():
+        pass
+    if prefetcher is not None:
+        prefetcher.close()
+    return time.perf_counter() - start, stats.snapshot()
+
+
+async def main():
+    baseline, _ = await run(prefetch=False)
+    speculative, stats = await run(prefetch=True)
+    print(f"3 reasoning turns of {REASONING_SECONDS * 1e3:.0f} ms, 2 fetches of {FETCH_SECONDS * 1e3:.0f} ms")
+    print(f"without prefetch: {baseline * 1e3:8.1f} ms")
+    print(f"with prefetch:    {speculative * 1e3:8.1f} ms")
+    print(f"prefetch stats:   {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark - risk_engine.score_risks scaling from 2 to 5,000 symbols
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_engine import TIMEFRAME_DAYS, score_risks
+
+UNIVERSE_SIZES = [2, 10, 100, 500, 1000, 2500, 5000]
+REPEATS = 5
+
+
+def make_universe(n_symbols, n_days, rng):
+    symbols = [f"SYM{i:05d}" for i in range(n_symbols)]
+    market = rng.normal(0, 0.01, n_days)
+    returns = 0.6 * market + rng.normal(0, 0.015, (n_symbols, n_days))
+    sentiment = rng.uniform(0, 1, n_symbols)
+    return symbols, returns, sentiment
+
+
+def bench(n_symbols, timeframe, rng):
+    symbols, returns, sentiment = make_universe(n_symbols, TIMEFRAME_DAYS["1_year"], rng)
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        score_risks(symbols, returns, timeframe, sentiment=sentiment)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    print(f"{'symbols':>8} {'timeframe':>10} {'best ms':>10} {'us/symbol':>10}")
+    for timeframe in ("3_months", "1_year"):
+        for n_symbols in UNIVERSE_SIZES:
+            best = bench(n_symbols, timeframe, rng)
+            print(f"{n_symbols:>8} {timeframe:>10} {best * 1e3:>10.2f} {best * 1e6 / n_symbols:>10.1f}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark - per-request sentiment for a timeframe
+Re-scoring every article in the window vs a lookup in the pre-aggregated SentimentIndex
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentiment_index import WINDOW_DAYS, SentimentIndex, score_text
+
+SYMBOLS = ["NVDA", "AMD", "INTC", "TSM", "AVGO", "QCOM", "MU", "ARM"]
+ARTICLES_PER_DAY = 6
+REQUESTS = 200
+TODAY = date(2024, 10, 26)
+
+HEADLINES = [
+    "{} beats estimates on record data center growth",
+    "{} shares plunge after weak guidance",
+    "Analysts upgrade {} on strong AI demand",
+    "{} faces probe over export restrictions",
+    "{} holds annual developer conference",
+]
+
+
+def news_archive():
+    random.seed(7)
+    archive = []
+    for days_ago in range(max(WINDOW_DAYS.values())):
+        published = (TODAY - timedelta(days=days_ago)).isoformat() + "T14:00:00Z"
+        for _ in range(ARTICLES_PER_DAY):
+            symbol = random.choice(SYMBOLS)
+            archive.append({"symbol": symbol, "published": published,
+                            "headline": random.choice(HEADLINES).format(symbol)})
+    return archive
+
+
+def rescore(archive, symbols, timeframe):
+    # What each request did before: filter the window's articles and score every one
+    cutoff = TODAY - timedelta(days=WINDOW_DAYS[timeframe])
+    scores = {symbol: [] for symbol in symbols}
+    for article in archive:
+        if article["symbol"] in scores and date.fromisoformat(article["published"][:10]) > cutoff:
+            scores[article["symbol"]].append(score_text(article["headline"]))
+    return [(sum(values) / len(values) + 1) / 2 if values else 0.5 for values in scores.values()]
+
+
+def main():
+    archive = news_archive()
+    index = SentimentIndex()
+    start = time.perf_counter()
+    index.add_many(archive, TODAY)
+    ingest = time.perf_counter() - start
+    print(f"{len(archive)} articles across {len(SYMBOLS)} symbols, ingested once in {ingest * 1e3:.0f} ms "
+          f"({ingest / len(archive) * 1e6:.1f} us/article)")
+    print(f"{'timeframe':<10} {'articles':>9} {'re-score':>11} {'lookup':>9} {'speedup':>8}")
+    for timeframe in WINDOW_DAYS:
+        symbols = ["NVDA", "AMD"]
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            expected = rescore(archive, symbols, timeframe)
+        rescored = (time.perf_counter() - start) / REQUESTS
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            summaries = index.lookup(symbols, timeframe, TODAY)
+        looked_up = (time.perf_counter() - start) / REQUESTS
+        assert all(abs(summaries[symbol]["sentiment"] - value) < 1e-3 for symbol, value in zip(symbols, expected))
+        articles = sum(summaries[symbol]["articles"] for symbol in symbols)
+        print(f"{timeframe:<10} {articles:>9} {rescored * 1e3:>8.2f} ms {looked_up * 1e6:>6.1f} us "
+              f"{rescored / looked_up:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark - memory a finished agent session leaves behind, end to end
+Runs real sessions through main's streaming and non-streaming paths and splits what stays resident by owner
+
+Tools are replaced by instant stand-ins returning realistically sized
+results (risk analysis runs for real), so the session log, response cache
+and everything else a run keeps can be measured without network calls.
+
+Usage:
+    python benchmarks/bench_session_memory.py --sessions 2000
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent_executor
+import main
+
+EMAIL_WORDS = 250
+DEFAULT_QUERY = (
+    "Compare the Q3 2024 revenue growth of NVIDIA and AMD, and then draft a summary email "
+    "to my manager about which stock is a better buy right now, citing a key risk for each."
+)
+
+
+async def financial_data(symbol, data_type="quarterly_financials", period=None, metrics=None, **_):
+    data = {"revenue": 35.08e9, "revenue_growth": 0.17, "year_over_year_growth": 0.94, "eps": 0.81,
+            "gross_margin": 0.75, "operating_income": 21.87e9, "currency": "USD"}
+    if metrics is not None:
+        data = {k: v for k, v in data.items() if k in metrics or k == "currency"}
+    return {"symbol": symbol, "data_type": data_type, "period": period, "data": data}
+
+
+async def email_stream(**_):
+    for i in range(EMAIL_WORDS):
+        yield f"word{i} "
+
+
+async def email(**_):
+    return " ".join(f"word{i}" for i in range(EMAIL_WORDS))
+
+
+def install_tools():
+    agent_executor.TOOL_REGISTRY["get_financial_data"] = financial_data
+    agent_executor.TOOL_REGISTRY["generate_text_output"] = email
+    agent_executor.STREAMING_TOOLS["generate_text_output"] = email_stream
+
+
+async def run_streaming(sessions):
+    for session in range(sessions):
+        session_id = str(uuid.uuid4())
+        req = main.AgentQueryRequest(query=DEFAULT_QUERY, user_id=f"user-{session}", streaming=True)
+        await main.session_store.create(session_id, req.query, req.user_id)
+        await main.execute_agent_session(session_id, req)
+
+
+async def run_sync(sessions):
+    for session in range(sessions):
+        req = main.AgentQueryRequest(query=DEFAULT_QUERY, user_id=f"user-{session}", streaming=False)
+        response = await main.execute_agent_workflow(str(uuid.uuid4()), req)
+        main.response_cache.store(req.query, req.user_id, req.preferences, response=response.model_dump(mode="json"))
+
+
+def held():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def measure(name, run, sessions):
+    # Warm up imports, interned strings and regex caches outside the measurement
+    asyncio.run(run(10))
+    main.session_store._sessions.clear()
+    main.response_cache.clear()
+    gc.collect()
+    tracemalloc.start()
+    before = held()
+    asyncio.run(run(sessions))
+    total = held() - before
+    main.response_cache.clear()
+    without_cache = held() - before
+    main.session_store._sessions.clear()
+    rest = held() - before
+    tracemalloc.stop()
+
+    print(f"{name}: {sessions} sessions")
+    # Objects the log and the cache share are counted against the log
+    for owner, size in (("response cache", total - without_cache),
+                        ("session event log", without_cache - rest),
+                        ("everything else", rest),
+                        ("total", total)):
+        print(f"  {owner:<20} {size / sessions / 1024:>8.1f} KB/session")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    args = parser.parse_args()
+
+    install_tools()
+    main.response_cache.max_bytes = 1 << 40
+    main.session_store.max_sessions = args.sessions
+    measure("streaming", run_streaming, args.sessions)
+    measure("non-streaming", run_sync, args.sessions)
+
+
+if __name__ == "__main__":
+    main_cli()
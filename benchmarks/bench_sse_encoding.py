@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark - SSE events per second per core for a 1,000-step run
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sse
+from session_store import InMemorySessionStore
+from sse import encode_batch, encode_frame, now_iso
+
+STEPS = 1000
+REPEATS = 5
+
+
+def make_step_events():
+    events = []
+    for step in range(1, STEPS + 1):
+        events.append({
+            "step": step,
+            "thought": "I need to gather Q3 2024 financial data for NVIDIA first to compare revenue growth.",
+            "action": {"tool": "get_financial_data", "parameters": {"symbol": "NVDA", "period": "Q3 2024"}},
+            "status": "in_progress"
+        })
+        events.append({
+            "step": step,
+            "observation": "Retrieved NVIDIA Q3 2024: Revenue $35.08B, +94% YoY growth",
+            "status": "completed"
+        })
+    return events
+
+
+def legacy(step_events):
+    # The original path: str frames built per event, encoded to bytes by the server
+    for step_data in step_events:
+        frame = f"data: {json.dumps({'type': 'step_update', **step_data, 'timestamp': datetime.now().isoformat()})}\n\n"
+        frame.encode()
+
+
+def per_event(step_events):
+    for event_id, step_data in enumerate(step_events, 1):
+        encode_frame(event_id, {"type": "step_update", **step_data, "timestamp": now_iso()})
+
+
+def batched(step_events):
+    logged = [
+        (event_id, {"type": "step_update", **step_data, "timestamp": now_iso()})
+        for event_id, step_data in enumerate(step_events, 1)
+    ]
+    for _ in encode_batch(logged):
+        pass
+
+
+async def end_to_end(step_events):
+    # Producer appends to the session log while a reader streams it, as in main.py
+    store = InMemorySessionStore()
+    await store.create("bench", "query")
+
+    async def produce():
+        for step_data in step_events:
+            await store.append("bench", {"type": "step_update", **step_data, "timestamp": now_iso()})
+            await asyncio.sleep(0)
+        await store.append("bench", {"type": "execution_complete"})
+
+    async def consume():
+        chunks = 0
+        async for events in store.tail_batches("bench"):
+            for _ in encode_batch(events):
+                chunks += 1
+        return chunks
+
+    _, chunks = await asyncio.gather(produce(), consume())
+    return chunks
+
+
+def best_rate(fn, step_events):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(step_events)
+        best = min(best, time.perf_counter() - start)
+    return len(step_events) / best
+
+
+if __name__ == "__main__":
+    step_events = make_step_events()
+    print(f"encoder: {'orjson' if sse.orjson is not None else 'stdlib json'}, {len(step_events)} events")
+    print(f"  legacy f-string + json.dumps  {best_rate(legacy, step_events):>10,.0f} events/s")
+    print(f"  encode_frame per event        {best_rate(per_event, step_events):>10,.0f} events/s")
+    print(f"  encode_batch                  {best_rate(batched, step_events):>10,.0f} events/s")
+
+    start = time.perf_counter()
+    chunks = asyncio.run(end_to_end(step_events))
+    elapsed = time.perf_counter() - start
+    print(f"  end to end via session log    {len(step_events) / elapsed:>10,.0f} events/s in {chunks} chunks")
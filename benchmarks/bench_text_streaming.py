@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Benchmark - time to first token vs total latency for streamed email drafting
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_llm_server import serve
+from text_streaming import finish_text_output, stream_text_output
+
+PORT = 8902
+CONTEXT = {"recommendation": "NVDA", "comparison_data": {"NVDA": "+94%", "AMD": "+18%"}}
+
+
+async def main():
+    server = await serve("127.0.0.1", PORT, token_delay=0.01, first_token_delay=0.3)
+    url = f"http://127.0.0.1:{PORT}/v1/chat/completions"
+    async with server:
+        start = time.perf_counter()
+        first_token = None
+        chunks = []
+        async for chunk in stream_text_output("email_draft", CONTEXT, "manager", llm_url=url):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            chunks.append(chunk)
+        total = time.perf_counter() - start
+
+    result = finish_text_output("email_draft", "professional", chunks)
+    print(f"chunks:              {len(chunks)}")
+    print(f"word_count:          {result['word_count']}")
+    print(f"time to first token: {first_token * 1e3:8.1f} ms")
+    print(f"total latency:       {total * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark - last 12 quarters of revenue for 500 symbols, columnar store vs JSON records
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timeseries_store import ColumnarStore, period_slot, slot_period
+
+SYMBOLS = 500
+QUARTERS = 40
+METRICS = ["revenue", "net_income", "gross_margin", "operating_margin", "eps"]
+REPEATS = 20
+
+
+def make_records(rng):
+    symbols = [f"SYM{i:04d}" for i in range(SYMBOLS)]
+    last_slot = period_slot("Q4 2024", "quarterly")
+    periods = [slot_period(slot, "quarterly") for slot in range(last_slot - QUARTERS + 1, last_slot + 1)]
+    records = {
+        symbol: {period: {metric: float(rng.uniform(1e6, 1e10)) for metric in METRICS} for period in periods}
+        for symbol in symbols
+    }
+    return symbols, periods, records
+
+
+def main():
+    rng = np.random.default_rng(0)
+    symbols, periods, records = make_records(rng)
+    root = tempfile.mkdtemp()
+    try:
+        store = ColumnarStore("quarterly_financials", root)
+        start = time.perf_counter()
+        store.ingest(records)
+        ingest = time.perf_counter() - start
+
+        # Incremental ingest of one new quarter for every symbol
+        new_period = slot_period(store.meta["latest_slot"] + 1, "quarterly")
+        start = time.perf_counter()
+        store.ingest({symbol: {new_period: {m: 1.0 for m in METRICS}} for symbol in symbols})
+        append = time.perf_counter() - start
+
+        # Baseline: one JSON document per symbol/period, as a result cache would hold them
+        json_dir = os.path.join(root, "json")
+        os.makedirs(json_dir)
+        for symbol in symbols:
+            with open(os.path.join(json_dir, f"{symbol}.json"), "w") as f:
+                json.dump(records[symbol], f)
+        last12 = periods[-12:]
+
+        timings = {"columnar": [], "json": []}
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            values, _ = store.read(symbols, "revenue", last=12, end=last12[-1])
+            timings["columnar"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            rows = []
+            for symbol in symbols:
+                with open(os.path.join(json_dir, f"{symbol}.json")) as f:
+                    by_period = json.load(f)
+                rows.append([by_period[p]["revenue"] for p in last12])
+            baseline = np.array(rows)
+            timings["json"].append(time.perf_counter() - start)
+
+        assert np.allclose(values, baseline)
+        columnar, parsed = np.median(timings["columnar"]), np.median(timings["json"])
+        print(f"{SYMBOLS} symbols x {QUARTERS} quarters x {len(METRICS)} metrics")
+        print(f"bulk ingest:            {ingest * 1e3:8.1f} ms")
+        print(f"append one quarter:     {append * 1e3:8.1f} ms")
+        print(f"last 12q revenue, mmap: {columnar * 1e3:8.3f} ms")
+        print(f"last 12q revenue, JSON: {parsed * 1e3:8.3f} ms")
+        print(f"speedup:                {parsed / columnar:8.1f}x")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
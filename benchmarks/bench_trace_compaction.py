@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark - prompt size and per-step latency of a 20-step ReAct trace, verbatim vs compacted
+Each step re-sends the trace so far, as an LLM-driven agent loop would
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_executor import format_observation
+from sse import dumps
+from trace_context import TraceManager, estimate_tokens
+
+STEPS = 20
+# Prompt processing rate used to turn tokens into latency (tokens/second)
+PREFILL_TOKENS_PER_SECOND = 5000
+SYMBOLS = ["NVDA", "AMD", "INTC", "AAPL", "MSFT", "GOOGL", "AMZN", "META", "TSLA", "AVGO"]
+
+
+def financial_step(number, symbol, rng):
+    data = {metric: rng.uniform(1e8, 5e10) for metric in (
+        "revenue", "gross_profit", "operating_income", "net_income", "free_cash_flow", "capex", "r_and_d",
+    )}
+    data.update({"revenue_growth": rng.uniform(-0.2, 1.0), "gross_margin": rng.uniform(0.3, 0.8), "currency": "USD"})
+    data["segments"] = {name: {"revenue": rng.uniform(1e8, 2e10), "commentary": "Segment detail. " * 40}
+                        for name in ("datacenter", "gaming", "automotive", "embedded")}
+    step = {
+        "step": number,
+        "thought": f"I need {symbol}'s latest quarterly financials to continue the comparison. " * 3,
+        "action": {"tool": "get_financial_data", "parameters": {
+            "symbol": symbol, "data_type": "quarterly_financials", "period": "Q3 2024",
+        }},
+    }
+    result = {"symbol": symbol, "data_type": "quarterly_financials", "period": "Q3 2024", "data": data,
+              "last_updated": "2024-10-26T17:53:54Z", "source": "financial_api_provider"}
+    return step, result
+
+
+def risk_step(number, symbols, rng):
+    step = {
+        "step": number,
+        "thought": "With the financials gathered I should weigh the risks of each candidate before recommending. " * 3,
+        "action": {"tool": "analyze_investment_risks", "parameters": {"symbols": symbols, "analysis_timeframe": "3_months"}},
+    }
+    result = {
+        "risk_scores": {symbol: round(rng.uniform(20, 70), 1) for symbol in symbols},
+        "risk_comparison": {"lowest": symbols[0], "highest": symbols[-1], "mean_correlation": rng.uniform(0, 1)},
+        "sentiment_analysis": {symbol: {"score": rng.uniform(-1, 1), "headlines": ["Headline text here"] * 5}
+                               for symbol in symbols},
+    }
+    return step, result
+
+
+def build_run(rng):
+    steps = []
+    for number in range(1, STEPS + 1):
+        if number % 5 == 0:
+            steps.append(risk_step(number, rng.sample(SYMBOLS, 3), rng))
+        else:
+            steps.append(financial_step(number, SYMBOLS[number % len(SYMBOLS)], rng))
+    return steps
+
+
+def main():
+    rng = random.Random(0)
+    trace = TraceManager()
+    totals = {"verbatim": 0, "compacted": 0}
+    print(f"{'step':>4}  {'verbatim tok':>12}  {'compact tok':>11}  {'render ms':>9}  "
+          f"{'prefill ms (verbatim)':>21}  {'prefill ms (compact)':>20}")
+    for step, result in build_run(rng):
+        trace.record(step, result, format_observation(step, result))
+
+        start = time.perf_counter()
+        compacted = estimate_tokens(dumps(trace.render()).decode())
+        render_ms = (time.perf_counter() - start) * 1e3
+        verbatim = estimate_tokens(dumps(trace.render_verbatim()).decode())
+
+        totals["verbatim"] += verbatim
+        totals["compacted"] += compacted
+        print(f"{step['step']:>4}  {verbatim:>12}  {compacted:>11}  {render_ms:>9.3f}  "
+              f"{verbatim / PREFILL_TOKENS_PER_SECOND * 1e3:>21.1f}  {compacted / PREFILL_TOKENS_PER_SECOND * 1e3:>20.1f}")
+
+    reduction = 1 - totals["compacted"] / totals["verbatim"]
+    print(f"prompt tokens over {STEPS} turns: verbatim {totals['verbatim']}, compacted {totals['compacted']} "
+          f"({reduction:.1%} smaller)")
+    print(f"out-of-line artifacts: {len(trace.artifacts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark - memory held per ReAct step and per session at 10k concurrent sessions
+Pydantic AgentStep lists vs plain dict trace entries vs slotted StepRecord traces
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import AgentStep
+from react_execution_sequence import react_execution_sequence
+from trace_context import TraceManager
+
+SESSIONS = 10_000
+
+
+def session_plan():
+    # A fresh plan per session, as a planner would produce: no strings shared with other sessions
+    return json.loads(json.dumps(react_execution_sequence))
+
+
+def observation(step, session):
+    return f"Step {step['step']} of session {session}: {step['action']['tool']} returned {len(step['thought'])} fields"
+
+
+def build_pydantic(session):
+    return [
+        AgentStep(step_number=step["step"], thought=step["thought"], action=step["action"],
+                  observation=observation(step, session), timestamp=datetime.now(), status="completed")
+        for step in session_plan()
+    ]
+
+
+def build_dicts(session):
+    # The trace entries as kept before StepRecord
+    return [
+        {"step": step["step"], "thought": step["thought"], "tool": step["action"]["tool"],
+         "parameters": step["action"]["parameters"], "observation": observation(step, session),
+         "handle": None, "digest": {}, "timestamp": datetime.now(), "status": "completed"}
+        for step in session_plan()
+    ]
+
+
+def build_records(session):
+    trace = TraceManager()
+    for step in session_plan():
+        trace.record(step, None, observation(step, session), started_ns=time.monotonic_ns())
+    return trace
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(session) for session in range(SESSIONS)]
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return held
+
+
+def main():
+    steps = len(react_execution_sequence)
+    print(f"{SESSIONS} sessions x {steps} steps, memory retained after each run's plan is released")
+    print(f"{'representation':<28} {'total MB':>9} {'per session':>12} {'per step':>9}")
+    results = {}
+    for name, build in (("pydantic AgentStep list", build_pydantic),
+                        ("dict trace entries", build_dicts),
+                        ("StepRecord trace", build_records)):
+        held = measure(build)
+        results[name] = held
+        print(f"{name:<28} {held / 2**20:>9.1f} {held / SESSIONS:>10.0f} B {held / SESSIONS / steps:>7.0f} B")
+    saving = 1 - results["StepRecord trace"] / results["pydantic AgentStep list"]
+    print(f"StepRecord traces hold {saving:.0%} less than AgentStep lists")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an OpenAI-compatible chat completions endpoint
+Streams a canned email draft token by token for streaming tests and benchmarks
+
+Usage:
+    python benchmarks/fake_llm_server.py --port 8901 --token-delay 0.02
+    LLM_API_URL=http://127.0.0.1:8901/v1/chat/completions uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+
+CANNED_EMAIL = (
+    "Subject: Q3 2024 Investment Analysis - NVIDIA vs AMD\n\n"
+    "Hi,\n\nNVIDIA grew Q3 2024 revenue 94% year over year to $35.08B, while AMD grew 18% "
+    "to $6.82B. Based on this growth and its position in AI datacenter demand, NVIDIA is the "
+    "stronger buy right now. Key risks: for NVIDIA, AI spending concentration and China export "
+    "restrictions; for AMD, CPU market competition and datacenter dependency.\n\nBest regards"
+)
+
+
+def tokenize(text):
+    words = text.split(" ")
+    return [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+
+
+async def handle(reader, writer, token_delay, first_token_delay):
+    # Read and discard the request head and body
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.decode("latin-1").split("\r\n"):
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    if length:
+        await reader.readexactly(length)
+
+    writer.write(
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: text/event-stream\r\n"
+        b"Cache-Control: no-cache\r\n"
+        b"Connection: close\r\n\r\n"
+    )
+    await writer.drain()
+
+    await asyncio.sleep(first_token_delay)
+    for token in tokenize(CANNED_EMAIL):
+        chunk = {"choices": [{"index": 0, "delta": {"content": token}}]}
+        writer.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await writer.drain()
+        await asyncio.sleep(token_delay)
+    writer.write(b"data: [DONE]\n\n")
+    await writer.drain()
+    writer.close()
+
+
+async def serve(host, port, token_delay, first_token_delay):
+    server = await asyncio.start_server(
+        lambda r, w: handle(r, w, token_delay, first_token_delay), host, port
+    )
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    args = parser.parse_args()
+
+    async def main():
+        server = await serve(args.host, args.port, args.token_delay, args.first_token_delay)
+        print(f"Fake LLM listening on http://{args.host}:{args.port}/v1/chat/completions")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
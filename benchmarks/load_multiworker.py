@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Load test - streaming agent throughput as uvicorn workers grow from 1 to N
+Runs go through the shared Redis work queue (AGENT_WORK_QUEUE=redis)
+
+Usage:
+    REDIS_URL=redis://localhost:6379 python benchmarks/load_multiworker.py --max-workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUERY = (
+    "Compare the Q3 2024 revenue growth of NVIDIA and AMD, and then draft a summary email "
+    "to my manager about which stock is a better buy right now, citing a key risk for each."
+)
+
+
+async def wait_healthy(client, base_url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get(f"{base_url}/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become healthy")
+
+
+async def one_run(client, base_url, user):
+    start = time.perf_counter()
+    payload = {"query": QUERY, "user_id": f"user-{user}", "streaming": True}
+    async with client.stream("POST", f"{base_url}/api/agent/run", json=payload) as response:
+        if response.status_code == 429:
+            return None
+        async for line in response.aiter_lines():
+            if '"type":"execution_complete"' in line or '"type":"error"' in line:
+                break
+    return time.perf_counter() - start
+
+
+async def load(base_url, requests, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+        await wait_healthy(client, base_url)
+        gate = asyncio.Semaphore(concurrency)
+
+        async def bounded(i):
+            async with gate:
+                return await one_run(client, base_url, i % 50)
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(bounded(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    done = sorted(latency for latency in latencies if latency is not None)
+    return {
+        "throughput": len(done) / elapsed,
+        "rejected": requests - len(done),
+        "p50": done[len(done) // 2] if done else float("nan"),
+        "p95": done[int(len(done) * 0.95) - 1] if done else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8910)
+    args = parser.parse_args()
+
+    if not os.getenv("REDIS_URL"):
+        sys.exit("REDIS_URL must point at a Redis server shared by the workers")
+
+    env = {**os.environ, "AGENT_WORK_QUEUE": "redis", "PYTHONPATH": ROOT}
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(f"{args.requests} streaming runs, concurrency {args.concurrency}")
+    print(f"{'workers':>7}  {'runs/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'429s':>5}")
+    for workers in range(1, args.max_workers + 1):
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+             "--workers", str(workers), "--log-level", "warning"],
+            cwd=ROOT, env=env
+        )
+        try:
+            result = asyncio.run(load(base_url, args.requests, args.concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{workers:>7}  {result['throughput']:8.1f}  {result['p50'] * 1e3:8.1f}  "
+              f"{result['p95'] * 1e3:8.1f}  {result['rejected']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Nexus Agent - Latency and Cost Budgets
+Picks cheaper tool variants to meet a run's budget and stops early when it cannot be met
+"""
+
+from typing import Dict, List, Optional, Any, Tuple
+import math
+import threading
+import time
+
+from financial_cache import FinancialDataCache, financial_data_cache
+
+# Preference keys callers use to bound a run
+LATENCY_BUDGET_KEY = "latency_budget_seconds"
+COST_BUDGET_KEY = "cost_budget_usd"
+
+# How old a cached real_time_price may be when a budget asks for cheaper data
+MAX_PRICE_STALENESS_SECONDS = 300.0
+
+# Shorter deliverable to fall back to, per content_type
+SHORTER_CONTENT_TYPES = {
+    "technical_report": "executive_summary",
+    "email_draft": "executive_summary",
+    "executive_summary": "bullet_points",
+}
+
+# Starting estimates per tool variant: (seconds, USD). Latencies are refined
+# from observed runs; costs are provider list prices for one call. The stale
+# variant's estimate is a cache hit; it only applies while something stale
+# enough is cached (see ToolCostModel.estimate).
+DEFAULT_ESTIMATES: Dict[str, Tuple[float, float]] = {
+    "get_financial_data": (0.5, 0.001),
+    "get_financial_data:real_time_price": (0.3, 0.002),
+    "get_financial_data:stale": (0.01, 0.0),
+    "get_financial_data_many": (0.8, 0.003),
+    "get_financial_history": (0.05, 0.0),
+    "analyze_investment_risks": (2.0, 0.012),
+    "analyze_investment_risks:no_sentiment": (0.8, 0.004),
+    "generate_text_output:technical_report": (8.0, 0.03),
+    "generate_text_output:email_draft": (4.0, 0.015),
+    "generate_text_output:executive_summary": (3.0, 0.01),
+    "generate_text_output:bullet_points": (1.5, 0.005),
+    "final_response": (0.0, 0.0),
+}
+DEFAULT_ESTIMATE = (1.0, 0.005)
+
+# Weight given to the latest observation when updating a latency estimate
+LATENCY_SMOOTHING = 0.2
+
+# Seconds kept in hand for the final_response step and response delivery
+DELIVERY_RESERVE_SECONDS = 0.1
+
+
+def variant_key(tool: str, parameters: Dict[str, Any]) -> str:
+    """Name of the tool variant a call uses, for cost and latency estimates"""
+    if tool == "get_financial_data":
+        if parameters.get("max_stale"):
+            return "get_financial_data:stale"
+        if parameters.get("data_type") == "real_time_price":
+            return "get_financial_data:real_time_price"
+    elif tool == "analyze_investment_risks":
+        if parameters.get("include_sentiment") is False:
+            return "analyze_investment_risks:no_sentiment"
+    elif tool == "generate_text_output":
+        return f"generate_text_output:{parameters.get('content_type', 'executive_summary')}"
+    return tool
+
+
+def cheaper_variants(tool: str, parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    The planned parameters followed by progressively cheaper alternatives.
+
+    Example:
+        >>> cheaper_variants("analyze_investment_risks", {"symbols": ["NVDA", "AMD"]})
+        [{"symbols": ["NVDA", "AMD"]}, {"symbols": ["NVDA", "AMD"], "include_sentiment": False}]
+    """
+    variants = [parameters]
+    if tool == "get_financial_data" and parameters.get("data_type") == "real_time_price":
+        variants.append({**parameters, "max_stale": MAX_PRICE_STALENESS_SECONDS})
+    elif tool == "analyze_investment_risks" and parameters.get("include_sentiment", True):
+        variants.append({**parameters, "include_sentiment": False})
+    elif tool == "generate_text_output":
+        content_type = parameters.get("content_type")
+        while content_type in SHORTER_CONTENT_TYPES:
+            content_type = SHORTER_CONTENT_TYPES[content_type]
+            variants.append({**parameters, "content_type": content_type})
+    return variants
+
+
+class ToolCostModel:
+    """
+    Expected latency and cost of each tool variant.
+
+    Latencies start from DEFAULT_ESTIMATES and follow an exponential moving
+    average of observed step durations, so budgets track how providers are
+    actually performing. Shared by every run.
+
+    A get_financial_data call with max_stale is only as cheap as a cache hit
+    while the cache holds a result that recent; otherwise the coalescer
+    fetches fresh data, and the call is estimated as the fresh variant.
+    """
+
+    def __init__(
+        self,
+        estimates: Optional[Dict[str, Tuple[float, float]]] = None,
+        cache: Optional[FinancialDataCache] = financial_data_cache
+    ):
+        estimates = DEFAULT_ESTIMATES if estimates is None else estimates
+        self.latency: Dict[str, float] = {key: seconds for key, (seconds, _) in estimates.items()}
+        self.cost: Dict[str, float] = {key: usd for key, (_, usd) in estimates.items()}
+        self.cache = cache
+        self._lock = threading.Lock()
+
+    def _stale_available(self, parameters: Dict[str, Any]) -> bool:
+        if self.cache is None or not isinstance(parameters.get("symbol"), str):
+            return False
+        return self.cache.has_cached(
+            parameters["symbol"],
+            parameters.get("data_type", "quarterly_financials"),
+            parameters.get("period"),
+            parameters.get("metrics"),
+            max_stale=parameters["max_stale"]
+        )
+
+    def estimate(self, tool: str, parameters: Dict[str, Any]) -> Tuple[float, float]:
+        """(seconds, USD) expected for one call"""
+        if tool == "get_financial_data" and parameters.get("max_stale") and not self._stale_available(parameters):
+            parameters = {key: value for key, value in parameters.items() if key != "max_stale"}
+        key = variant_key(tool, parameters)
+        base = self.latency.get(tool, DEFAULT_ESTIMATE[0]), self.cost.get(tool, DEFAULT_ESTIMATE[1])
+        seconds = self.latency.get(key, base[0])
+        usd = self.cost.get(key, base[1])
+        if tool == "get_financial_data_many":
+            usd *= max(len(parameters.get("symbols") or []), 1) / 3
+        return seconds, usd
+
+    def observe(self, tool: str, parameters: Dict[str, Any], seconds: float) -> None:
+        key = variant_key(tool, parameters)
+        with self._lock:
+            previous = self.latency.get(key)
+            if previous is None:
+                self.latency[key] = seconds
+            else:
+                self.latency[key] = previous + LATENCY_SMOOTHING * (seconds - previous)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {key: {"seconds": round(self.latency[key], 3), "usd": self.cost.get(key, DEFAULT_ESTIMATE[1])}
+                for key in sorted(self.latency)}
+
+
+tool_costs = ToolCostModel()
+
+
+class RunBudget:
+    """
+    Latency and cost limits for one agent run, set through preferences.
+
+    Before each step is dispatched, choose() picks the first variant of the
+    planned call (see cheaper_variants) whose estimated latency and cost fit
+    what is left, after reserving enough for the synthesis steps still to
+    come. When no variant fits, the step is skipped and the run finishes
+    with a partial result. Tool calls are also cut off at the deadline.
+
+    The deadline is wall-clock time from when the request was accepted, so
+    it also holds for runs picked up from the shared queue by another worker.
+
+    Example:
+        >>> budget = RunBudget.from_preferences({"latency_budget_seconds": 5, "cost_budget_usd": 0.02})
+        >>> executor = ReActExecutor(plan, budget=budget)
+    """
+
+    def __init__(
+        self,
+        latency_seconds: Optional[float] = None,
+        cost_usd: Optional[float] = None,
+        started: Optional[float] = None,
+        costs: ToolCostModel = tool_costs
+    ):
+        self.latency_seconds = latency_seconds
+        self.cost_usd = cost_usd
+        self.started = time.time() if started is None else started
+        self.deadline = self.started + latency_seconds if latency_seconds is not None else math.inf
+        self.costs = costs
+        self.spent_usd = 0.0
+        self.exhausted = False
+        self.degraded: Dict[int, str] = {}
+        self.skipped: Dict[int, str] = {}
+
+    @classmethod
+    def from_preferences(cls, preferences: Optional[Dict[str, Any]], started: Optional[float] = None) -> Optional["RunBudget"]:
+        """
+        Budget set in request preferences, or None if there is none.
+
+        Raises:
+            ValueError: If a budget is not a positive number
+        """
+        preferences = preferences or {}
+        limits: Dict[str, Optional[float]] = {}
+        for key in (LATENCY_BUDGET_KEY, COST_BUDGET_KEY):
+            value = preferences.get(key)
+            if value is None:
+                limits[key] = None
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"{key} must be a positive number")
+            limits[key] = float(value)
+        if limits[LATENCY_BUDGET_KEY] is None and limits[COST_BUDGET_KEY] is None:
+            return None
+        return cls(limits[LATENCY_BUDGET_KEY], limits[COST_BUDGET_KEY], started=started)
+
+    def remaining_seconds(self) -> float:
+        return self.deadline - time.time()
+
+    def remaining_usd(self) -> float:
+        return self.cost_usd - self.spent_usd if self.cost_usd is not None else math.inf
+
+    def _reserve(self, pending: List[Dict[str, Any]]) -> Tuple[float, float]:
+        """Cheapest (seconds, USD) for steps that must still run after this one"""
+        seconds = usd = 0.0
+        for action in pending:
+            cheapest = min(
+                self.costs.estimate(action["tool"], variant)
+                for variant in cheaper_variants(action["tool"], action.get("parameters", {}))
+            )
+            seconds += cheapest[0]
+            usd += cheapest[1]
+        return seconds + DELIVERY_RESERVE_SECONDS, usd
+
+    def choose(
+        self,
+        step: int,
+        action: Dict[str, Any],
+        pending: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The action to dispatch for a step, or None to skip it.
+
+        Args:
+            step (int): Step number
+            action (Dict[str, Any]): The planned action
+            pending (List[Dict[str, Any]]): Actions of synthesis steps not yet
+                started, which must fit in the budget after this one
+
+        Returns:
+            Optional[Dict[str, Any]]: The planned action, a cheaper variant of
+            it, or None when the budget cannot accommodate it
+        """
+        tool = action["tool"]
+        if tool == "final_response":
+            return action
+        if self.exhausted:
+            self.skipped[step] = "budget exhausted"
+            return None
+
+        reserve_seconds, reserve_usd = self._reserve(pending)
+        # When the later steps cannot fit anyway, spend what is left on this one
+        if reserve_seconds > self.remaining_seconds():
+            reserve_seconds = DELIVERY_RESERVE_SECONDS
+        if reserve_usd > self.remaining_usd():
+            reserve_usd = 0.0
+        seconds_left = self.remaining_seconds() - reserve_seconds
+        usd_left = self.remaining_usd() - reserve_usd
+        variants = cheaper_variants(tool, action.get("parameters", {}))
+        for index, parameters in enumerate(variants):
+            seconds, usd = self.costs.estimate(tool, parameters)
+            if seconds <= seconds_left and usd <= usd_left:
+                self.spent_usd += usd
+                if index:
+                    self.degraded[step] = variant_key(tool, parameters)
+                return {**action, "parameters": parameters}
+
+        self.skipped[step] = "latency budget" if self.costs.estimate(tool, variants[-1])[0] > seconds_left else "cost budget"
+        if self.deadline_reached() or self.remaining_usd() <= 0:
+            self.exhausted = True
+        return None
+
+    def deadline_reached(self) -> bool:
+        return self.remaining_seconds() <= DELIVERY_RESERVE_SECONDS
+
+    def timeout(self, default: float) -> float:
+        """Timeout for a call dispatched now: the tool's own, or less if the deadline is closer"""
+        return max(min(default, self.remaining_seconds() - DELIVERY_RESERVE_SECONDS), 0.0)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.skipped) or self.exhausted
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            LATENCY_BUDGET_KEY: self.latency_seconds,
+            COST_BUDGET_KEY: self.cost_usd,
+            "elapsed_seconds": round(time.time() - self.started, 3),
+            "estimated_cost_usd": round(self.spent_usd, 6),
+            "degraded_steps": {str(step): variant for step, variant in self.degraded.items()},
+            "skipped_steps": {str(step): reason for step, reason in self.skipped.items()},
+        }
@@ -0,0 +1,266 @@
+"""
+Nexus Agent - Batched and Coalesced Financial Data Retrieval
+Bulk multi-symbol fetches with single-flight merging of concurrent requests
+"""
+
+from typing import Dict, List, Optional, Any, Callable, Awaitable, Hashable, Tuple
+import asyncio
+
+import agent_tools
+from financial_cache import FinancialDataCache, financial_data_cache, is_closed_period
+from timeseries_store import FinancialStore, financial_store
+
+FlightKey = Tuple[str, str, Optional[str], Optional[Tuple[str, ...]]]
+
+
+def flight_key(
+    symbol: str,
+    data_type: str,
+    period: Optional[str],
+    metrics: Optional[List[str]]
+) -> FlightKey:
+    """Key identifying requests that can share one upstream fetch"""
+    return (symbol.upper(), data_type, period, tuple(sorted(metrics)) if metrics is not None else None)
+
+
+class SingleFlight:
+    """
+    Merges concurrent requests for the same key into one in-flight task.
+
+    The shared task is shielded from its callers, so a session that times out
+    or disconnects does not cancel the fetch other sessions are waiting on.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.stats: Dict[str, int] = {"leaders": 0, "coalesced": 0}
+
+    def join(self, key: Hashable) -> Optional["asyncio.Future[Any]"]:
+        """Return the in-flight work for key, if any, counting the caller as coalesced"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        return future
+
+    def register(self, key: Hashable, awaitable: Awaitable[Any]) -> "asyncio.Future[Any]":
+        """Publish an awaitable as the in-flight work for key"""
+        future = asyncio.ensure_future(awaitable)
+        self._inflight[key] = future
+        self.stats["leaders"] += 1
+
+        def _forget(_: "asyncio.Future[Any]") -> None:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        future.add_done_callback(_forget)
+        return future
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the in-flight work for key, starting it with fn if there is none"""
+        future = self.join(key)
+        if future is None:
+            future = self.register(key, fn())
+        return await asyncio.shield(future)
+
+
+class FinancialDataCoalescer:
+    """
+    Async front door for financial data used by the executor.
+
+    Every request is answered from the cache when possible. Misses for the same
+    (symbol, data_type, period, metrics) across concurrent agent sessions share
+    one upstream fetch, and multi-symbol requests send a single bulk provider
+    call for whichever symbols are neither cached nor already in flight.
+    Closed-period financials are also answered from, and archived to, the
+    local columnar store, so history survives restarts and cache eviction.
+    Only in-process cache hits are answered on the event loop; Redis,
+    columnar-store reads and cache writes run in worker threads.
+
+    Example:
+        >>> coalescer = FinancialDataCoalescer()
+        >>> await coalescer.get_financial_data_many(["NVDA", "AMD"], period="Q3 2024")
+        {"NVDA": {...}, "AMD": {...}}
+    """
+
+    def __init__(
+        self,
+        cache: FinancialDataCache = financial_data_cache,
+        fetch: Optional[Callable[..., Optional[Dict[str, Any]]]] = None,
+        fetch_many: Callable[..., Optional[Dict[str, Dict[str, Any]]]] = agent_tools.get_financial_data_many,
+        store: Optional[FinancialStore] = financial_store
+    ):
+        self.cache = cache
+        self.fetch = cache.fetch if fetch is None else fetch
+        self.fetch_many = fetch_many
+        self.store = store
+        self.flights = SingleFlight()
+
+    def _stored(
+        self,
+        symbol: str,
+        data_type: str,
+        period: Optional[str],
+        metrics: Optional[List[str]]
+    ) -> Optional[Dict[str, Any]]:
+        if self.store is None or not is_closed_period(period):
+            return None
+        result = self.store.lookup(symbol, data_type, period, metrics)
+        if result is not None:
+            self.cache.put(symbol, data_type, period, metrics, result)
+        return result
+
+    def _lookup(
+        self,
+        symbols: List[str],
+        data_type: str,
+        period: Optional[str],
+        metrics: Optional[List[str]],
+        max_stale: float = 0.0
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Blocking lookup in Redis and the columnar store; runs in a worker thread"""
+        results = {}
+        for symbol in symbols:
+            cached = self.cache.get_cached(symbol, data_type, period, metrics, max_stale)
+            results[symbol] = cached if cached is not None else self._stored(symbol, data_type, period, metrics)
+        return results
+
+    async def _cached(
+        self,
+        symbols: List[str],
+        data_type: str,
+        period: Optional[str],
+        metrics: Optional[List[str]],
+        max_stale: float = 0.0
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Cached results for symbols, None where nothing is cached.
+
+        In-process hits are answered on the event loop. Everything else goes
+        to a worker thread, since a Redis round trip can block for the whole
+        socket timeout and the columnar store reads from disk.
+        """
+        results = {symbol: self.cache.get_local(symbol, data_type, period, metrics, max_stale) for symbol in symbols}
+        misses = [symbol for symbol, result in results.items() if result is None]
+        if misses:
+            results.update(await asyncio.to_thread(self._lookup, misses, data_type, period, metrics, max_stale))
+        return results
+
+    def _put_all(
+        self,
+        results: Dict[str, Optional[Dict[str, Any]]],
+        data_type: str,
+        period: Optional[str],
+        metrics: Optional[List[str]]
+    ) -> None:
+        for symbol, result in results.items():
+            self.cache.put(symbol, data_type, period, metrics, result)
+
+    async def _archive(self, period: Optional[str], results: List[Optional[Dict[str, Any]]]) -> None:
+        if self.store is not None and is_closed_period(period):
+            await asyncio.to_thread(self.store.ingest_results, results)
+
+    async def _fetch_one(
+        self,
+        symbol: str,
+        data_type: str,
+        period: Optional[str],
+        metrics: Optional[List[str]]
+    ) -> Optional[Dict[str, Any]]:
+        result = await asyncio.to_thread(self.fetch, symbol, data_type, period, metrics)
+        await asyncio.to_thread(self.cache.put, symbol, data_type, period, metrics, result)
+        await self._archive(period, [result])
+        return result
+
+    async def _fetch_bulk(
+        self,
+        symbols: List[str],
+        data_type: str,
+        period: Optional[str],
+        metrics: Optional[List[str]]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        results = await asyncio.to_thread(self.fetch_many, symbols, data_type, period, metrics)
+        if results is None:
+            # Provider has no bulk endpoint; fall back to one call per symbol
+            fetched = await asyncio.gather(*(
+                asyncio.to_thread(self.fetch, symbol, data_type, period, metrics) for symbol in symbols
+            ))
+            results = dict(zip(symbols, fetched))
+
+        results = {symbol.upper(): result for symbol, result in results.items()}
+        await asyncio.to_thread(self._put_all, results, data_type, period, metrics)
+        await self._archive(period, list(results.values()))
+        return results
+
+    async def get_financial_data(
+        self,
+        symbol: str,
+        data_type: str = "quarterly_financials",
+        period: Optional[str] = None,
+        metrics: Optional[List[str]] = None,
+        max_stale: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cached, coalesced drop-in for agent_tools.get_financial_data.
+
+        max_stale accepts a cached result up to that many seconds past its
+        TTL; run budgets use it to avoid fetching fresh real_time_price.
+        """
+        key = flight_key(symbol, data_type, period, metrics)
+        future = self.flights.join(key)
+        if future is None:
+            cached = (await self._cached([symbol], data_type, period, metrics, max_stale))[symbol]
+            if cached is not None:
+                return cached
+            return await self.flights.do(key, lambda: self._fetch_one(symbol, data_type, period, metrics))
+        return await asyncio.shield(future)
+
+    async def get_financial_data_many(
+        self,
+        symbols: List[str],
+        data_type: str = "quarterly_financials",
+        period: Optional[str] = None,
+        metrics: Optional[List[str]] = None
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Cached, coalesced drop-in for agent_tools.get_financial_data_many"""
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        pending: Dict[str, "asyncio.Future[Any]"] = {}
+        to_fetch: List[str] = []
+
+        unresolved: List[str] = []
+        for symbol in dict.fromkeys(s.upper() for s in symbols):
+            future = self.flights.join(flight_key(symbol, data_type, period, metrics))
+            if future is not None:
+                pending[symbol] = future
+            else:
+                unresolved.append(symbol)
+
+        cached_results = await self._cached(unresolved, data_type, period, metrics)
+        for symbol, cached in cached_results.items():
+            if cached is not None:
+                results[symbol] = cached
+                continue
+            future = self.flights.join(flight_key(symbol, data_type, period, metrics))
+            if future is not None:
+                pending[symbol] = future
+            else:
+                to_fetch.append(symbol)
+
+        if to_fetch:
+            bulk = asyncio.ensure_future(self._fetch_bulk(to_fetch, data_type, period, metrics))
+            for symbol in to_fetch:
+                pending[symbol] = self.flights.register(
+                    flight_key(symbol, data_type, period, metrics),
+                    _pick(bulk, symbol)
+                )
+
+        for symbol, future in pending.items():
+            results[symbol] = await asyncio.shield(future)
+        return results
+
+
+async def _pick(bulk: "asyncio.Future[Dict[str, Any]]", symbol: str) -> Optional[Dict[str, Any]]:
+    return (await bulk).get(symbol)
+
+
+# Shared coalescer used by the executor
+financial_data_coalescer = FinancialDataCoalescer()
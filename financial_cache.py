@@ -0,0 +1,331 @@
+"""
+Nexus Agent - Tiered Result Cache for Financial Data
+In-process LRU backed by an optional Redis tier, with data_type-aware TTLs
+"""
+
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from collections import OrderedDict
+from datetime import date
+import copy
+import json
+import math
+import os
+import re
+import threading
+import time
+
+import agent_tools
+from lazy_imports import LazyClient, module_available
+from metrics import record_cache_lookup
+
+# TTLs in seconds per data_type
+CLOSED_PERIOD_TTL = 30 * 24 * 3600  # reported financials for a closed period never change
+OPEN_PERIOD_TTL = 3600
+DATA_TYPE_TTLS: Dict[str, float] = {
+    "quarterly_financials": OPEN_PERIOD_TTL,
+    "annual_financials": OPEN_PERIOD_TTL,
+    "key_metrics": 3600,
+    "real_time_price": 5,
+}
+DEFAULT_TTL = 300
+
+# How long expired entries stay readable by callers that accept stale data
+STALE_WINDOW_SECONDS = 300
+
+_QUARTER_END_MONTH = {1: 3, 2: 6, 3: 9, 4: 12}
+_QUARTER_PATTERN = re.compile(r"^\s*Q([1-4])\s+(\d{4})\s*$", re.IGNORECASE)
+_YEAR_PATTERN = re.compile(r"^\s*(?:FY\s*)?(\d{4})\s*$", re.IGNORECASE)
+
+CacheKey = Tuple[str, str, Optional[str]]
+
+
+def quarter_end_month(quarter: int) -> int:
+    """Calendar month in which a quarter (1-4) ends"""
+    return _QUARTER_END_MONTH[quarter]
+
+
+def is_closed_period(period: Optional[str], today: Optional[date] = None) -> bool:
+    """
+    Check whether a reporting period has ended.
+
+    Args:
+        period (Optional[str]): Period such as "Q3 2024" or "2023"
+        today (Optional[date]): Reference date, defaults to today
+
+    Returns:
+        bool: True if the period ended before today; False for open, missing
+        or unrecognised periods
+    """
+    if not period:
+        return False
+    today = today or date.today()
+
+    match = _QUARTER_PATTERN.match(period)
+    if match:
+        quarter, year = int(match.group(1)), int(match.group(2))
+        return (year, _QUARTER_END_MONTH[quarter]) < (today.year, today.month)
+
+    match = _YEAR_PATTERN.match(period)
+    if match:
+        return int(match.group(1)) < today.year
+
+    return False
+
+
+def ttl_for(data_type: str, period: Optional[str], today: Optional[date] = None) -> float:
+    """Time-to-live in seconds for a financial data result"""
+    if data_type in ("quarterly_financials", "annual_financials") and is_closed_period(period, today):
+        return CLOSED_PERIOD_TTL
+    return DATA_TYPE_TTLS.get(data_type, DEFAULT_TTL)
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with per-entry expiry.
+
+    Expired entries are kept for another stale_window seconds, so callers
+    that accept older data can still read them with get(key, max_stale).
+    Tools run in worker threads, so every operation takes the cache lock.
+    """
+
+    def __init__(self, maxsize: int = 1024, stale_window: float = STALE_WINDOW_SECONDS):
+        self.maxsize = maxsize
+        self.stale_window = stale_window
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, max_stale: float = 0.0) -> Optional[Any]:
+        """The value for key, if it expired no more than max_stale seconds ago"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at + self.stale_window <= now:
+                del self._entries[key]
+                return None
+            if expires_at + max_stale <= now:
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _covers(cached_metrics: Optional[List[str]], metrics: Optional[List[str]]) -> bool:
+    """True if a cached result fetched for cached_metrics can answer metrics"""
+    if cached_metrics is None:
+        return True
+    if metrics is None:
+        return False
+    return set(metrics) <= set(cached_metrics)
+
+
+def _project(result: Dict[str, Any], metrics: Optional[List[str]]) -> Dict[str, Any]:
+    """Copy a cached result, keeping only the requested metrics in its data"""
+    projected = copy.deepcopy(result)
+    if metrics is not None and isinstance(projected.get("data"), dict):
+        wanted = set(metrics) | {"currency"}
+        projected["data"] = {k: v for k, v in projected["data"].items() if k in wanted}
+    return projected
+
+
+class FinancialDataCache:
+    """
+    Tiered cache in front of get_financial_data.
+
+    Results are keyed on (symbol, data_type, period) and remember which metrics
+    they were fetched for, so a request for a subset of metrics is answered
+    from a cached superset. Lookups go to the in-process LRU first, then Redis
+    if a client is configured; Redis failures degrade to the LRU alone.
+
+    Example:
+        >>> cache = FinancialDataCache(redis_client=redis.Redis.from_url(url))
+        >>> cache.get_financial_data("NVDA", "quarterly_financials", "Q3 2024", ["revenue"])
+        >>> cache.stats
+        {"hits": 0, "misses": 1, "redis_hits": 0, "redis_errors": 0}
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[..., Optional[Dict[str, Any]]] = agent_tools.get_financial_data,
+        maxsize: int = 1024,
+        redis_client: Optional[Any] = None,
+        key_prefix: str = "nexus:financial_data:"
+    ):
+        self.fetch = fetch
+        self.local = LRUCache(maxsize)
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "stale_hits": 0, "redis_hits": 0, "redis_errors": 0}
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> "FinancialDataCache":
+        """Build a cache, attaching a Redis tier when REDIS_URL is set and redis is installed"""
+        url = os.getenv("REDIS_URL")
+        if url and "redis_client" not in kwargs and module_available("redis"):
+            kwargs["redis_client"] = LazyClient("redis", lambda redis: redis.Redis.from_url(url, socket_timeout=0.25))
+        return cls(**kwargs)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _redis_key(self, key: CacheKey) -> str:
+        symbol, data_type, period = key
+        return f"{self.key_prefix}{symbol}:{data_type}:{period or ''}"
+
+    def _lookup_local(self, key: CacheKey, max_stale: float = 0.0) -> Optional[Dict[str, Any]]:
+        entry = self.local.get(key)
+        if entry is None and max_stale:
+            entry = self.local.get(key, max_stale)
+            if entry is not None:
+                self._count("stale_hits")
+        return entry
+
+    def _lookup(self, key: CacheKey, max_stale: float = 0.0) -> Optional[Dict[str, Any]]:
+        entry = self._lookup_local(key, max_stale)
+        if entry is not None or self.redis is None:
+            return entry
+
+        try:
+            pipe = self.redis.pipeline()
+            pipe.get(self._redis_key(key))
+            pipe.pttl(self._redis_key(key))
+            raw, remaining_ms = pipe.execute()
+        except Exception:
+            self._count("redis_errors")
+            return None
+        if raw is None:
+            return None
+
+        entry = json.loads(raw)
+        self._count("redis_hits")
+        # Expire the local copy with the shared one, not a full TTL from now
+        ttl = remaining_ms / 1000 if remaining_ms and remaining_ms > 0 else ttl_for(key[1], key[2])
+        self.local.set(key, entry, ttl)
+        return entry
+
+    def _store(self, key: CacheKey, result: Dict[str, Any], metrics: Optional[List[str]]) -> None:
+        existing = self.local.get(key)
+        if existing is not None and existing["metrics"] is not None and metrics is not None:
+            # Widen the cached entry so it covers both metric sets
+            merged = copy.deepcopy(existing["result"])
+            merged.setdefault("data", {}).update(result.get("data") or {})
+            for field, value in result.items():
+                if field != "data":
+                    merged[field] = value
+            result = merged
+            metrics = sorted(set(existing["metrics"]) | set(metrics))
+
+        entry = {"metrics": metrics, "result": result}
+        ttl = ttl_for(key[1], key[2])
+        self.local.set(key, entry, ttl)
+
+        if self.redis is not None:
+            try:
+                self.redis.setex(self._redis_key(key), max(1, math.ceil(ttl)), json.dumps(entry, default=str))
+            except Exception:
+                self._count("redis_errors")
+
+    def get_cached(
+        self,
+        symbol: str,
+        data_type: str = "quarterly_financials",
+        period: Optional[str] = None,
+        metrics: Optional[List[str]] = None,
+        max_stale: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached result covering the request, or None on a miss"""
+        entry = self._lookup((symbol.upper(), data_type, period), max_stale)
+        if entry is not None and _covers(entry["metrics"], metrics):
+            return self._hit(entry, metrics)
+        self._count("misses")
+        record_cache_lookup("financial_data", False)
+        return None
+
+    def get_local(
+        self,
+        symbol: str,
+        data_type: str = "quarterly_financials",
+        period: Optional[str] = None,
+        metrics: Optional[List[str]] = None,
+        max_stale: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return a result the in-process tier covers, or None.
+
+        Never touches Redis, so async callers can use it on the event loop
+        before sending get_cached to a worker thread. A miss is not counted;
+        the get_cached call that follows counts it.
+        """
+        entry = self._lookup_local((symbol.upper(), data_type, period), max_stale)
+        if entry is not None and _covers(entry["metrics"], metrics):
+            return self._hit(entry, metrics)
+        return None
+
+    def _hit(self, entry: Dict[str, Any], metrics: Optional[List[str]]) -> Dict[str, Any]:
+        self._count("hits")
+        record_cache_lookup("financial_data", True)
+        return _project(entry["result"], metrics)
+
+    def has_cached(
+        self,
+        symbol: str,
+        data_type: str = "quarterly_financials",
+        period: Optional[str] = None,
+        metrics: Optional[List[str]] = None,
+        max_stale: float = 0.0
+    ) -> bool:
+        """Whether the in-process tier can answer a request now, without counting a lookup"""
+        entry = self.local.get((symbol.upper(), data_type, period), max_stale)
+        return entry is not None and _covers(entry["metrics"], metrics)
+
+    def put(
+        self,
+        symbol: str,
+        data_type: str,
+        period: Optional[str],
+        metrics: Optional[List[str]],
+        result: Optional[Dict[str, Any]]
+    ) -> None:
+        """Store a freshly fetched result; None results are not cached"""
+        if result is not None:
+            self._store((symbol.upper(), data_type, period), result, metrics)
+
+    def get_financial_data(
+        self,
+        symbol: str,
+        data_type: str = "quarterly_financials",
+        period: Optional[str] = None,
+        metrics: Optional[List[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Cached drop-in for agent_tools.get_financial_data"""
+        cached = self.get_cached(symbol, data_type, period, metrics)
+        if cached is not None:
+            return cached
+        result = self.fetch(symbol, data_type, period, metrics)
+        self.put(symbol, data_type, period, metrics, result)
+        return result
+
+    def clear(self) -> None:
+        """Drop every entry from the in-process tier"""
+        self.local.clear()
+
+
+# Shared cache used by the executor
+financial_data_cache = FinancialDataCache.from_env()
@@ -113,6 +113,12 @@ export const useAgentSSE = (): UseAgentSSEReturn => {
               setSessionId(data.session_id);
               break;
 
+            case 'session_restart':
+              // The run is starting over on another worker; its earlier steps are void
+              setSteps([]);
+              setFinalResult(null);
+              break;
+
             case 'step_update':
               setSteps(prevSteps => {
                 const existingStepIndex = prevSteps.findIndex(
@@ -0,0 +1,312 @@
+"""
+Nexus Agent - Shared Upstream HTTP Client
+One pooled httpx.AsyncClient for every tool, with retries and circuit breakers
+"""
+
+from typing import TYPE_CHECKING, Dict, Optional, Any, AsyncIterator
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+import asyncio
+import importlib
+import os
+import random
+import time
+
+from lazy_imports import module_available
+
+if TYPE_CHECKING:
+    import httpx
+
+# httpx (and httpcore under it) is imported when the pool is created, not
+# when this module is, so it stays off the cold-start path
+
+# The h2 package enables HTTP/2 in httpx
+HTTP2_AVAILABLE = module_available("h2")
+
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.1
+RETRY_MAX_DELAY = 2.0
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is open and the call is not attempted"""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"Circuit open for {provider}, retry in {retry_in:.1f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream provider.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast for reset_seconds. It then lets a single trial call through
+    (half-open); success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"  # "closed", "open", "half_open"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may be attempted now"""
+        if self.state == "open":
+            retry_in = self.opened_at + self.reset_seconds - time.monotonic()
+            if retry_in > 0:
+                raise CircuitOpenError(self.provider, retry_in)
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._trial_in_flight:
+                raise CircuitOpenError(self.provider, self.reset_seconds)
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_abandoned(self) -> None:
+        """A call was cancelled by the caller: says nothing about the provider's health"""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._trial_in_flight = False
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, honouring a Retry-After header when given"""
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), RETRY_MAX_DELAY * 4)
+        except ValueError:
+            pass
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+class UpstreamClient:
+    """
+    Shared HTTP client for calls to financial, news and LLM providers.
+
+    Connections are pooled and kept alive for the app's lifetime, so repeat
+    calls to the same provider skip TCP and TLS handshakes. HTTP/2 is used
+    when the h2 package is installed. Each host is limited to
+    MAX_CONNECTIONS_PER_HOST concurrent requests, and each provider (the
+    request host, unless named explicitly) has its own circuit breaker.
+
+    Example:
+        >>> response = await upstream.request("GET", "https://api.example.com/quote", params={"symbol": "NVDA"})
+    """
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        timeout: Optional["httpx.Timeout"] = None,
+        retry_attempts: int = RETRY_ATTEMPTS
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.retry_attempts = retry_attempts
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._client: Optional["httpx.AsyncClient"] = None
+        self.stats: Dict[str, int] = {"requests": 0, "retries": 0, "failures": 0, "short_circuited": 0}
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """The pooled client, created on first use if start() was not called"""
+        if self._client is None or self._client.is_closed:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=self.timeout or httpx.Timeout(30.0, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+                )
+            )
+        return self._client
+
+    async def start(self) -> None:
+        """Create the pool ahead of the first request, importing httpx off the event loop"""
+        await asyncio.to_thread(importlib.import_module, "httpx")
+        self.client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        breaker = self.breakers.get(provider)
+        if breaker is None:
+            breaker = self.breakers[provider] = CircuitBreaker(provider)
+        return breaker
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return limit
+
+    def _check_breaker(self, provider: str) -> CircuitBreaker:
+        breaker = self.breaker(provider)
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            self.stats["short_circuited"] += 1
+            raise
+        return breaker
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        provider: Optional[str] = None,
+        retry: Optional[bool] = None,
+        **kwargs: Any
+    ) -> "httpx.Response":
+        """
+        Send a request through the shared pool.
+
+        Connection errors, timeouts and 429/502/503/504 responses are retried
+        with jittered exponential backoff. Only idempotent methods are retried
+        unless retry=True.
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute request URL
+            provider (Optional[str]): Circuit breaker name, defaults to the URL host
+            retry (Optional[bool]): Override whether the request may be retried
+            **kwargs: Passed through to httpx.AsyncClient.request
+
+        Returns:
+            httpx.Response: The final response; retryable statuses are returned
+            as-is once attempts run out
+
+        Raises:
+            CircuitOpenError: If the provider's circuit is open
+            httpx.HTTPError: If the last attempt failed at the transport level
+        """
+        import httpx
+
+        host = urlsplit(url).netloc
+        breaker = self._check_breaker(provider or host)
+        may_retry = method.upper() in IDEMPOTENT_METHODS if retry is None else retry
+        attempts = self.retry_attempts if may_retry else 1
+
+        try:
+            for attempt in range(attempts):
+                self.stats["requests"] += 1
+                try:
+                    async with self._host_limit(host):
+                        response = await self.client.request(method, url, **kwargs)
+                except (httpx.TransportError, httpx.TimeoutException):
+                    if attempt == attempts - 1:
+                        raise
+                    retry_after = None
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or attempt == attempts - 1:
+                        break
+                    retry_after = response.headers.get("Retry-After")
+
+                self.stats["retries"] += 1
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+        except asyncio.CancelledError:
+            # Tool timeouts, budget deadlines and client disconnects cancel calls
+            breaker.record_abandoned()
+            raise
+        except Exception:
+            self.stats["failures"] += 1
+            breaker.record_failure()
+            raise
+
+        if response.status_code in RETRY_STATUS_CODES or response.status_code >= 500:
+            self.stats["failures"] += 1
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        provider: Optional[str] = None,
+        **kwargs: Any
+    ) -> AsyncIterator["httpx.Response"]:
+        """
+        Open a streaming response through the shared pool.
+
+        Only connecting is retried; once the response has started, failures
+        are raised to the caller since partial output has been consumed.
+        """
+        import httpx
+
+        host = urlsplit(url).netloc
+        breaker = self._check_breaker(provider or host)
+        request = self.client.build_request(method, url, **kwargs)
+
+        async with self._host_limit(host):
+            try:
+                for attempt in range(self.retry_attempts):
+                    self.stats["requests"] += 1
+                    try:
+                        response = await self.client.send(request, stream=True)
+                        break
+                    except (httpx.ConnectError, httpx.ConnectTimeout):
+                        if attempt == self.retry_attempts - 1:
+                            raise
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(backoff_delay(attempt))
+            except asyncio.CancelledError:
+                breaker.record_abandoned()
+                raise
+            except Exception:
+                self.stats["failures"] += 1
+                breaker.record_failure()
+                raise
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            try:
+                yield response
+            finally:
+                await response.aclose()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Request counters and the state of every circuit breaker"""
+        return {
+            **self.stats,
+            "http2": HTTP2_AVAILABLE,
+            "breakers": {name: {"state": b.state, "failures": b.failures} for name, b in self.breakers.items()},
+        }
+
+
+upstream = UpstreamClient()
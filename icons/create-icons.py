@@ -1,57 +1,194 @@
 #!/usr/bin/env python3
 """
 Simple script to create placeholder icons for the Chrome extension
+
+Run without arguments to write the default icon-<size>.png set here. For
+white-label builds, pass a JSON list of themes and every theme's icons are
+rendered across a process pool into <out>/<theme name>/:
+
+    python create-icons.py --themes themes.json --out build/icons
+
+    [{"name": "acme", "top": "#667eea", "bottom": "#764ba2", "glyph": "A",
+      "sizes": [16, 32, 48, 128]}]
+
+Icons whose inputs have not changed since the last run are skipped.
 """
 
 from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import argparse
+import hashlib
+import json
+import numpy as np
 import os
 
-def create_icon(size, filename):
-    # Create a new image with a gradient background
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Draw gradient background (simplified)
-    for y in range(size):
-        color = (
-            int(102 + (118 - 102) * y / size),  # Red: 102 -> 118
-            int(126 + (75 - 126) * y / size),   # Green: 126 -> 75  
-            int(234 + (162 - 234) * y / size),  # Blue: 234 -> 162
-            255
-        )
-        draw.line([(0, y), (size, y)], fill=color)
-    
-    # Draw a simple "F" for FACE
-    try:
-        # Try to use a system font
-        font_size = size // 2
-        font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)
-    except:
+# Bump when rendering changes, so existing icons are redrawn
+RENDER_VERSION = 2
+
+DEFAULT_THEME = {
+    "name": "default",
+    "top": (102, 126, 234),
+    "bottom": (118, 75, 162),
+    "glyph": "F",  # "F" for FACE
+    "sizes": [16, 32, 48, 128],
+}
+
+FONT_CANDIDATES = ["/System/Library/Fonts/Arial.ttf", "arial.ttf"]
+
+# Rendering record of the icons in an output directory, by file name
+MANIFEST_NAME = ".icons-manifest.json"
+
+
+def parse_color(color):
+    """(r, g, b) from a "#rrggbb" string or a list of three ints"""
+    if isinstance(color, str):
+        color = color.lstrip("#")
+        return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+    return tuple(int(channel) for channel in color)
+
+
+@lru_cache(maxsize=None)
+def load_font(font_size):
+    # Try to use a system font; loaded once per size in each worker
+    for path in FONT_CANDIDATES:
         try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
-    
-    # Draw the "F" letter
-    text = "F"
-    bbox = draw.textbbox((0, 0), text, font=font)
+            return ImageFont.truetype(path, font_size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def gradient(size, top, bottom):
+    """Vertical gradient from top to bottom as a size x size RGBA array"""
+    rows = np.arange(size, dtype=np.float64)[:, None]
+    top = np.array(top, dtype=np.float64)
+    bottom = np.array(bottom, dtype=np.float64)
+    rgb = (top + (bottom - top) * rows / size).astype(np.uint8)
+    rgba = np.concatenate([rgb, np.full((size, 1), 255, dtype=np.uint8)], axis=1)
+    return np.ascontiguousarray(np.broadcast_to(rgba[:, None, :], (size, size, 4)))
+
+
+def render_icon(size, top=DEFAULT_THEME["top"], bottom=DEFAULT_THEME["bottom"], glyph=DEFAULT_THEME["glyph"]):
+    img = Image.fromarray(gradient(size, top, bottom), "RGBA")
+    draw = ImageDraw.Draw(img)
+    font = load_font(size // 2)
+
+    # Center the glyph
+    bbox = draw.textbbox((0, 0), glyph, font=font)
     text_width = bbox[2] - bbox[0]
     text_height = bbox[3] - bbox[1]
-    
+
     x = (size - text_width) // 2
     y = (size - text_height) // 2
-    
-    draw.text((x, y), text, fill=(255, 255, 255, 255), font=font)
-    
-    # Save the image
-    img.save(filename, 'PNG')
-    print(f"Created {filename} ({size}x{size})")
+
+    draw.text((x, y), glyph, fill=(255, 255, 255, 255), font=font)
+    return img
+
+
+def create_icon(size, filename, top=DEFAULT_THEME["top"], bottom=DEFAULT_THEME["bottom"], glyph=DEFAULT_THEME["glyph"]):
+    render_icon(size, top, bottom, glyph).save(filename, 'PNG')
+    return filename
+
+
+def fingerprint(size, top, bottom, glyph):
+    """Hash of everything an icon is rendered from"""
+    inputs = [RENDER_VERSION, size, list(top), list(bottom), glyph, FONT_CANDIDATES]
+    return hashlib.sha256(json.dumps(inputs).encode()).hexdigest()[:16]
+
+
+def plan_jobs(themes, out_dir):
+    """(size, filename, top, bottom, glyph, fingerprint) for every icon of every theme"""
+    jobs = []
+    for theme in themes:
+        theme = {**DEFAULT_THEME, **theme}
+        top, bottom = parse_color(theme["top"]), parse_color(theme["bottom"])
+        theme_dir = os.path.join(out_dir, theme["name"])
+        for size in theme["sizes"]:
+            filename = os.path.join(theme_dir, f"icon-{size}.png")
+            jobs.append((size, filename, top, bottom, theme["glyph"], fingerprint(size, top, bottom, theme["glyph"])))
+    return jobs
+
+
+def _render_job(job):
+    size, filename, top, bottom, glyph, _ = job
+    return create_icon(size, filename, top, bottom, glyph)
+
+
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def create_icon_batch(themes, out_dir, workers=None, force=False):
+    """
+    Render every theme's icons, fanned out across a process pool.
+
+    Returns:
+        (rendered, skipped): file names written, and file names left as they
+        were because their inputs matched the manifest
+    """
+    jobs = plan_jobs(themes, out_dir)
+    manifests = {}
+    pending, skipped = [], []
+    for job in jobs:
+        directory, name = os.path.split(job[1])
+        manifest = manifests.setdefault(directory, _read_manifest(directory))
+        if not force and manifest.get(name) == job[5] and os.path.exists(job[1]):
+            skipped.append(job[1])
+        else:
+            pending.append(job)
+
+    for directory in {os.path.dirname(job[1]) for job in pending}:
+        os.makedirs(directory, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pending) < 2:
+        rendered = [_render_job(job) for job in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(pending) // (workers * 4))
+            rendered = list(pool.map(_render_job, pending, chunksize=chunksize))
+
+    # Only record icons once they are written, so an interrupted run redraws them
+    for job in pending:
+        directory, name = os.path.split(job[1])
+        manifests[directory][name] = job[5]
+    for directory in {os.path.dirname(job[1]) for job in pending}:
+        _write_manifest(directory, manifests[directory])
+    return rendered, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--themes", help="JSON file with a list of themes (name, top, bottom, glyph, sizes)")
+    parser.add_argument("--out", default=".", help="Output directory; each theme gets a subdirectory")
+    parser.add_argument("--workers", type=int, default=None, help="Processes to render with (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Redraw icons even if their inputs are unchanged")
+    args = parser.parse_args()
+
+    if args.themes is None:
+        for size in DEFAULT_THEME["sizes"]:
+            filename = create_icon(size, os.path.join(args.out, f"icon-{size}.png"))
+            print(f"Created {filename} ({size}x{size})")
+        print("All icons created successfully!")
+        return
+
+    with open(args.themes) as f:
+        themes = json.load(f)
+    rendered, skipped = create_icon_batch(themes, args.out, args.workers, args.force)
+    print(f"Created {len(rendered)} icons for {len(themes)} themes, {len(skipped)} unchanged")
+
 
 if __name__ == "__main__":
-    sizes = [16, 32, 48, 128]
-    
-    for size in sizes:
-        filename = f"icon-{size}.png"
-        create_icon(size, filename)
-    
-    print("All icons created successfully!")
\ No newline at end of file
+    main()
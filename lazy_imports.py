@@ -0,0 +1,59 @@
+"""
+Nexus Agent - Deferred Imports
+Clients whose library is imported and constructed on first use instead of at startup
+"""
+
+from typing import Any, Callable, Optional
+import importlib
+import importlib.util
+import threading
+
+
+def module_available(name: str) -> bool:
+    """Whether a top-level package is installed, without importing it"""
+    return importlib.util.find_spec(name) is not None
+
+
+class LazyClient:
+    """
+    Stand-in for a client from a library that is slow to import.
+
+    The module is imported and build(module) is called on first attribute
+    access; every attribute is then forwarded to the real client. Until
+    then the proxy costs nothing, so creating it at import time keeps the
+    library off the cold-start path. load() can be called ahead of time,
+    e.g. from a background warmup task.
+
+    Example:
+        >>> client = LazyClient("redis.asyncio", lambda redis: redis.Redis.from_url(url))
+        >>> await client.ping()  # imports redis.asyncio and connects here
+    """
+
+    def __init__(self, module: str, build: Callable[[Any], Any]):
+        self._module = module
+        self._build = build
+        self._client: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def module(self) -> str:
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._client is not None
+
+    def load(self) -> Any:
+        """The real client, built on first call"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build(importlib.import_module(self._module))
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        state = repr(self._client) if self._client is not None else "not loaded"
+        return f"<LazyClient {self._module}: {state}>"
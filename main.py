@@ -2,17 +2,70 @@
 FastAPI Backend - Nexus Agent API Endpoints
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Header
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, List
 import asyncio
-import json
+import time
 from datetime import datetime
 import uuid
 
+from agent_executor import ReActExecutor
+from app_factory import startup_profile, warm_up
+from budget import RunBudget, tool_costs
+from financial_batch import financial_data_coalescer
+from financial_cache import financial_data_cache
+from http_client import upstream
+from metrics import observe_execution, observe_first_event, render_latest
+from plan_cache import plan_cache
+from prefetch import SpeculativePrefetcher, prefetch_stats
+from response_cache import response_cache
+from scheduler import QueueFullError, Ticket, agent_scheduler
+from sentiment_index import news_ingestor
+from session_store import session_store
+from sse import HEARTBEAT_FRAME, encode_batch, now_iso
+from work_queue import AgentWorkerPool, work_queue
+
 app = FastAPI(title="Nexus Agent API", version="1.0.0")
 
+# Background agent runs, kept referenced so they are not garbage collected
+_session_tasks: set = set()
+
+# Consumers of the shared work queue in multi-worker mode (AGENT_WORK_QUEUE=redis)
+worker_pool: Optional[AgentWorkerPool] = None
+
+# Background warmup of deferred imports and connection pools
+_warmup_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_warmup():
+    """Create the upstream pool and open Redis connections without delaying startup"""
+    global _warmup_task
+    _warmup_task = asyncio.create_task(warm_up())
+
+@app.on_event("startup")
+async def start_news_ingest():
+    """Keep per-symbol sentiment aggregates current as news arrives"""
+    await news_ingestor.start()
+
+@app.on_event("startup")
+async def start_worker_pool():
+    """In multi-worker mode, take agent runs from the shared queue on this worker too"""
+    global worker_pool
+    if work_queue is not None:
+        worker_pool = AgentWorkerPool(work_queue, run_queued_session, agent_scheduler.max_concurrent)
+        await worker_pool.start()
+
+@app.on_event("shutdown")
+async def close_upstream_pool():
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+    if worker_pool is not None:
+        await worker_pool.stop()
+    await news_ingestor.stop()
+    await upstream.close()
+
 # Pydantic Models for Request/Response
 class AgentQueryRequest(BaseModel):
     """
@@ -29,7 +82,9 @@ class AgentQueryRequest(BaseModel):
     )
     preferences: Optional[Dict[str, Any]] = Field(
         None,
-        description="User preferences for tone, format, etc."
+        description="User preferences for tone, format, etc. latency_budget_seconds and "
+                    "cost_budget_usd bound the run; it may use cheaper tool variants or "
+                    "return a partial result to stay within them"
     )
     streaming: bool = Field(
         True,
@@ -45,7 +100,7 @@ class AgentStep(BaseModel):
     action: Dict[str, Any]
     observation: str
     timestamp: datetime
-    status: str  # "in_progress", "completed", "error"
+    status: str  # "in_progress", "completed", "error", "skipped"
 
 class AgentResponse(BaseModel):
     """
@@ -78,131 +133,318 @@ async def run_nexus_agent(request: AgentQueryRequest):
     
     session_id = str(uuid.uuid4())
     start_time = datetime.now()
+    request_started = time.perf_counter()
     
-    if request.streaming:
-        # Return SSE stream for real-time updates
-        return StreamingResponse(
-            stream_agent_execution(session_id, request),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Session-ID": session_id
-            }
+    try:
+        budget = RunBudget.from_preferences(request.preferences)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    # A near-duplicate of a recent query is answered by replaying that run
+    cached = response_cache.lookup(request.query, request.user_id, request.preferences)
+    if cached is not None:
+        if request.streaming:
+            await replay_cached_session(session_id, request, cached)
+            return sse_response(session_id, stream_agent_execution(session_id, request_started=request_started))
+        response = AgentResponse(**response_cache.replay_response(cached, session_id, request.query))
+        return Response(content=response.model_dump_json(), media_type="application/json", headers={"X-Cache": "hit"})
+    
+    if request.streaming and work_queue is not None:
+        # Multi-worker mode: any worker may run the session; events reach this
+        # worker's SSE connection through the shared session store
+        await submit_agent_session(session_id, request, budget)
+        return sse_response(session_id, stream_agent_execution(session_id, request_started=request_started))
+    
+    # Shed load when the scheduler queue is full
+    try:
+        ticket = agent_scheduler.admit(request.user_id)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many concurrent agent runs, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
         )
+    
+    if request.streaming:
+        # Run the agent in the background so a dropped connection does not lose the work
+        try:
+            await start_agent_session(session_id, request, ticket, budget)
+        except BaseException:
+            # The background run never started, so nothing else will free the slot
+            ticket.release()
+            raise
+        return sse_response(session_id, stream_agent_execution(session_id, request_started=request_started))
     else:
         # Return complete response after execution
+        prefetcher = SpeculativePrefetcher(request.query)
         try:
-            result = await execute_agent_workflow(session_id, request)
-            return result
+            async with ticket:
+                result = await execute_agent_workflow(session_id, request, prefetcher, budget)
+            if all(step.status == "completed" for step in result.steps):
+                response_cache.store(
+                    request.query, request.user_id, request.preferences, response=result.model_dump(mode="json")
+                )
+            # Pydantic's native JSON encoder skips FastAPI's generic jsonable_encoder pass
+            return Response(content=result.model_dump_json(), media_type="application/json")
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            prefetcher.close()
 
-async def stream_agent_execution(session_id: str, request: AgentQueryRequest):
-    """
-    Generator function that streams real-time agent progress using Server-Sent Events (SSE).
+def sse_response(session_id: str, frames) -> StreamingResponse:
+    """Wrap an SSE frame generator in a streaming response"""
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Session-ID": session_id
+        }
+    )
+
+async def start_agent_session(
+    session_id: str,
+    request: AgentQueryRequest,
+    ticket: Ticket,
+    budget: Optional[RunBudget] = None
+) -> None:
+    """Register a session and run its agent workflow as a background task"""
+    status = "running" if ticket.state == "running" else "queued"
+    await session_store.create(session_id, request.query, request.user_id, status=status)
+    task = asyncio.create_task(run_agent_session(session_id, request, ticket, budget))
+    _session_tasks.add(task)
+    task.add_done_callback(_session_tasks.discard)
+
+async def submit_agent_session(session_id: str, request: AgentQueryRequest, budget: Optional[RunBudget] = None) -> None:
+    """Register a session and put its run on the shared work queue"""
+    depth = await work_queue.depth()
+    if depth >= agent_scheduler.max_queue:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many concurrent agent runs, please retry later",
+            headers={"Retry-After": str(agent_scheduler.retry_after(depth))}
+        )
+    await session_store.create(session_id, request.query, request.user_id, status="queued")
+    await session_store.append(session_id, {
+        "type": "queued",
+        "session_id": session_id,
+        "position": depth + 1,
+        "timestamp": now_iso()
+    })
+    submitted = await work_queue.submit({
+        "session_id": session_id,
+        "user_id": request.user_id,
+        "request": request.model_dump(),
+        # The budget's deadline counts from acceptance here, not from when a worker takes the job
+        "accepted_at": budget.started if budget is not None else time.time()
+    }, user_limit=agent_scheduler.max_per_user)
+    if not submitted:
+        # The per-user cap is counted in the shared queue, across every worker
+        await session_store.update_meta(session_id, status="rejected")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many agent runs for this user, please retry later",
+            headers={"Retry-After": str(agent_scheduler.retry_after(depth))}
+        )
+
+async def replay_cached_session(session_id: str, request: AgentQueryRequest, cached: Dict[str, Any]) -> None:
+    """Register a session whose event log is a cached run's events"""
+    await session_store.create(session_id, request.query, request.user_id, status="running")
+    for event in response_cache.replay_events(cached, session_id):
+        await session_store.append(session_id, event)
+    await session_store.update_meta(session_id, status="completed")
+
+async def run_queued_session(job: Dict[str, Any]) -> None:
+    """Work queue handler: execute a session submitted by any worker"""
+    meta = await session_store.get_meta(job["session_id"])
+    if meta is not None and meta.get("status") not in ("queued", "running"):
+        return  # redelivered after the run finished but before it was acknowledged
+    deliveries = job.get("deliveries", 1)
+    if deliveries > 1:
+        # The worker that ran an earlier delivery died; clients discard what it streamed
+        await session_store.append(job["session_id"], {
+            "type": "session_restart",
+            "session_id": job["session_id"],
+            "attempt": deliveries,
+            "timestamp": now_iso()
+        })
+    request = AgentQueryRequest(**job["request"])
+    budget = RunBudget.from_preferences(request.preferences, started=job.get("accepted_at"))
+    await execute_agent_session(job["session_id"], request, budget=budget)
+
+async def run_agent_session(
+    session_id: str,
+    request: AgentQueryRequest,
+    ticket: Ticket,
+    budget: Optional[RunBudget] = None
+) -> None:
+    """Wait for a scheduler slot, then execute the workflow"""
+    # Data the query obviously needs is fetched while the run waits its turn
+    prefetcher = SpeculativePrefetcher(request.query)
+    try:
+        async for position in ticket.wait_turn():
+            await session_store.append(session_id, {
+                "type": "queued",
+                "session_id": session_id,
+                "position": position,
+                "timestamp": now_iso()
+            })
+        await execute_agent_session(session_id, request, prefetcher, budget)
+    finally:
+        prefetcher.close()
+        ticket.release()
+
+async def execute_agent_session(
+    session_id: str,
+    request: AgentQueryRequest,
+    prefetcher: Optional[SpeculativePrefetcher] = None,
+    budget: Optional[RunBudget] = None
+) -> None:
+    """Execute the workflow, appending every event to the session log"""
+    await session_store.update_meta(session_id, status="running")
     
-    SSE was chosen over WebSockets because:
-    1. Simpler implementation for one-way communication (server -> client)
-    2. Automatic reconnection handling by browsers
-    3. Better compatibility with HTTP infrastructure (proxies, load balancers)
-    4. No need for bidirectional communication during execution
-    5. Built-in browser support without additional libraries
+    owned = prefetcher is None
+    if owned:
+        prefetcher = SpeculativePrefetcher(request.query)
+    try:
+        status = "completed"
+        events = []
+        cacheable = True
+        async for event in agent_event_stream(session_id, request, prefetcher, budget):
+            if event["type"] == "error":
+                status = "error"
+            elif event["type"] == "execution_complete":
+                status = event["status"]
+            if event.get("status") in ("error", "skipped"):
+                cacheable = False
+            events.append(event)
+            await session_store.append(session_id, event)
+        await session_store.update_meta(session_id, status=status)
+        if status == "completed" and cacheable:
+            response_cache.store(request.query, request.user_id, request.preferences, events=events)
+    finally:
+        if owned:
+            prefetcher.close()
+
+async def agent_event_stream(
+    session_id: str,
+    request: AgentQueryRequest,
+    prefetcher: Optional[SpeculativePrefetcher] = None,
+    budget: Optional[RunBudget] = None
+):
+    """
+    Generator of the events produced while executing a query.
     
     Args:
         session_id (str): Unique session identifier
         request (AgentQueryRequest): The original query request
+        prefetcher (Optional[SpeculativePrefetcher]): Speculative calls for this run
+        budget (Optional[RunBudget]): Latency and cost limits for this run
     
     Yields:
-        str: Server-sent event formatted strings with agent progress
+        Dict[str, Any]: session_start, step_update and text_delta events, then
+        execution_complete or error
     """
     
+    start_time = datetime.now()
     try:
         # Send initial connection confirmation
-        yield f"data: {json.dumps({'type': 'session_start', 'session_id': session_id, 'query': request.query})}\n\n"
+        yield {'type': 'session_start', 'session_id': session_id, 'query': request.query}
         
-        # Simulate ReAct execution steps (in production, this would call actual tools)
-        steps = [
-            {
-                "step": 1,
-                "thought": "I need to gather Q3 2024 financial data for NVIDIA first to compare revenue growth.",
-                "action": {"tool": "get_financial_data", "symbol": "NVDA", "period": "Q3 2024"},
-                "status": "in_progress"
-            },
-            {
-                "step": 1,
-                "observation": "Retrieved NVIDIA Q3 2024: Revenue $35.08B, +94% YoY growth",
-                "status": "completed"
-            },
-            {
-                "step": 2,
-                "thought": "Now I need AMD's Q3 2024 data for comparison.",
-                "action": {"tool": "get_financial_data", "symbol": "AMD", "period": "Q3 2024"},
-                "status": "in_progress"
-            },
-            {
-                "step": 2,
-                "observation": "Retrieved AMD Q3 2024: Revenue $6.82B, +18% YoY growth",
-                "status": "completed"
-            },
-            {
-                "step": 3,
-                "thought": "I need to analyze risks for both stocks to provide balanced recommendation.",
-                "action": {"tool": "analyze_investment_risks", "symbols": ["NVDA", "AMD"]},
-                "status": "in_progress"
-            },
-            {
-                "step": 3,
-                "observation": "Risk analysis: NVDA (35/100 risk) - AI bubble concerns; AMD (45/100 risk) - competition",
-                "status": "completed"
-            },
-            {
-                "step": 4,
-                "thought": "Now I'll generate the email draft with comparison and recommendation.",
-                "action": {"tool": "generate_text_output", "content_type": "email_draft"},
-                "status": "in_progress"
-            },
-            {
-                "step": 4,
-                "observation": "Generated professional email (247 words) with NVIDIA buy recommendation",
-                "status": "completed"
-            }
-        ]
+        # Execute the plan, streaming each step as its result arrives
+        plan = plan_cache.plan_for(request.query)
+        if prefetcher is not None:
+            prefetcher.update(plan)
+        executor = ReActExecutor(plan, prefetcher=prefetcher, budget=budget)
+        async for step_data in executor.run():
+            if step_data["status"] == "streaming":
+                yield {'type': 'text_delta', 'step': step_data["step"], 'delta': step_data["delta"]}
+            else:
+                yield {'type': 'step_update', **step_data, 'timestamp': now_iso()}
         
-        # Stream each step with realistic delays
-        for step_data in steps:
-            yield f"data: {json.dumps({'type': 'step_update', **step_data, 'timestamp': datetime.now().isoformat()})}\n\n"
-            await asyncio.sleep(1.5)  # Simulate processing time
+        final_result = executor.final_result()
+        status = budget_outcome(executor, final_result)
+        execution_time = (datetime.now() - start_time).total_seconds()
+        observe_execution("streaming", status, execution_time)
         
         # Send final result
-        final_result = {
+        yield {
             "type": "execution_complete",
             "session_id": session_id,
-            "final_result": {
-                "comparison": "NVIDIA: $35.08B (+94%) vs AMD: $6.82B (+18%)",
-                "recommendation": "NVIDIA - Superior growth and AI market position",
-                "email_draft": "Professional email generated with risk analysis and buy recommendation",
-                "key_risks": {
-                    "NVIDIA": "AI bubble concerns and China export restrictions",
-                    "AMD": "CPU market competition and datacenter dependency"
-                }
-            },
-            "execution_time": "6.2 seconds",
-            "status": "completed"
+            "final_result": final_result,
+            "execution_time": f"{execution_time:.1f} seconds",
+            "status": status
         }
         
-        yield f"data: {json.dumps(final_result)}\n\n"
-        
     except Exception as e:
-        error_data = {
+        observe_execution("streaming", "error", (datetime.now() - start_time).total_seconds())
+        yield {
             "type": "error",
             "session_id": session_id,
             "error": str(e),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
-        yield f"data: {json.dumps(error_data)}\n\n"
 
-async def execute_agent_workflow(session_id: str, request: AgentQueryRequest) -> AgentResponse:
+async def stream_agent_execution(session_id: str, last_event_id: int = 0, request_started: Optional[float] = None):
+    """
+    Generator function that streams real-time agent progress using Server-Sent Events (SSE).
+    
+    SSE was chosen over WebSockets because:
+    1. Simpler implementation for one-way communication (server -> client)
+    2. Automatic reconnection handling by browsers
+    3. Better compatibility with HTTP infrastructure (proxies, load balancers)
+    4. No need for bidirectional communication during execution
+    5. Built-in browser support without additional libraries
+    
+    Events are read from the session's log rather than produced here, and each
+    frame carries its log position as the SSE id. A client that reconnects with
+    Last-Event-ID therefore receives only the events it missed. Events already
+    waiting in the log are sent as one chunk, and an SSE comment heartbeat is
+    sent whenever the stream is idle for HEARTBEAT_SECONDS.
+    
+    Args:
+        session_id (str): Unique session identifier
+        last_event_id (int): Id of the last event the client already received
+        request_started (Optional[float]): time.perf_counter() at request arrival,
+            used to record time-to-first-event
+    
+    Yields:
+        bytes: Server-sent event frames with agent progress
+    """
+    
+    async for events in session_store.tail_batches(session_id, last_event_id):
+        if not events:
+            yield HEARTBEAT_FRAME
+            continue
+        for chunk in encode_batch(events):
+            yield chunk
+        if request_started is not None:
+            observe_first_event(time.perf_counter() - request_started)
+            request_started = None
+
+def budget_outcome(executor: ReActExecutor, final_result: Dict[str, Any]) -> str:
+    """
+    Status of a finished run: "completed", or "partial" if its budget cut it short.
+    
+    Budgeted runs report the budget's use in final_result["budget"]; partial
+    runs also set final_result["partial"] and list the steps that finished.
+    """
+    if executor.budget is None:
+        return "completed"
+    final_result["budget"] = executor.budget.snapshot()
+    if not executor.budget.partial:
+        return "completed"
+    final_result["partial"] = True
+    final_result["completed_steps"] = sorted(executor.observations)
+    return "partial"
+
+async def execute_agent_workflow(
+    session_id: str,
+    request: AgentQueryRequest,
+    prefetcher: Optional[SpeculativePrefetcher] = None,
+    budget: Optional[RunBudget] = None
+) -> AgentResponse:
     """
     Execute the complete agent workflow and return final results.
     
@@ -214,6 +456,8 @@ async def execute_agent_workflow(session_id: str, request: AgentQueryRequest) ->
     Args:
         session_id (str): Unique session identifier
         request (AgentQueryRequest): The query request
+        prefetcher (Optional[SpeculativePrefetcher]): Speculative calls for this run
+        budget (Optional[RunBudget]): Latency and cost limits for this run
     
     Returns:
         AgentResponse: Complete execution results
@@ -221,29 +465,32 @@ async def execute_agent_workflow(session_id: str, request: AgentQueryRequest) ->
     
     start_time = datetime.now()
     
-    # In production, this would execute the actual ReAct workflow
-    # For now, return mock results matching the expected structure
+    plan = plan_cache.plan_for(request.query)
+    if prefetcher is not None:
+        prefetcher.update(plan)
+    executor = ReActExecutor(plan, prefetcher=prefetcher, budget=budget)
+    async for _ in executor.run():
+        pass
     
+    # Steps are held as compact trace records; API models are only built here
+    trace = executor.trace
     steps = [
         AgentStep(
-            step_number=1,
-            thought="I need to gather Q3 2024 financial data for NVIDIA and AMD to compare revenue growth.",
-            action={"tool": "get_financial_data", "symbol": "NVDA", "period": "Q3 2024"},
-            observation="Retrieved NVIDIA Q3 2024: Revenue $35.08B with 94% year-over-year growth",
-            timestamp=datetime.now(),
-            status="completed"
-        ),
-        # Additional steps would be added here...
+            step_number=record.step,
+            thought=record.thought,
+            action=record.action,
+            observation=record.error if record.error is not None else record.observation,
+            timestamp=trace.timestamp(record.finished_ns),
+            status=record.status
+        )
+        for record in trace.by_step()
     ]
     
-    final_result = {
-        "comparison_summary": "NVIDIA significantly outperformed AMD in Q3 2024 revenue growth",
-        "recommendation": "NVIDIA is the better buy based on superior growth metrics",
-        "email_draft_generated": True,
-        "risks_analyzed": True
-    }
+    final_result = executor.final_result()
+    status = budget_outcome(executor, final_result)
     
     execution_time = (datetime.now() - start_time).total_seconds()
+    observe_execution("sync", "error" if executor.errors else status, execution_time)
     
     return AgentResponse(
         session_id=session_id,
@@ -251,17 +498,90 @@ async def execute_agent_workflow(session_id: str, request: AgentQueryRequest) ->
         steps=steps,
         final_result=final_result,
         execution_time_seconds=execution_time,
-        status="completed"
+        status=status
     )
 
+# Prometheus scrape endpoint
+@app.get("/metrics")
+async def prometheus_metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+# Resume endpoint for SSE clients that lost their connection
+@app.get("/api/agent/stream/{session_id}")
+async def resume_agent_stream(session_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Reconnect to a running or finished session's event stream.
+    
+    Browsers send the Last-Event-ID header automatically when an EventSource
+    reconnects; only events after that id are replayed.
+    """
+    request_started = time.perf_counter()
+    if await session_store.get_meta(session_id) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    try:
+        after_id = int(last_event_id or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+    return sse_response(session_id, stream_agent_execution(session_id, after_id, request_started))
+
 # Agent status endpoint
 @app.get("/api/agent/status/{session_id}")
-async def get_agent_status(session_id: str):
-    """Get the status of a specific agent execution session"""
-    # In production, this would query session storage (Redis, database)
-    return {"session_id": session_id, "status": "not_implemented"}
+async def get_agent_status(session_id: str, after: int = 0):
+    """Get the status of a specific agent execution session, served from its event log"""
+    meta = await session_store.get_meta(session_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    events = await session_store.read(session_id, after)
+    final_result = next(
+        (event.get("final_result") for _, event in reversed(events) if event.get("type") == "execution_complete"),
+        None
+    )
+    return {
+        "session_id": session_id,
+        **meta,
+        "last_event_id": events[-1][0] if events else after,
+        "events": [{"id": event_id, **event} for event_id, event in events],
+        "final_result": final_result
+    }
+
+# Cache statistics endpoint
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters for the financial data, plan and response caches, coalescer and prefetcher, and news sentiment ingest"""
+    return {
+        "financial_data": {**financial_data_cache.stats, "entries": len(financial_data_cache.local)},
+        "coalescing": financial_data_coalescer.flights.stats,
+        "plans": {**plan_cache.stats, "hit_rate": plan_cache.hit_rate, "templates": len(plan_cache.plans)},
+        "prefetch": prefetch_stats.snapshot(),
+        "responses": response_cache.snapshot(),
+        "sentiment": news_ingestor.snapshot()
+    }
+
+# Upstream client metrics endpoint
+@app.get("/api/upstream/stats")
+async def get_upstream_stats():
+    """Request, retry and circuit breaker state for upstream providers"""
+    return upstream.snapshot()
+
+# Startup diagnostics endpoint
+@app.get("/api/diagnostics/startup")
+async def get_startup_diagnostics():
+    """Cold start breakdown: startup phases, per-module import times and background warmup"""
+    return startup_profile.snapshot()
+
+# Scheduler metrics endpoint
+@app.get("/api/scheduler/stats")
+async def get_scheduler_stats():
+    """Queue depth, running runs and wait-time statistics for the agent scheduler, and per-tool run estimates"""
+    stats = agent_scheduler.snapshot()
+    stats["tool_estimates"] = tool_costs.snapshot()
+    if work_queue is not None:
+        stats["shared_queue"] = {"depth": await work_queue.depth(), **worker_pool.snapshot()}
+    return stats
@@ -0,0 +1,134 @@
+"""
+Nexus Agent - Prometheus Instrumentation
+Hot-path metrics for tool calls, ReAct steps, SSE latency and scheduling
+"""
+
+from typing import Dict, Tuple, Any, Callable
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+# Buckets in seconds, wide enough for cached lookups through slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+TOOL_CALL_SECONDS = Histogram(
+    "nexus_tool_call_seconds",
+    "Latency of agent tool calls",
+    ["tool", "status"],
+    buckets=LATENCY_BUCKETS
+)
+TOOL_CALL_ERRORS = Counter(
+    "nexus_tool_call_errors_total",
+    "Agent tool calls that failed or timed out",
+    ["tool", "kind"]
+)
+CACHE_REQUESTS = Counter(
+    "nexus_cache_requests_total",
+    "Cache lookups by result",
+    ["cache", "result"]
+)
+STEP_SECONDS = Histogram(
+    "nexus_react_step_seconds",
+    "Duration of ReAct steps from dispatch to observation",
+    ["tool", "status"],
+    buckets=LATENCY_BUCKETS
+)
+FIRST_EVENT_SECONDS = Histogram(
+    "nexus_sse_time_to_first_event_seconds",
+    "Time from request arrival to the first SSE frame",
+    buckets=LATENCY_BUCKETS
+)
+EXECUTION_SECONDS = Histogram(
+    "nexus_agent_execution_seconds",
+    "Total agent execution time (execution_time_seconds)",
+    ["mode", "status"],
+    buckets=LATENCY_BUCKETS
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "nexus_scheduler_wait_seconds",
+    "Time agent runs spend queued before starting",
+    buckets=LATENCY_BUCKETS
+)
+
+# Label lookups take a lock and validate label values, so bound children are
+# cached per label tuple to keep the per-call cost to a single observe()
+_children: Dict[Tuple[Any, ...], Any] = {}
+
+
+def _child(metric: Any, *labels: str) -> Any:
+    key = (metric, *labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+def observe_tool_call(tool: str, status: str, seconds: float) -> None:
+    """Record one tool call; status is "ok", "error" or "timeout" """
+    _child(TOOL_CALL_SECONDS, tool, status).observe(seconds)
+    if status != "ok":
+        _child(TOOL_CALL_ERRORS, tool, status).inc()
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    _child(CACHE_REQUESTS, cache, "hit" if hit else "miss").inc()
+
+
+def observe_step(tool: str, status: str, seconds: float) -> None:
+    _child(STEP_SECONDS, tool, status).observe(seconds)
+
+
+def observe_first_event(seconds: float) -> None:
+    FIRST_EVENT_SECONDS.observe(seconds)
+
+
+def observe_execution(mode: str, status: str, seconds: float) -> None:
+    """Record a finished run; mode is "streaming" or "sync" """
+    _child(EXECUTION_SECONDS, mode, status).observe(seconds)
+
+
+def observe_queue_wait(seconds: float) -> None:
+    QUEUE_WAIT_SECONDS.observe(seconds)
+
+
+def register_gauge(name: str, description: str, read: Callable[[], float]) -> Callable[[], None]:
+    """
+    Expose a value of this process's state.
+
+    Gauge.set_function is not supported with PROMETHEUS_MULTIPROC_DIR, where
+    scrapes read the values workers wrote to disk, so the gauge is set
+    instead: call the returned function whenever read() may have changed.
+    Across workers, the values of live processes are summed.
+    """
+    gauge = Gauge(name, description, multiprocess_mode="livesum")
+
+    def update() -> None:
+        gauge.set(read())
+
+    update()
+    return update
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """
+    Render every metric in the Prometheus text format.
+
+    With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR so samples
+    from all worker processes are aggregated into one scrape; gauges from
+    register_gauge then report the sum over live workers.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,275 @@
+"""
+Nexus Agent - Plan Compilation and Reuse
+Caches tool plans per query template and re-binds them to new tickers
+"""
+
+from typing import Dict, List, Optional, Any, Callable, Tuple
+import copy
+import re
+
+from agent_executor import TOOL_REGISTRY, load_plan
+from financial_cache import LRUCache
+from metrics import record_cache_lookup
+
+PLAN_TTL_SECONDS = 24 * 3600
+
+# Company names recognised in queries, mapped to their tickers. Names match
+# case-sensitively, so "apple" or "meta" in lower case are plain words
+COMPANY_TICKERS: Dict[str, str] = {
+    "NVIDIA": "NVDA",
+    "Nvidia": "NVDA",
+    "AMD": "AMD",
+    "Advanced Micro Devices": "AMD",
+    "Intel": "INTC",
+    "Apple": "AAPL",
+    "Microsoft": "MSFT",
+    "Alphabet": "GOOGL",
+    "Google": "GOOGL",
+    "Amazon": "AMZN",
+    "Meta": "META",
+    "Tesla": "TSLA",
+    "Broadcom": "AVGO",
+    "Qualcomm": "QCOM",
+    "TSMC": "TSM",
+    "Netflix": "NFLX",
+    "Oracle": "ORCL",
+    "Salesforce": "CRM",
+}
+TICKER_NAMES: Dict[str, str] = {}
+for _name, _ticker in COMPANY_TICKERS.items():
+    TICKER_NAMES.setdefault(_ticker, _name)
+
+# Symbols accepted when a query names a ticker directly; upper-case words
+# outside this list ("OK", "ASAP", "CEO") are not taken for tickers
+KNOWN_SYMBOLS = frozenset(COMPANY_TICKERS.values()) | {
+    "ADBE", "ARM", "ASML", "BABA", "BAC", "BRK.B", "COST", "CSCO", "DIS", "GS", "IBM", "JNJ", "JPM", "KO",
+    "LLY", "MA", "MRVL", "MU", "NKE", "PEP", "PFE", "PYPL", "SHOP", "SMCI", "SNOW", "TXN", "UBER", "V",
+    "WMT", "XOM",
+}
+
+# Parameters that carry the content of earlier steps rather than a choice of
+# action; they are not cached, and bind_plan rebuilds context_data
+DERIVED_PARAMETERS = ("context_data", "summary")
+
+_COMPANY_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(name) for name in sorted(COMPANY_TICKERS, key=len, reverse=True)) + r")\b"
+)
+# Up to five capitals, with an optional share class suffix ("BRK.B")
+_TICKER_PATTERN = re.compile(r"\b[A-Z]{1,5}(?:\.[A-Z])?\b")
+_PERIOD_PATTERN = re.compile(r"\b(Q[1-4]\s+\d{4}|FY\s?\d{4}|(?:19|20)\d{2})\b", re.IGNORECASE)
+_SLOT_PATTERN = re.compile(r"\{[TP]\d+\}")
+
+
+def extract_entities(query: str) -> Tuple[List[str], List[str]]:
+    """
+    Find the tickers and reporting periods mentioned in a query.
+
+    Company names are resolved to their tickers, matching case; bare upper-case
+    words count only if they are in KNOWN_SYMBOLS and not part of a company name.
+
+    Returns:
+        Tuple[List[str], List[str]]: Distinct tickers and periods in order of
+        first mention
+    """
+    tickers: List[Tuple[int, str]] = []
+    covered: List[Tuple[int, int]] = []
+    for match in _COMPANY_PATTERN.finditer(query):
+        tickers.append((match.start(), COMPANY_TICKERS[match.group(1)]))
+        covered.append(match.span())
+    for match in _TICKER_PATTERN.finditer(query):
+        if match.group(0) not in KNOWN_SYMBOLS:
+            continue
+        if any(start <= match.start() < end for start, end in covered):
+            continue  # part of a company name already resolved ("TSMC", "AMD")
+        tickers.append((match.start(), match.group(0)))
+    ordered = [ticker for _, ticker in sorted(tickers)]
+
+    periods = [" ".join(match.group(1).upper().split()) for match in _PERIOD_PATTERN.finditer(query)]
+    return list(dict.fromkeys(ordered)), list(dict.fromkeys(periods))
+
+
+def query_template(query: str) -> Tuple[str, List[str], List[str]]:
+    """
+    Reduce a query to its shape by replacing entities with numbered slots.
+
+    Example:
+        >>> query_template("Compare the Q3 2024 revenue growth of NVIDIA and AMD")
+        ("compare the {P1} revenue growth of {T1} and {T2}", ["NVDA", "AMD"], ["Q3 2024"])
+    """
+    tickers, periods = extract_entities(query)
+    slots = {ticker: f"{{T{i}}}" for i, ticker in enumerate(tickers, 1)}
+
+    def company_slot(match: "re.Match[str]") -> str:
+        return slots[COMPANY_TICKERS[match.group(1)]]
+
+    def ticker_slot(match: "re.Match[str]") -> str:
+        return slots.get(match.group(0), match.group(0))
+
+    template = _PERIOD_PATTERN.sub(
+        lambda m: f"{{P{periods.index(' '.join(m.group(1).upper().split())) + 1}}}",
+        query
+    )
+    template = _COMPANY_PATTERN.sub(company_slot, template)
+    template = _TICKER_PATTERN.sub(ticker_slot, template)
+    template = " ".join(template.lower().split()).rstrip(".?!")
+    return template, tickers, periods
+
+
+def _substitute(value: Any, replacements: List[Tuple["re.Pattern[str]", str]]) -> Any:
+    if isinstance(value, str):
+        for pattern, replacement in replacements:
+            value = pattern.sub(replacement, value)
+        return value
+    if isinstance(value, list):
+        return [_substitute(item, replacements) for item in value]
+    if isinstance(value, dict):
+        return {_substitute(key, replacements): _substitute(item, replacements) for key, item in value.items()}
+    return value
+
+
+def describe_action(action: Dict[str, Any]) -> str:
+    """A short thought for a re-bound step, naming its tool and the entities it covers"""
+    parameters = action.get("parameters", {})
+    symbols = parameters.get("symbols") or ([parameters["symbol"]] if parameters.get("symbol") else [])
+    subjects = [f"{TICKER_NAMES[s]} ({s})" if TICKER_NAMES.get(s, s) != s else s for s in symbols]
+    thought = f"Running {action['tool']}"
+    if subjects:
+        thought += " for " + ", ".join(subjects)
+    if parameters.get("period"):
+        thought += f", {parameters['period']}"
+    return thought + "."
+
+
+def compile_plan(plan: List[Dict[str, Any]], tickers: List[str], periods: List[str]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Turn a concrete plan into a template by replacing entities with slots.
+
+    Only the skeleton is kept: step numbers, dependencies, tools and their
+    parameters. Thoughts, observations and DERIVED_PARAMETERS describe the
+    planned run's data, so they would be wrong for any other tickers.
+    Returns None if a symbol parameter is not one of the query's tickers, as
+    the plan could then not be re-bound to other tickers.
+    """
+    replacements: List[Tuple["re.Pattern[str]", str]] = []
+    for i, ticker in enumerate(tickers, 1):
+        replacements.append((re.compile(rf"\b{re.escape(ticker)}\b"), f"{{T{i}}}"))
+    for i, period in enumerate(periods, 1):
+        replacements.append((re.compile(rf"\b{re.escape(period)}\b"), f"{{P{i}}}"))
+
+    compiled = []
+    for step in plan:
+        parameters = step["action"].get("parameters", {})
+        skeleton: Dict[str, Any] = {
+            "step": step["step"],
+            "action": {
+                "tool": step["action"]["tool"],
+                "parameters": {key: value for key, value in parameters.items() if key not in DERIVED_PARAMETERS},
+            },
+        }
+        if "depends_on" in step:
+            skeleton["depends_on"] = list(step["depends_on"])
+        if "context_data" in parameters:
+            skeleton["context_data"] = True
+        compiled.append(_substitute(skeleton, replacements))
+
+    for step in compiled:
+        parameters = step["action"]["parameters"]
+        symbols = parameters.get("symbols", []) + ([parameters["symbol"]] if "symbol" in parameters else [])
+        if any(not _SLOT_PATTERN.fullmatch(symbol) for symbol in symbols):
+            return None
+    return compiled
+
+
+def bind_plan(compiled: List[Dict[str, Any]], tickers: List[str], periods: List[str]) -> List[Dict[str, Any]]:
+    """
+    Fill a compiled plan's slots with a new query's tickers and periods.
+
+    Each step gets a thought describing its action. Steps that took
+    context_data get one naming the new tickers and periods; the executor
+    adds the run's trace, so synthesis works from this run's results.
+    """
+    values: Dict[str, str] = {}
+    for i, ticker in enumerate(tickers, 1):
+        values[f"{{T{i}}}"] = ticker
+    for i, period in enumerate(periods, 1):
+        values[f"{{P{i}}}"] = period
+    replacements = [(re.compile(re.escape(slot)), value) for slot, value in values.items()]
+
+    plan = []
+    for skeleton in _substitute(copy.deepcopy(compiled), replacements):
+        action = skeleton["action"]
+        if skeleton.pop("context_data", False):
+            action["parameters"]["context_data"] = {"symbols": list(tickers), "periods": list(periods)}
+        step = {"step": skeleton["step"], "thought": describe_action(action), "action": action}
+        if "depends_on" in skeleton:
+            step["depends_on"] = skeleton["depends_on"]
+        plan.append(step)
+    return plan
+
+
+def validate_plan(plan: List[Dict[str, Any]]) -> bool:
+    """True if every action names a known tool and no slot is left unbound"""
+    for step in plan:
+        action = step.get("action", {})
+        if action.get("tool") not in TOOL_REGISTRY and action.get("tool") != "final_response":
+            return False
+        if _SLOT_PATTERN.search(str(action)):
+            return False
+    return True
+
+
+class PlanCache:
+    """
+    Cache of compiled tool plans keyed on query template.
+
+    A query whose template has been planned before skips the planner: its
+    tickers and periods are bound into the cached plan, which is validated
+    before use. Queries that miss, or whose bound plan fails validation, go
+    through the planner and the result is compiled for next time.
+
+    Example:
+        >>> plan_cache.plan_for("Compare the Q3 2024 revenue growth of Intel and Apple, ...")
+        [{"step": 1, "action": {"tool": "get_financial_data", "parameters": {"symbol": "INTC", ...}}}, ...]
+    """
+
+    def __init__(
+        self,
+        planner: Callable[[str], List[Dict[str, Any]]] = load_plan,
+        maxsize: int = 512,
+        ttl: float = PLAN_TTL_SECONDS
+    ):
+        self.planner = planner
+        self.ttl = ttl
+        self.plans = LRUCache(maxsize)
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "validation_failures": 0, "compiled": 0}
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def plan_for(self, query: str) -> List[Dict[str, Any]]:
+        """Return the plan for a query, reusing a compiled template when one fits"""
+        template, tickers, periods = query_template(query)
+        entry = self.plans.get(template)
+
+        if entry is not None and len(tickers) == entry["tickers"] and len(periods) == entry["periods"]:
+            plan = bind_plan(entry["plan"], tickers, periods)
+            if validate_plan(plan):
+                self.stats["hits"] += 1
+                record_cache_lookup("plan", True)
+                return plan
+            self.stats["validation_failures"] += 1
+
+        self.stats["misses"] += 1
+        record_cache_lookup("plan", False)
+        plan = self.planner(query)
+
+        compiled = compile_plan(plan, tickers, periods)
+        if compiled is not None:
+            self.plans.set(template, {"plan": compiled, "tickers": len(tickers), "periods": len(periods)}, self.ttl)
+            self.stats["compiled"] += 1
+        return plan
+
+
+plan_cache = PlanCache()
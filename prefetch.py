@@ -0,0 +1,188 @@
+"""
+Nexus Agent - Speculative Tool Prefetching
+Warms likely get_financial_data calls ahead of the plan
+"""
+
+from typing import Dict, List, Optional, Any, Awaitable, Callable, Iterable, Tuple
+import asyncio
+import inspect
+
+from agent_executor import TOOL_REGISTRY
+from metrics import record_cache_lookup
+from plan_cache import extract_entities
+
+# Speculative calls started per run, at most
+MAX_SPECULATIVE_CALLS = 8
+
+
+class PrefetchStats:
+    """Counters shared by every run's prefetcher"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {"issued": 0, "hits": 0, "wasted": 0, "cancelled": 0}
+
+    @property
+    def hit_rate(self) -> float:
+        settled = self.counts["hits"] + self.counts["wasted"]
+        return self.counts["hits"] / settled if settled else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.counts, "hit_rate": self.hit_rate}
+
+
+prefetch_stats = PrefetchStats()
+
+
+def _financial_key(parameters: Dict[str, Any]) -> Optional[Tuple[str, str, Optional[str]]]:
+    symbol = parameters.get("symbol")
+    if not isinstance(symbol, str):
+        return None
+    return (symbol.upper(), parameters.get("data_type", "quarterly_financials"), parameters.get("period"))
+
+
+class SpeculativePrefetcher:
+    """
+    Starts the tool calls a run is likely to make before the plan asks for them.
+
+    Tickers and periods are taken from the query as soon as the run is
+    accepted, and from each plan step as it becomes known. For every
+    ticker/period pair the full quarterly (or annual) financials are fetched
+    through the cached, coalesced get_financial_data. Fetching every metric
+    lets the cache answer whatever subset the plan later asks for.
+
+    analyze_investment_risks is not speculated: its result depends on the
+    timeframe, categories and include_sentiment the plan (or a budget
+    downgrade) settles on, which the query does not reveal, and it is
+    scored locally from pre-aggregated sentiment anyway.
+
+    The executor claims a speculative call when it dispatches a matching
+    action (see claim()). Calls never claimed are cancelled by close() and
+    counted as wasted.
+
+    Example:
+        >>> prefetcher = SpeculativePrefetcher(request.query)
+        >>> executor = ReActExecutor(plan, prefetcher=prefetcher)
+        >>> ...
+        >>> prefetcher.close()
+    """
+
+    def __init__(
+        self,
+        query: str,
+        tools: Optional[Dict[str, Callable[..., Any]]] = None,
+        max_calls: int = MAX_SPECULATIVE_CALLS,
+        stats: PrefetchStats = prefetch_stats
+    ):
+        self.tools = TOOL_REGISTRY if tools is None else tools
+        self.max_calls = max_calls
+        self.stats = stats
+        self.tickers: List[str] = []
+        self.periods: List[str] = []
+        self._financial: Dict[Tuple[str, str, Optional[str]], "asyncio.Task[Any]"] = {}
+        self._claimed: set = set()
+        self._closed = False
+        tickers, periods = extract_entities(query)
+        self._learn(tickers, periods)
+
+    @property
+    def started(self) -> int:
+        return len(self._financial)
+
+    def update(self, plan: Iterable[Dict[str, Any]]) -> None:
+        """Learn tickers and periods from plan steps known so far"""
+        tickers: List[str] = []
+        periods: List[str] = []
+        for step in plan:
+            parameters = step.get("action", {}).get("parameters", {})
+            if isinstance(parameters.get("symbol"), str):
+                tickers.append(parameters["symbol"].upper())
+            if isinstance(parameters.get("symbols"), list):
+                tickers.extend(symbol.upper() for symbol in parameters["symbols"] if isinstance(symbol, str))
+            if isinstance(parameters.get("period"), str):
+                periods.append(parameters["period"])
+        self._learn(tickers, periods)
+
+    def _learn(self, tickers: List[str], periods: List[str]) -> None:
+        new_tickers = [t for t in dict.fromkeys(tickers) if t not in self.tickers]
+        new_periods = [p for p in dict.fromkeys(periods) if p not in self.periods]
+        self.tickers.extend(new_tickers)
+        self.periods.extend(new_periods)
+        if self._closed or not (new_tickers or new_periods):
+            return
+
+        for period in self.periods:
+            data_type = "quarterly_financials" if period.upper().startswith("Q") else "annual_financials"
+            for ticker in self.tickers:
+                self._start_financial(ticker, data_type, period)
+
+    def _start_financial(self, symbol: str, data_type: str, period: str) -> None:
+        key = (symbol, data_type, period)
+        func = self.tools.get("get_financial_data")
+        if func is None or key in self._financial or self.started >= self.max_calls:
+            return
+        self._financial[key] = self._spawn(func, {"symbol": symbol, "data_type": data_type, "period": period})
+
+    def _spawn(self, func: Callable[..., Any], parameters: Dict[str, Any]) -> "asyncio.Task[Any]":
+        self.stats.counts["issued"] += 1
+        if inspect.iscoroutinefunction(func):
+            call = func(**parameters)
+        else:
+            call = asyncio.to_thread(func, **parameters)
+        task = asyncio.ensure_future(call)
+        # Failures surface when (if) the call is claimed; don't log them as unretrieved
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    def claim(self, tool: str, parameters: Dict[str, Any]) -> Optional[Awaitable[Any]]:
+        """
+        Awaitable for a dispatched action that a speculative call covers, or None.
+
+        get_financial_data is covered by a prefetch of the same symbol,
+        data_type and period; the returned awaitable waits for it and then
+        makes the real call, which the cache answers with the requested
+        metrics. A prefetch that found no data answers None directly.
+        """
+        if tool != "get_financial_data":
+            return None
+        key = _financial_key(parameters)
+        task = self._financial.get(key) if key is not None else None
+        if task is None:
+            return None
+        self._hit(task)
+        return self._then_call(task, self.tools[tool], parameters)
+
+    def _hit(self, task: "asyncio.Task[Any]") -> None:
+        if task not in self._claimed:
+            self._claimed.add(task)
+            self.stats.counts["hits"] += 1
+            record_cache_lookup("prefetch", True)
+
+    async def _then_call(self, task: "asyncio.Task[Any]", func: Callable[..., Any], parameters: Dict[str, Any]) -> Any:
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # the real call below reports its own error
+        else:
+            if result is None:
+                # The provider has nothing for this symbol and period; nothing was
+                # cached, so asking again would only repeat the upstream fetch
+                return None
+        if inspect.iscoroutinefunction(func):
+            return await func(**parameters)
+        return await asyncio.to_thread(func, **parameters)
+
+    def close(self) -> None:
+        """Cancel speculative calls that were never claimed and count them as wasted"""
+        if self._closed:
+            return
+        self._closed = True
+        for task in self._financial.values():
+            if task in self._claimed:
+                continue
+            self.stats.counts["wasted"] += 1
+            record_cache_lookup("prefetch", False)
+            if not task.done():
+                task.cancel()
+                self.stats.counts["cancelled"] += 1
@@ -0,0 +1,327 @@
+"""
+Nexus Agent - Semantic Response Cache
+Answers near-duplicate queries with a recent run's response and SSE event sequence
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
+from collections import OrderedDict
+from datetime import date
+import itertools
+import json
+import os
+import re
+import time
+import zlib
+
+from financial_cache import quarter_end_month
+from metrics import record_cache_lookup
+from plan_cache import extract_entities, query_template
+from sse import dumps, loads, now_iso
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SIMILARITY_THRESHOLD = 0.85
+RESPONSE_TTL_SECONDS = 300
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Set RESPONSE_CACHE_ENABLED=0 to run the agent for every request
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") != "0"
+EMBEDDING_DIMENSIONS = 512
+
+# Words that mark what a query asks for; queries must agree on these to share an answer
+INTENT_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "compare": ("compare", "comparison", "vs", "versus", "against"),
+    "email": ("email", "e-mail", "mail"),
+    "summary": ("summary", "summarize", "summarise", "overview"),
+    "report": ("report",),
+    "recommend": ("buy", "sell", "recommend", "recommendation", "better"),
+    "risk": ("risk", "risks", "downside"),
+    "growth": ("growth", "grew", "growing"),
+    "revenue": ("revenue", "revenues", "sales"),
+    "earnings": ("earnings", "eps", "profit", "income"),
+}
+_INTENT_LOOKUP = {word: intent for intent, words in INTENT_KEYWORDS.items() for word in words}
+
+STOPWORDS = {"the", "a", "an", "of", "and", "to", "for", "my", "me", "is", "which", "then", "about", "in", "on", "right", "now"}
+
+_WORD_PATTERN = re.compile(r"[a-z0-9\-{}]+")
+_BARE_QUARTER_PATTERN = re.compile(r"\bQ([1-4])\b(?!\s+\d{4})", re.IGNORECASE)
+
+ScopeKey = Tuple[str, str, Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+
+
+def resolve_bare_quarters(query: str, today: Optional[date] = None) -> str:
+    """Rewrite "Q3" without a year as the most recent Q3 that has ended"""
+    today = today or date.today()
+
+    def resolve(match: "re.Match[str]") -> str:
+        quarter = int(match.group(1))
+        year = today.year if quarter_end_month(quarter) < today.month else today.year - 1
+        return f"Q{quarter} {year}"
+
+    return _BARE_QUARTER_PATTERN.sub(resolve, query)
+
+
+def query_intents(query: str) -> Tuple[str, ...]:
+    words = _WORD_PATTERN.findall(query.lower())
+    return tuple(sorted({_INTENT_LOOKUP[word] for word in words if word in _INTENT_LOOKUP}))
+
+
+def embed(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> "np.ndarray":
+    """
+    Hashed bag of words and character trigrams, L2-normalised.
+
+    A cheap local stand-in for a sentence embedding: paraphrases that share
+    most words and word fragments score close to 1.
+    """
+    import numpy as np
+
+    vector = np.zeros(dimensions, dtype=np.float32)
+    words = [word for word in _WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+    for word in words:
+        vector[zlib.crc32(word.encode()) % dimensions] += 2.0
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode()) % dimensions] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def normalize_query(query: str, today: Optional[date] = None) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...], str]:
+    """
+    Reduce a query to tickers, periods, intents and its entity-free template.
+
+    Example:
+        >>> normalize_query("NVDA vs AMD Q3 2024 revenue growth, email my manager")[:3]
+        (("AMD", "NVDA"), ("Q3 2024",), ("compare", "email", "growth", "revenue"))
+    """
+    query = resolve_bare_quarters(query, today)
+    tickers, periods = extract_entities(query)
+    template, _, _ = query_template(query)
+    return tuple(sorted(tickers)), tuple(sorted(periods)), query_intents(query), template
+
+
+class SemanticResponseCache:
+    """
+    Cache of finished agent runs, matched on meaning rather than exact text.
+
+    A run is stored under its scope: user_id, preferences, tickers, periods
+    and intents. A new query is answered from the cache when a fresh entry
+    in the same scope has a template embedding with cosine similarity of at
+    least similarity_threshold. Entries keep the AgentResponse fields and
+    the SSE event sequence, so both streaming and non-streaming requests can
+    be answered; session ids and timestamps are rewritten on replay.
+
+    Responses and event sequences are held as compressed JSON and decoded
+    on replay. Memory is bounded by max_bytes (the encoded size of each
+    entry); least recently used entries are evicted first. While enabled is
+    False, lookup() finds nothing and store() keeps nothing.
+
+    Example:
+        >>> cached = response_cache.lookup(request.query, request.user_id, request.preferences)
+        >>> if cached is not None:
+        ...     events = response_cache.replay_events(cached, session_id)
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = SIMILARITY_THRESHOLD,
+        ttl: float = RESPONSE_TTL_SECONDS,
+        max_bytes: int = MAX_CACHE_BYTES,
+        enabled: bool = True
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.size_bytes = 0
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._scopes: Dict[ScopeKey, List[int]] = {}
+        self._ids = itertools.count()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _scope(self, query: str, user_id: Optional[str], preferences: Optional[Dict[str, Any]]) -> Tuple[ScopeKey, str]:
+        tickers, periods, intents, template = normalize_query(query)
+        scope = (user_id or "", json.dumps(preferences or {}, sort_keys=True, default=str), tickers, periods, intents)
+        return scope, template
+
+    def lookup(
+        self,
+        query: str,
+        user_id: Optional[str] = None,
+        preferences: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Best fresh entry for a query, or None"""
+        if not self.enabled:
+            return None
+        scope, template = self._scope(query, user_id, preferences)
+        best, best_score = None, self.similarity_threshold
+        ids = self._scopes.get(scope, [])
+        if ids:
+            vector = embed(template)
+            cutoff = time.monotonic() - self.ttl
+            for entry_id in list(ids):
+                entry = self._entries[entry_id]
+                if entry["stored"] < cutoff:
+                    self._evict(entry_id)
+                    continue
+                score = float(vector @ entry["vector"])
+                if score >= best_score:
+                    best, best_score = entry, score
+
+        if best is None:
+            self.stats["misses"] += 1
+            record_cache_lookup("response", False)
+            return None
+        self.stats["hits"] += 1
+        record_cache_lookup("response", True)
+        self._entries.move_to_end(best["id"])
+        return {**best, "similarity": best_score}
+
+    def store(
+        self,
+        query: str,
+        user_id: Optional[str],
+        preferences: Optional[Dict[str, Any]],
+        response: Optional[Dict[str, Any]] = None,
+        events: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Remember a successful run.
+
+        Args:
+            query (str): The query that was answered
+            user_id (Optional[str]): Scope of the answer
+            preferences (Optional[Dict[str, Any]]): Preferences the answer was produced with
+            response (Optional[Dict[str, Any]]): AgentResponse fields, from a non-streaming run
+            events (Optional[List[Dict[str, Any]]]): SSE events, from a streaming run
+        """
+        if not self.enabled or (response is None and events is None):
+            return
+        scope, template = self._scope(query, user_id, preferences)
+        vector = embed(template)
+        # Held compressed: a streaming run is hundreds of small, repetitive event dicts
+        encoded_response = zlib.compress(dumps(response), 1) if response is not None else None
+        encoded_events = zlib.compress(dumps(events), 1) if events is not None else None
+        size = len(encoded_response or b"") + len(encoded_events or b"") + vector.nbytes
+        if size > self.max_bytes:
+            return
+
+        entry_id = next(self._ids)
+        self._entries[entry_id] = {
+            "id": entry_id,
+            "scope": scope,
+            "query": query,
+            "vector": vector,
+            "response": encoded_response,
+            "events": encoded_events,
+            "stored": time.monotonic(),
+            "size": size,
+        }
+        self._scopes.setdefault(scope, []).append(entry_id)
+        self.size_bytes += size
+        self.stats["stores"] += 1
+        while self.size_bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        self.size_bytes -= entry["size"]
+        self.stats["evictions"] += 1
+        ids = self._scopes[entry["scope"]]
+        ids.remove(entry_id)
+        if not ids:
+            del self._scopes[entry["scope"]]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._scopes.clear()
+        self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def replay_events(self, entry: Dict[str, Any], session_id: str) -> List[Dict[str, Any]]:
+        """The entry's SSE events for a new session, with fresh session ids and timestamps"""
+        if entry["events"] is not None:
+            events = _decode(entry["events"])
+        else:
+            events = events_from_response(_decode(entry["response"]))
+        replayed = []
+        for event in events:
+            if "session_id" in event:
+                event["session_id"] = session_id
+            if "timestamp" in event:
+                event["timestamp"] = now_iso()
+            if event.get("type") == "execution_complete":
+                event["cached"] = True
+            replayed.append(event)
+        return replayed
+
+    def replay_response(self, entry: Dict[str, Any], session_id: str, query: str) -> Dict[str, Any]:
+        """The entry's AgentResponse fields for a new session"""
+        if entry["response"] is not None:
+            response = _decode(entry["response"])
+        else:
+            response = response_from_events(_decode(entry["events"]))
+        response["session_id"] = session_id
+        response["query"] = query
+        return response
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._entries), "bytes": self.size_bytes}
+
+
+def _decode(encoded: bytes) -> Any:
+    return loads(zlib.decompress(encoded))
+
+
+def events_from_response(response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """SSE event sequence equivalent to a non-streaming AgentResponse"""
+    events: List[Dict[str, Any]] = [
+        {"type": "session_start", "session_id": response["session_id"], "query": response["query"]}
+    ]
+    for step in response["steps"]:
+        events.append({
+            "type": "step_update", "step": step["step_number"], "thought": step["thought"],
+            "action": step["action"], "status": "in_progress", "timestamp": str(step["timestamp"])
+        })
+        events.append({
+            "type": "step_update", "step": step["step_number"], "observation": step["observation"],
+            "status": step["status"], "timestamp": str(step["timestamp"])
+        })
+    events.append({
+        "type": "execution_complete",
+        "session_id": response["session_id"],
+        "final_result": response["final_result"],
+        "execution_time": f"{response['execution_time_seconds']:.1f} seconds",
+        "status": response["status"]
+    })
+    return events
+
+
+def response_from_events(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """AgentResponse fields reconstructed from a streaming run's events"""
+    steps: Dict[int, Dict[str, Any]] = {}
+    final: Dict[str, Any] = {}
+    for event in events:
+        if event.get("type") == "step_update":
+            step = steps.setdefault(event["step"], {"step_number": event["step"], "thought": "", "action": {}, "observation": ""})
+            if event["status"] == "in_progress":
+                step.update(thought=event.get("thought", ""), action=event.get("action", {}))
+            else:
+                step.update(observation=event.get("observation", ""), status=event["status"], timestamp=event.get("timestamp"))
+        elif event.get("type") == "execution_complete":
+            final = event
+    execution_time = str(final.get("execution_time", "0")).split()[0]
+    return {
+        "session_id": final.get("session_id"),
+        "query": "",
+        "steps": [steps[number] for number in sorted(steps)],
+        "final_result": final.get("final_result", {}),
+        "execution_time_seconds": float(execution_time),
+        "status": final.get("status", "completed"),
+    }
+
+
+response_cache = SemanticResponseCache(enabled=RESPONSE_CACHE_ENABLED)
@@ -0,0 +1,308 @@
+"""
+Nexus Agent - Vectorized Risk Scoring Engine
+Array-based risk calculations behind analyze_investment_risks
+"""
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Any, Sequence, Tuple
+from datetime import datetime
+
+from sentiment_index import SentimentIndex, sentiment_index
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# numpy is imported on first use, keeping it off the cold-start path (see app_factory)
+
+# Trading days covered by each analysis_timeframe
+TIMEFRAME_DAYS: Dict[str, int] = {
+    "1_month": 21,
+    "3_months": 63,
+    "6_months": 126,
+    "1_year": 252,
+}
+TRADING_DAYS_PER_YEAR = 252
+
+RISK_CATEGORIES = ["market_risk", "sector_risk", "regulatory_risk", "competitive_risk"]
+
+# Relative weight of each category in the overall 0-100 risk score
+CATEGORY_WEIGHTS: Dict[str, float] = {
+    "market_risk": 0.35,
+    "sector_risk": 0.25,
+    "regulatory_risk": 0.20,
+    "competitive_risk": 0.20,
+}
+
+# Annualized volatility that maps to a market_risk signal of 1.0
+VOLATILITY_CEILING = 0.80
+
+# How far sentiment (0 = bearish, 1 = bullish) can move the overall score
+SENTIMENT_WEIGHT = 0.30
+
+# Category score (0-100) from which a category is reported as a key risk
+ELEVATED_RISK_SCORE = 60
+
+# Sentiment below which negative news is reported as a key risk
+NEGATIVE_SENTIMENT = 0.40
+
+# Key risk wording and mitigation suggestion per risk factor
+RISK_FACTORS: Dict[str, Dict[str, str]] = {
+    "market_risk": {
+        "risk": "High price volatility",
+        "recommendation": "Size the position for its volatility or hedge it",
+    },
+    "sector_risk": {
+        "risk": "Moves closely with the rest of the universe",
+        "recommendation": "Diversify into holdings that move independently of it",
+    },
+    "regulatory_risk": {
+        "risk": "Regulatory exposure",
+        "recommendation": "Track pending regulation and export rules",
+    },
+    "competitive_risk": {
+        "risk": "Competitive pressure",
+        "recommendation": "Watch market share and pricing in the next reports",
+    },
+    "sentiment": {
+        "risk": "Negative news sentiment",
+        "recommendation": "Wait for the news flow to settle before adding to the position",
+    },
+}
+
+
+def annualized_volatility(returns: "np.ndarray") -> "np.ndarray":
+    """Annualized standard deviation of daily returns, one value per row"""
+    import numpy as np
+
+    return returns.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+def mean_correlation(returns: "np.ndarray") -> "np.ndarray":
+    """
+    Average correlation of each symbol with every other symbol.
+
+    Computed from row-standardized returns in O(n * days), so the full
+    n x n correlation matrix is never materialized.
+    """
+    import numpy as np
+
+    n_symbols, n_days = returns.shape
+    if n_symbols < 2:
+        return np.zeros(n_symbols)
+
+    centered = returns - returns.mean(axis=1, keepdims=True)
+    std = centered.std(axis=1, keepdims=True)
+    z = np.divide(centered, std, out=np.zeros_like(centered), where=std > 0)
+    # Row i of z @ z.sum(0) / n_days is the sum of corr(i, j) over all j, including corr(i, i) = 1
+    row_sums = z @ z.sum(axis=0) / n_days
+    self_corr = (std[:, 0] > 0).astype(float)
+    return (row_sums - self_corr) / (n_symbols - 1)
+
+
+def _unique_extreme(symbols: List[str], scores: "np.ndarray", extreme: Any) -> Optional[str]:
+    """The symbol holding the extreme score, or None when several share it"""
+    import numpy as np
+
+    matches = np.flatnonzero(scores == extreme)
+    return symbols[int(matches[0])] if len(matches) == 1 else None
+
+
+def _flag_risks(
+    symbols: List[str],
+    categories: List[str],
+    category_scores: "np.ndarray",
+    sentiment: Optional["np.ndarray"]
+) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """
+    Key risks and mitigation suggestions per symbol.
+
+    Categories scoring ELEVATED_RISK_SCORE or more are flagged, highest
+    first, then sentiment below NEGATIVE_SENTIMENT. Only flagged cells are
+    visited, so a large, mostly neutral universe costs one array comparison.
+    """
+    import numpy as np
+
+    key_risks: Dict[str, List[str]] = {symbol: [] for symbol in symbols}
+    recommendations: Dict[str, List[str]] = {symbol: [] for symbol in symbols}
+
+    def flag(row: int, factor: str, detail: str) -> None:
+        described = RISK_FACTORS.get(factor, {})
+        label = described.get("risk", factor.replace("_", " ").capitalize())
+        key_risks[symbols[row]].append(f"{label} ({detail})")
+        if "recommendation" in described:
+            recommendations[symbols[row]].append(described["recommendation"])
+
+    elevated = category_scores >= ELEVATED_RISK_SCORE
+    for row in np.flatnonzero(elevated.any(axis=1)):
+        for column in sorted(np.flatnonzero(elevated[row]), key=lambda c: -category_scores[row, c]):
+            flag(row, categories[column], f"score {int(category_scores[row, column])}")
+    if sentiment is not None:
+        for row in np.flatnonzero(sentiment < NEGATIVE_SENTIMENT):
+            flag(row, "sentiment", f"sentiment {sentiment[row]:.2f}")
+    return key_risks, recommendations
+
+
+def correlation_matrix(returns: "np.ndarray") -> "np.ndarray":
+    """Full pairwise correlation matrix; only practical for small universes"""
+    import numpy as np
+
+    return np.corrcoef(returns)
+
+
+def score_risks(
+    symbols: Sequence[str],
+    returns: Optional["np.ndarray"],
+    analysis_timeframe: str = "3_months",
+    risk_categories: Optional[List[str]] = None,
+    category_signals: Optional[Dict[str, "np.ndarray"]] = None,
+    sentiment: Optional["np.ndarray"] = None
+) -> Dict[str, Any]:
+    """
+    Score investment risk for a universe of symbols in one pass of array math.
+
+    market_risk is derived from volatility over the analysis timeframe and
+    sector_risk from how closely each symbol moves with the rest of the
+    universe. Other categories come from category_signals (0-1 per symbol,
+    e.g. from news or fundamentals) and default to a neutral 0.5. Without
+    returns, market_risk and sector_risk are neutral too, and volatility
+    and correlation are left out of the result. lowest_risk and highest_risk
+    are None when several symbols share that score, e.g. when every symbol
+    scores a neutral 50.
+
+    Args:
+        symbols (Sequence[str]): Stock ticker symbols, one per row of returns
+        returns (Optional[np.ndarray]): Daily returns, shape (n_symbols, n_days)
+        analysis_timeframe (str): "1_month", "3_months", "6_months" or "1_year"
+        risk_categories (Optional[List[str]]): Categories to score, defaults to all
+        category_signals (Optional[Dict[str, np.ndarray]]): Precomputed 0-1 signals per category
+        sentiment (Optional[np.ndarray]): Sentiment per symbol on a 0-1 scale
+
+    Returns:
+        Dict[str, Any]: risk_scores, category_scores, key_risks, recommendations,
+        volatility, sentiment_analysis and risk_comparison in the
+        analyze_investment_risks format
+
+    Raises:
+        ValueError: For an unknown timeframe, returns of the wrong shape, or
+            fewer than two days of returns in the timeframe
+    """
+    import numpy as np
+
+    days = TIMEFRAME_DAYS.get(analysis_timeframe)
+    if days is None:
+        raise ValueError(f"Unknown analysis_timeframe: {analysis_timeframe}")
+
+    categories = risk_categories or RISK_CATEGORIES
+    category_signals = category_signals or {}
+    n_symbols = len(symbols)
+
+    computed: Dict[str, "np.ndarray"] = {}
+    volatility = correlation = None
+    if returns is not None:
+        returns = np.asarray(returns, dtype=np.float64)
+        if returns.ndim != 2 or returns.shape[0] != len(symbols):
+            raise ValueError("returns must have shape (len(symbols), n_days)")
+        window = returns[:, -days:]
+        if window.shape[1] < 2:
+            # A single day has no sample variance; std(ddof=1) would be NaN
+            raise ValueError("returns must cover at least 2 days")
+        volatility = annualized_volatility(window)
+        correlation = mean_correlation(window)
+        computed = {
+            "market_risk": np.clip(volatility / VOLATILITY_CEILING, 0.0, 1.0),
+            "sector_risk": np.clip((correlation + 1.0) / 2.0, 0.0, 1.0),
+        }
+    signals = np.column_stack([
+        np.asarray(category_signals[c], dtype=np.float64) if c in category_signals
+        else computed.get(c, np.full(n_symbols, 0.5))
+        for c in categories
+    ])
+    weights = np.array([CATEGORY_WEIGHTS.get(c, 0.25) for c in categories])
+
+    overall = signals @ weights / weights.sum()
+    if sentiment is not None:
+        sentiment = np.asarray(sentiment, dtype=np.float64)
+        overall = overall * (1.0 + SENTIMENT_WEIGHT * (0.5 - sentiment) * 2.0)
+    scores = np.clip(np.rint(overall * 100), 0, 100).astype(int)
+    category_scores = np.rint(signals * 100).astype(int)
+
+    # Percentile rank of each score within the universe
+    ranks = scores.argsort(kind="stable").argsort(kind="stable")
+    percentile = ranks / max(n_symbols - 1, 1)
+    relative = scores - scores.mean()
+
+    symbols = list(symbols)
+    key_risks, recommendations = _flag_risks(symbols, categories, category_scores, sentiment)
+    result = {
+        "symbols": symbols,
+        "risk_scores": dict(zip(symbols, scores.tolist())),
+        "category_scores": {
+            symbol: dict(zip(categories, row))
+            for symbol, row in zip(symbols, category_scores.tolist())
+        },
+        "key_risks": key_risks,
+        "recommendations": recommendations,
+        "risk_comparison": {
+            "lowest_risk": _unique_extreme(symbols, scores, scores.min()),
+            "highest_risk": _unique_extreme(symbols, scores, scores.max()),
+            "percentile": dict(zip(symbols, np.round(percentile, 4).tolist())),
+            "relative_to_mean": dict(zip(symbols, np.round(relative, 2).tolist())),
+        },
+        "analysis_date": datetime.now().isoformat(),
+    }
+    if returns is not None:
+        result["volatility"] = dict(zip(symbols, np.round(volatility, 4).tolist()))
+        result["risk_comparison"]["mean_correlation"] = dict(zip(symbols, np.round(correlation, 4).tolist()))
+    if sentiment is not None:
+        result["sentiment_analysis"] = dict(zip(symbols, np.round(sentiment, 4).tolist()))
+    return result
+
+
+class RiskAnalyzer:
+    """
+    Tool implementation of agent_tools.analyze_investment_risks.
+
+    Sentiment is read from the pre-aggregated sentiment index (one lookup
+    per symbol, whatever the timeframe) and every symbol is scored in one
+    score_risks call. Daily returns come from returns_provider(symbols,
+    days), which returns an (n_symbols, n_days) array or None; no price
+    feed is configured by default, so market_risk and sector_risk stay
+    neutral until one is.
+
+    Example:
+        >>> risk_analyzer.analyze_investment_risks(["NVDA", "AMD"], "3_months")
+        {"symbols": ["NVDA", "AMD"], "risk_scores": {"NVDA": 44, "AMD": 52}, "sentiment_analysis": {...}, ...}
+    """
+
+    def __init__(
+        self,
+        returns_provider: Optional[Callable[[List[str], int], Optional["np.ndarray"]]] = None,
+        sentiment: SentimentIndex = sentiment_index
+    ):
+        self.returns_provider = returns_provider
+        self.sentiment = sentiment
+
+    def analyze_investment_risks(
+        self,
+        symbols: List[str],
+        analysis_timeframe: str = "3_months",
+        risk_categories: Optional[List[str]] = None,
+        include_sentiment: bool = True
+    ) -> Dict[str, Any]:
+        if not symbols:
+            raise ValueError("analyze_investment_risks needs at least one symbol")
+        days = TIMEFRAME_DAYS.get(analysis_timeframe)
+        if days is None:
+            raise ValueError(f"Unknown analysis_timeframe: {analysis_timeframe}")
+        symbols = [symbol.upper() for symbol in symbols]
+
+        returns = self.returns_provider(symbols, days) if self.returns_provider is not None else None
+        sentiment = self.sentiment.sentiment_scores(symbols, analysis_timeframe) if include_sentiment else None
+        return score_risks(
+            symbols,
+            returns,
+            analysis_timeframe=analysis_timeframe,
+            risk_categories=risk_categories,
+            sentiment=sentiment
+        )
+
+risk_analyzer = RiskAnalyzer()
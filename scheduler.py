@@ -0,0 +1,257 @@
+"""
+Nexus Agent - Admission Control and Fair Scheduling
+Bounds concurrent agent runs and queues the rest fairly per user
+"""
+
+from typing import Callable, Dict, List, Optional, Any, AsyncIterator
+from collections import OrderedDict, deque
+import asyncio
+import math
+import os
+import time
+
+from metrics import observe_queue_wait, register_gauge
+
+ANONYMOUS_USER = "anonymous"
+
+# Weight given to the latest run when updating the average run duration
+RUN_TIME_SMOOTHING = 0.2
+
+
+class QueueFullError(Exception):
+    """Raised when the admission queue is full; carries a Retry-After hint in seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Agent queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """
+    A single agent run's place in the scheduler.
+
+    Use as an async context manager, or iterate wait_turn() to observe queue
+    positions while waiting, then call release() when the run finishes.
+    """
+
+    def __init__(self, scheduler: "AgentScheduler", user_id: str):
+        self.scheduler = scheduler
+        self.user_id = user_id
+        self.state = "queued"  # "queued", "running", "done"
+        self.enqueued_at = time.monotonic()
+        self.granted_at: Optional[float] = None
+        self._moved = asyncio.Event()
+
+    @property
+    def wait_seconds(self) -> float:
+        end = self.granted_at if self.granted_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+    async def wait_turn(self) -> AsyncIterator[int]:
+        """
+        Wait until the run may start.
+
+        Yields:
+            int: 1-based queue position, each time it changes
+        """
+        last_position = None
+        try:
+            while self.state == "queued":
+                position = self.scheduler.position(self)
+                if position != last_position:
+                    last_position = position
+                    yield position
+                self._moved.clear()
+                await self._moved.wait()
+        except BaseException:
+            self.release()
+            raise
+
+    async def acquire(self) -> None:
+        async for _ in self.wait_turn():
+            pass
+
+    def release(self) -> None:
+        """Give up the ticket's slot or queue place; safe to call more than once"""
+        self.scheduler._release(self)
+
+    async def __aenter__(self) -> "Ticket":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class AgentScheduler:
+    """
+    Global concurrency cap with per-user fair queuing.
+
+    At most max_concurrent runs execute at once. Further runs wait in a queue
+    of at most max_queue entries; when a slot frees up, users with waiting runs
+    are served round-robin so one user's burst cannot starve everyone else.
+    Admission beyond max_queue, or beyond max_per_user queued and running
+    runs of one user, raises QueueFullError.
+
+    Example:
+        >>> ticket = agent_scheduler.admit(request.user_id)
+        >>> async with ticket:
+        ...     await execute_agent_workflow(session_id, request)
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_queue: int = 256,
+        max_per_user: int = 16,
+        expected_run_seconds: float = 10.0
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.running = 0
+        # Queued and running tickets per user, for max_per_user
+        self._per_user: Dict[str, int] = {}
+        # Gauge updates to run after every change (see metrics.register_gauge)
+        self.gauges: List[Callable[[], None]] = []
+        self.avg_run_seconds = expected_run_seconds
+        # Rotation order: the first user is served next
+        self._queues: "OrderedDict[str, deque[Ticket]]" = OrderedDict()
+        self.stats: Dict[str, float] = {
+            "admitted": 0,
+            "granted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "AgentScheduler":
+        return cls(
+            max_concurrent=int(os.getenv("AGENT_MAX_CONCURRENT", "32")),
+            max_queue=int(os.getenv("AGENT_MAX_QUEUE", "256")),
+            max_per_user=int(os.getenv("AGENT_MAX_PER_USER", "16"))
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def retry_after(self, queue_depth: Optional[int] = None) -> int:
+        """Estimated seconds until a queue place frees up, for this queue or one of queue_depth"""
+        depth = self.queue_depth if queue_depth is None else queue_depth
+        waves = (depth + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(waves * self.avg_run_seconds))
+
+    def admit(self, user_id: Optional[str] = None) -> Ticket:
+        """
+        Admit a run, queueing it if every slot is busy.
+
+        Raises:
+            QueueFullError: If the queue already holds max_queue runs, or the
+                user already has max_per_user runs queued or running
+        """
+        ticket = Ticket(self, user_id or ANONYMOUS_USER)
+        if self._per_user.get(ticket.user_id, 0) >= self.max_per_user:
+            self.stats["rejected"] += 1
+            raise QueueFullError(self.retry_after())
+        if self.running < self.max_concurrent and not self._queues:
+            self._grant(ticket)
+        elif self.queue_depth >= self.max_queue:
+            self.stats["rejected"] += 1
+            raise QueueFullError(self.retry_after())
+        else:
+            self._queues.setdefault(ticket.user_id, deque()).append(ticket)
+        self._per_user[ticket.user_id] = self._per_user.get(ticket.user_id, 0) + 1
+        self.stats["admitted"] += 1
+        self._publish()
+        return ticket
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based position of a queued ticket in round-robin service order"""
+        queue = self._queues.get(ticket.user_id)
+        if queue is None or ticket not in queue:
+            return 0
+        index = queue.index(ticket)
+        ahead = index
+        before = True
+        for user_id, other in self._queues.items():
+            if user_id == ticket.user_id:
+                before = False
+                continue
+            # Users earlier in the rotation get one extra turn in the ticket's round
+            ahead += min(len(other), index + 1 if before else index)
+        return ahead + 1
+
+    def _grant(self, ticket: Ticket) -> None:
+        ticket.state = "running"
+        ticket.granted_at = time.monotonic()
+        self.running += 1
+        self.stats["granted"] += 1
+        wait = ticket.wait_seconds
+        self.stats["total_wait_seconds"] += wait
+        self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], wait)
+        observe_queue_wait(wait)
+        ticket._moved.set()
+
+    def _dispatch(self) -> None:
+        while self.running < self.max_concurrent and self._queues:
+            user_id, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user_id)
+            else:
+                del self._queues[user_id]
+            self._grant(ticket)
+
+        # Let every waiter re-read its position
+        for queue in self._queues.values():
+            for waiting in queue:
+                waiting._moved.set()
+
+    def _release(self, ticket: Ticket) -> None:
+        if ticket.state == "running":
+            self.running -= 1
+            self.stats["completed"] += 1
+            run_seconds = time.monotonic() - ticket.granted_at
+            self.avg_run_seconds += RUN_TIME_SMOOTHING * (run_seconds - self.avg_run_seconds)
+        elif ticket.state == "queued":
+            queue = self._queues.get(ticket.user_id)
+            if queue is not None and ticket in queue:
+                queue.remove(ticket)
+                if not queue:
+                    del self._queues[ticket.user_id]
+        else:
+            return
+        ticket.state = "done"
+        remaining = self._per_user.pop(ticket.user_id) - 1
+        if remaining:
+            self._per_user[ticket.user_id] = remaining
+        self._dispatch()
+        self._publish()
+
+    def _publish(self) -> None:
+        for update in self.gauges:
+            update()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current queue depth, running count and wait-time statistics"""
+        granted = self.stats["granted"]
+        return {
+            "running": self.running,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "queued_users": len(self._queues),
+            "avg_wait_seconds": self.stats["total_wait_seconds"] / granted if granted else 0.0,
+            "avg_run_seconds": self.avg_run_seconds,
+            **self.stats,
+        }
+
+
+agent_scheduler = AgentScheduler.from_env()
+agent_scheduler.gauges = [
+    register_gauge("nexus_scheduler_queue_depth", "Agent runs waiting for a slot", lambda: agent_scheduler.queue_depth),
+    register_gauge("nexus_scheduler_running", "Agent runs currently executing", lambda: agent_scheduler.running),
+]
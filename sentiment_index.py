@@ -0,0 +1,336 @@
+"""
+Nexus Agent - Incremental News Sentiment Aggregates
+Rolling per-symbol sentiment windows, kept current by a background news ingest
+"""
+
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+from collections import deque
+from datetime import date, datetime, timezone
+import asyncio
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+NEWS_FEED_PATH = os.getenv("NEWS_FEED_PATH", os.path.join("data", "news", "feed.jsonl"))
+NEWS_POLL_SECONDS = float(os.getenv("NEWS_POLL_SECONDS", "5"))
+
+# Calendar days covered by each analysis_timeframe
+WINDOW_DAYS: Dict[str, int] = {
+    "1_month": 30,
+    "3_months": 91,
+    "6_months": 182,
+    "1_year": 365,
+}
+MAX_WINDOW_DAYS = max(WINDOW_DAYS.values())
+
+# Headlines kept per symbol for key-risk citations
+RECENT_HEADLINES = 5
+
+# Sentiment of a symbol with no articles in the window, on the 0-1 scale
+NEUTRAL_SENTIMENT = 0.5
+
+POSITIVE_WORDS = frozenset({
+    "beat", "beats", "surge", "surges", "record", "growth", "gain", "gains", "strong", "upgrade",
+    "upgraded", "outperform", "rally", "rallies", "profit", "bullish", "raises", "expands", "wins", "soars",
+})
+NEGATIVE_WORDS = frozenset({
+    "miss", "misses", "plunge", "plunges", "drop", "drops", "weak", "downgrade", "downgraded", "lawsuit",
+    "probe", "ban", "restrictions", "loss", "bearish", "cuts", "recall", "fine", "layoffs", "slumps",
+})
+
+_WORD_PATTERN = re.compile(r"[a-z]+")
+
+
+def score_text(text: str) -> float:
+    """
+    Lexicon sentiment of a headline on a -1 (bearish) to 1 (bullish) scale.
+
+    A stand-in for a sentiment model; feeds that carry their own score skip it.
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    positive = sum(word in POSITIVE_WORDS for word in words)
+    negative = sum(word in NEGATIVE_WORDS for word in words)
+    return (positive - negative) / (positive + negative) if positive or negative else 0.0
+
+
+def _article_day(published: Any) -> int:
+    if isinstance(published, (int, float)):
+        return datetime.fromtimestamp(published, tz=timezone.utc).date().toordinal()
+    return datetime.fromisoformat(str(published).replace("Z", "+00:00")).date().toordinal()
+
+
+class RollingSentiment:
+    """
+    Sentiment of one symbol over every window, updated per article in O(1).
+
+    Articles are summed into daily buckets. Each window keeps running totals
+    (articles, score sum, positive and negative counts) plus the index of its
+    oldest included day in the sorted list of bucket days. Adding an article
+    updates the totals of the windows that contain its day; advancing the
+    date subtracts the buckets that fell out of each window. Both cost O(1)
+    amortized, so a lookup never revisits individual articles.
+    """
+
+    __slots__ = ("days", "buckets", "starts", "totals", "headlines")
+
+    def __init__(self):
+        self.days: List[int] = []
+        self.buckets: Dict[int, List[float]] = {}
+        self.starts: Dict[str, int] = {window: 0 for window in WINDOW_DAYS}
+        self.totals: Dict[str, List[float]] = {window: [0, 0.0, 0, 0] for window in WINDOW_DAYS}
+        self.headlines: "deque[Tuple[int, str]]" = deque(maxlen=RECENT_HEADLINES)
+
+    def add(self, day: int, score: float, headline: str, today: int) -> None:
+        if today - day >= MAX_WINDOW_DAYS:
+            return  # older than every window
+        self.advance(today)
+        bucket = self.buckets.get(day)
+        created = bucket is None
+        if created:
+            bisect.insort(self.days, day)
+            bucket = self.buckets[day] = [0, 0.0, 0, 0]
+
+        delta = (1, score, int(score > 0), int(score < 0))
+        for i, value in enumerate(delta):
+            bucket[i] += value
+        for window, length in WINDOW_DAYS.items():
+            if today - day < length:
+                totals = self.totals[window]
+                for i, value in enumerate(delta):
+                    totals[i] += value
+            elif created:
+                # A late article for a day this window has already passed: it
+                # sorts ahead of the window's oldest day and stays excluded
+                self.starts[window] += 1
+        if headline and (not self.headlines or day >= self.headlines[-1][0]):
+            self.headlines.append((day, headline))
+
+    def advance(self, today: int) -> None:
+        """Drop buckets that have aged out of each window"""
+        for window, length in WINDOW_DAYS.items():
+            start = self.starts[window]
+            totals = self.totals[window]
+            while start < len(self.days) and today - self.days[start] >= length:
+                for i, value in enumerate(self.buckets[self.days[start]]):
+                    totals[i] -= value
+                start += 1
+            self.starts[window] = start
+
+        # Buckets older than the longest window are no longer needed
+        expired = min(self.starts.values())
+        if expired > 64:
+            for day in self.days[:expired]:
+                del self.buckets[day]
+            del self.days[:expired]
+            for window in WINDOW_DAYS:
+                self.starts[window] -= expired
+
+    def summary(self, window: str, today: int) -> Dict[str, Any]:
+        self.advance(today)
+        articles, total, positive, negative = self.totals[window]
+        return {
+            "articles": int(articles),
+            "sentiment": round((total / articles + 1) / 2, 4) if articles else NEUTRAL_SENTIMENT,
+            "positive_share": round(positive / articles, 4) if articles else 0.0,
+            "negative_share": round(negative / articles, 4) if articles else 0.0,
+        }
+
+
+class SentimentIndex:
+    """
+    Pre-aggregated news sentiment for every symbol and analysis_timeframe.
+
+    Articles are added as they arrive (see NewsFeedIngestor) and folded into
+    RollingSentiment aggregates, so analyze_investment_risks reads a symbol's
+    sentiment for any window in O(1) instead of fetching and scoring every
+    article in the timeframe.
+
+    Example:
+        >>> sentiment_index.add({"symbols": ["NVDA"], "published": "2024-10-26T14:00:00Z",
+        ...                      "headline": "NVIDIA beats estimates on record data center growth"})
+        >>> sentiment_index.lookup(["NVDA", "AMD"], "3_months")
+        {"NVDA": {"articles": 1, "sentiment": 1.0, ...}, "AMD": {"articles": 0, "sentiment": 0.5, ...}}
+    """
+
+    def __init__(self):
+        self._symbols: Dict[str, RollingSentiment] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"articles": 0, "rejected": 0}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._symbols.clear()
+            self.stats = {"articles": 0, "rejected": 0}
+
+    def add(self, article: Dict[str, Any], today: Optional[date] = None) -> bool:
+        """
+        Fold one article into the aggregates.
+
+        An article names its symbols ("symbol" or "symbols") and publication
+        time ("published", ISO 8601 or epoch seconds), and carries a
+        "headline". A "sentiment" score from -1 to 1 is used when present;
+        otherwise the headline is scored with score_text.
+
+        Returns:
+            bool: False if the article was malformed and ignored
+        """
+        symbols = article.get("symbols") or ([article["symbol"]] if article.get("symbol") else [])
+        headline = str(article.get("headline") or "")
+        try:
+            day = _article_day(article["published"])
+            score = float(article["sentiment"]) if article.get("sentiment") is not None else score_text(headline)
+        except (KeyError, TypeError, ValueError):
+            self.count_rejected()
+            return False
+        if not symbols:
+            self.count_rejected()
+            return False
+
+        today_ordinal = (today or date.today()).toordinal()
+        score = max(-1.0, min(1.0, score))
+        with self._lock:
+            for symbol in symbols:
+                symbol = str(symbol).upper()
+                rolling = self._symbols.get(symbol)
+                if rolling is None:
+                    rolling = self._symbols[symbol] = RollingSentiment()
+                rolling.add(day, score, headline, today_ordinal)
+            self.stats["articles"] += 1
+        return True
+
+    def count_rejected(self) -> None:
+        """Count an article that could not be parsed or used"""
+        with self._lock:
+            self.stats["rejected"] += 1
+
+    def add_many(self, articles: Iterable[Dict[str, Any]], today: Optional[date] = None) -> int:
+        return sum(self.add(article, today) for article in articles)
+
+    def lookup(
+        self,
+        symbols: List[str],
+        analysis_timeframe: str = "3_months",
+        today: Optional[date] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Sentiment of each symbol over a timeframe, with its latest headlines.
+
+        Symbols without coverage get NEUTRAL_SENTIMENT and no articles.
+
+        Raises:
+            ValueError: If analysis_timeframe is not one of WINDOW_DAYS
+        """
+        if analysis_timeframe not in WINDOW_DAYS:
+            raise ValueError(f"Unknown analysis_timeframe: {analysis_timeframe}")
+        today_ordinal = (today or date.today()).toordinal()
+        result: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for symbol in symbols:
+                symbol = symbol.upper()
+                rolling = self._symbols.get(symbol)
+                if rolling is None:
+                    result[symbol] = {"articles": 0, "sentiment": NEUTRAL_SENTIMENT,
+                                      "positive_share": 0.0, "negative_share": 0.0, "headlines": []}
+                    continue
+                summary = rolling.summary(analysis_timeframe, today_ordinal)
+                cutoff = today_ordinal - WINDOW_DAYS[analysis_timeframe]
+                summary["headlines"] = [headline for day, headline in reversed(rolling.headlines) if day > cutoff]
+                result[symbol] = summary
+        return result
+
+    def sentiment_scores(self, symbols: List[str], analysis_timeframe: str = "3_months") -> List[float]:
+        """0-1 sentiment per symbol, in order, for risk_engine.score_risks(sentiment=...)"""
+        summaries = self.lookup(symbols, analysis_timeframe)
+        return [summaries[symbol.upper()]["sentiment"] for symbol in symbols]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "symbols": len(self._symbols)}
+
+
+sentiment_index = SentimentIndex()
+
+
+class NewsFeedIngestor:
+    """
+    Background task that tails a JSON Lines news feed into a SentimentIndex.
+
+    Stand-in for a news API or message-queue consumer: the feed file is read
+    from the last byte offset on every poll, so each article is scored
+    exactly once. A feed that shrinks (rotated or truncated) is read again
+    from the start into a fresh index.
+
+    Example:
+        >>> ingestor = NewsFeedIngestor("data/news/feed.jsonl")
+        >>> await ingestor.start()
+    """
+
+    def __init__(
+        self,
+        path: str = NEWS_FEED_PATH,
+        index: SentimentIndex = sentiment_index,
+        poll_seconds: float = NEWS_POLL_SECONDS
+    ):
+        self.path = path
+        self.index = index
+        self.poll_seconds = poll_seconds
+        self.offset = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def poll(self) -> int:
+        """Ingest articles appended since the last poll; returns how many were added"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        if size < self.offset:
+            self.offset = 0
+            self.index.clear()
+        if size == self.offset:
+            return 0
+
+        added = 0
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partially written; picked up on the next poll
+                self.offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    article = json.loads(line)
+                except ValueError:
+                    self.index.count_rejected()
+                    continue
+                added += self.index.add(article)
+        return added
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.poll)
+            except Exception:
+                logger.exception("News feed ingest failed")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"feed": self.path, "offset": self.offset, **self.index.snapshot()}
+
+
+news_ingestor = NewsFeedIngestor()
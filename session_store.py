@@ -0,0 +1,390 @@
+"""
+Nexus Agent - Persistent Session Store
+Append-only per-session event logs backing resumable SSE streams
+"""
+
+from typing import Dict, List, Optional, Any, AsyncIterator, Set, Tuple
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import os
+import time
+
+from lazy_imports import LazyClient, module_available
+from sse import HEARTBEAT_SECONDS, dumps, loads
+
+# Event types after which a session produces no further events
+TERMINAL_EVENT_TYPES = {"execution_complete", "error"}
+
+SESSION_TTL_SECONDS = 3600
+
+# How long a tailing reader waits for new events before re-checking the session
+TAIL_WAIT_SECONDS = HEARTBEAT_SECONDS
+
+LoggedEvent = Tuple[int, Dict[str, Any]]
+
+
+class SessionStore:
+    """
+    Base class for session stores.
+
+    Each session holds metadata (status, query, user_id, created_at) and an
+    append-only event log. Event ids start at 1 and increase by one per event,
+    so an SSE client's Last-Event-ID is also the number of events it has seen.
+    """
+
+    async def create(
+        self,
+        session_id: str,
+        query: str,
+        user_id: Optional[str] = None,
+        status: str = "running"
+    ) -> None:
+        raise NotImplementedError
+
+    async def append(self, session_id: str, event: Dict[str, Any]) -> int:
+        """Append an event and return its id"""
+        raise NotImplementedError
+
+    async def read(self, session_id: str, after_id: int = 0) -> List[LoggedEvent]:
+        """Return every event with an id greater than after_id"""
+        raise NotImplementedError
+
+    async def get_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def update_meta(self, session_id: str, **fields: Any) -> None:
+        raise NotImplementedError
+
+    async def wait(self, session_id: str, after_id: int, timeout: float) -> bool:
+        """Wait until the session changes; False if timeout elapsed first"""
+        raise NotImplementedError
+
+    async def tail_batches(self, session_id: str, after_id: int = 0) -> AsyncIterator[List[LoggedEvent]]:
+        """
+        Replay events after after_id, then follow the log until the session ends.
+
+        Events that are already available are yielded together, so a reader that
+        falls behind catches up in one batch.
+
+        Args:
+            session_id (str): Session to follow
+            after_id (int): Last event id the client has already received
+
+        Yields:
+            List[LoggedEvent]: (event_id, event) pairs in order; an empty list
+            means TAIL_WAIT_SECONDS passed with no new events
+        """
+        while True:
+            events = await self.read(session_id, after_id)
+            for index, (event_id, event) in enumerate(events):
+                if event.get("type") in TERMINAL_EVENT_TYPES:
+                    yield events[:index + 1]
+                    return
+            if events:
+                after_id = events[-1][0]
+                yield events
+                continue
+
+            meta = await self.get_meta(session_id)
+            if meta is None or meta.get("status") not in ("queued", "running"):
+                return
+            if not await self.wait(session_id, after_id, TAIL_WAIT_SECONDS):
+                yield []
+
+    async def tail(self, session_id: str, after_id: int = 0) -> AsyncIterator[LoggedEvent]:
+        """Like tail_batches, one (event_id, event) pair at a time"""
+        async for events in self.tail_batches(session_id, after_id):
+            for logged in events:
+                yield logged
+
+
+class EventLog:
+    """
+    Append-only event list held as one buffer of JSON documents.
+
+    A finished streaming session is mostly small text_delta events; as
+    dicts (or as separate bytes objects, which orjson over-allocates to
+    1 KB each) they take several times their encoded size. Here each event
+    costs its encoded length plus an offset, and is decoded when read.
+    """
+
+    __slots__ = ("buffer", "ends")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.ends = array("Q")
+
+    def append(self, event: Dict[str, Any]) -> int:
+        self.buffer += dumps(event)
+        self.ends.append(len(self.buffer))
+        return len(self.ends)
+
+    def read(self, after_id: int = 0) -> List[LoggedEvent]:
+        after_id = max(after_id, 0)
+        events = []
+        start = self.ends[after_id - 1] if after_id else 0
+        for event_id in range(after_id + 1, len(self.ends) + 1):
+            end = self.ends[event_id - 1]
+            events.append((event_id, loads(self.buffer[start:end])))
+            start = end
+        return events
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session store.
+
+    Suitable for a single worker; sessions older than ttl are dropped, as are
+    the oldest sessions once max_sessions is exceeded. Each session's events
+    are kept encoded in an EventLog.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = SESSION_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if len(self._sessions) <= self.max_sessions and oldest["created"] > cutoff:
+                break
+            self._sessions.popitem(last=False)
+
+    async def create(
+        self,
+        session_id: str,
+        query: str,
+        user_id: Optional[str] = None,
+        status: str = "running"
+    ) -> None:
+        self._prune()
+        self._sessions[session_id] = {
+            "created": time.monotonic(),
+            "meta": {
+                "status": status,
+                "query": query,
+                "user_id": user_id,
+                "created_at": datetime.now().isoformat()
+            },
+            "events": EventLog(),
+            "changed": None
+        }
+
+    async def _notify(self, session: Dict[str, Any]) -> None:
+        changed = session["changed"]
+        if changed is not None:
+            async with changed:
+                changed.notify_all()
+
+    async def append(self, session_id: str, event: Dict[str, Any]) -> int:
+        session = self._sessions[session_id]
+        event_id = session["events"].append(event)
+        await self._notify(session)
+        return event_id
+
+    async def read(self, session_id: str, after_id: int = 0) -> List[LoggedEvent]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return []
+        return session["events"].read(after_id)
+
+    async def get_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self._sessions.get(session_id)
+        return dict(session["meta"]) if session is not None else None
+
+    async def update_meta(self, session_id: str, **fields: Any) -> None:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return
+        session["meta"].update(fields)
+        await self._notify(session)
+
+    async def wait(self, session_id: str, after_id: int, timeout: float) -> bool:
+        session = self._sessions.get(session_id)
+        if session is None or len(session["events"]) > after_id:
+            return True
+        if session["changed"] is None:
+            session["changed"] = asyncio.Condition()
+        try:
+            async with session["changed"]:
+                await asyncio.wait_for(session["changed"].wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis-backed session store shared by every worker.
+
+    Events live in a list per session, so the id of an event is the list
+    length returned by RPUSH. Keys expire ttl seconds after the last write.
+
+    Every append and status change is also published on the session's
+    channel. A worker serving SSE clients subscribes to the channels of the
+    sessions it is tailing over one pub/sub connection, so events produced
+    on any worker reach the client without polling. With pubsub=False,
+    wait() polls the list instead.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl: int = SESSION_TTL_SECONDS,
+        poll_interval: float = 0.1,
+        key_prefix: str = "nexus:session:",
+        pubsub: bool = True
+    ):
+        self.redis = client
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.key_prefix = key_prefix
+        self.use_pubsub = pubsub
+        self._pubsub: Any = None
+        self._listener: Optional["asyncio.Task[None]"] = None
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._subscribed: Dict[str, "asyncio.Future[Any]"] = {}
+
+    def _meta_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}:meta"
+
+    def _events_key(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}:events"
+
+    def _channel(self, session_id: str) -> str:
+        return f"{self.key_prefix}{session_id}:notify"
+
+    async def _notify(self, session_id: str, message: Any) -> None:
+        if self.use_pubsub:
+            await self.redis.publish(self._channel(session_id), message)
+
+    async def create(
+        self,
+        session_id: str,
+        query: str,
+        user_id: Optional[str] = None,
+        status: str = "running"
+    ) -> None:
+        key = self._meta_key(session_id)
+        await self.redis.hset(key, mapping={
+            "status": status,
+            "query": query,
+            "user_id": user_id or "",
+            "created_at": datetime.now().isoformat()
+        })
+        await self.redis.expire(key, self.ttl)
+
+    async def append(self, session_id: str, event: Dict[str, Any]) -> int:
+        key = self._events_key(session_id)
+        event_id = await self.redis.rpush(key, dumps(event))
+        await self.redis.expire(key, self.ttl)
+        await self._notify(session_id, event_id)
+        return event_id
+
+    async def read(self, session_id: str, after_id: int = 0) -> List[LoggedEvent]:
+        raw = await self.redis.lrange(self._events_key(session_id), max(after_id, 0), -1)
+        return [(after_id + i + 1, loads(item)) for i, item in enumerate(raw)]
+
+    async def get_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
+        meta = await self.redis.hgetall(self._meta_key(session_id))
+        if not meta:
+            return None
+        meta = {_decode(k): _decode(v) for k, v in meta.items()}
+        meta["user_id"] = meta.get("user_id") or None
+        return meta
+
+    async def update_meta(self, session_id: str, **fields: Any) -> None:
+        key = self._meta_key(session_id)
+        await self.redis.hset(key, mapping={k: "" if v is None else str(v) for k, v in fields.items()})
+        await self.redis.expire(key, self.ttl)
+        await self._notify(session_id, "meta")
+
+    async def wait(self, session_id: str, after_id: int, timeout: float) -> bool:
+        if not self.use_pubsub:
+            return await self._poll(session_id, after_id, timeout)
+
+        changed = asyncio.Event()
+        waiters = self._waiters.setdefault(session_id, set())
+        waiters.add(changed)
+        try:
+            await self._subscribe(session_id)
+            # Re-check after subscribing, in case the event was published just before
+            if await self.redis.llen(self._events_key(session_id)) > after_id:
+                return True
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+            return True
+        finally:
+            waiters.discard(changed)
+            if not waiters:
+                del self._waiters[session_id]
+                self._subscribed.pop(session_id, None)
+                if self._pubsub is not None:
+                    await self._pubsub.unsubscribe(self._channel(session_id))
+
+    async def _subscribe(self, session_id: str) -> None:
+        """Subscribe to a session's channel once, however many local readers tail it"""
+        if self._pubsub is None:
+            self._pubsub = self.redis.pubsub()
+        subscribed = self._subscribed.get(session_id)
+        if subscribed is None:
+            subscribed = self._subscribed[session_id] = asyncio.ensure_future(
+                self._pubsub.subscribe(self._channel(session_id))
+            )
+        await asyncio.shield(subscribed)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Wake local readers of whichever session a message was published for"""
+        prefix, suffix = len(self.key_prefix), len(":notify")
+        while self._waiters:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Connection lost; readers fall back to their wait timeout
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if message is None:
+                continue
+            session_id = _decode(message["channel"])[prefix:-suffix]
+            for changed in self._waiters.get(session_id, ()):
+                changed.set()
+
+    async def _poll(self, session_id: str, after_id: int, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        key = self._events_key(session_id)
+        while time.monotonic() < deadline:
+            if await self.redis.llen(key) > after_id:
+                return True
+            await asyncio.sleep(self.poll_interval)
+        # Status changes are not signalled through the list, so report them as activity
+        meta = await self.get_meta(session_id)
+        return meta is None or meta.get("status") not in ("queued", "running")
+
+
+def _decode(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def create_session_store() -> SessionStore:
+    """Use Redis when REDIS_URL is set and redis is installed, else keep sessions in memory"""
+    url = os.getenv("REDIS_URL")
+    if url and module_available("redis"):
+        # redis.asyncio is imported on first use (or by the startup warmup), not at import time
+        return RedisSessionStore(LazyClient("redis.asyncio", lambda redis: redis.Redis.from_url(url)))
+    return InMemorySessionStore()
+
+
+session_store = create_session_store()
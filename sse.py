@@ -0,0 +1,90 @@
+"""
+Nexus Agent - SSE Event Encoding
+Byte-level frame encoding with a fast JSON path, batching and heartbeats
+"""
+
+from typing import Dict, List, Any, Iterator, Tuple
+import json
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# SSE comment frame sent when a stream has been idle, so proxies keep it open
+HEARTBEAT_FRAME = b": heartbeat\n\n"
+HEARTBEAT_SECONDS = 15.0
+
+# Frames ready at the same time are joined into chunks of at most this size
+MAX_CHUNK_BYTES = 16 * 1024
+
+# "id: N\ndata: " prefixes are pre-encoded for the first ids of every stream
+_ID_PREFIXES = [b"id: %d\ndata: " % i for i in range(4096)]
+_FRAME_END = b"\n\n"
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode obj as compact JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_frame(event_id: int, event: Dict[str, Any]) -> bytes:
+    """Encode one event as an SSE frame carrying its id"""
+    if 0 <= event_id < len(_ID_PREFIXES):
+        prefix = _ID_PREFIXES[event_id]
+    else:
+        prefix = b"id: %d\ndata: " % event_id
+    return prefix + dumps(event) + _FRAME_END
+
+
+def encode_batch(events: List[Tuple[int, Dict[str, Any]]]) -> Iterator[bytes]:
+    """
+    Encode a run of events as as few chunks as possible.
+
+    Args:
+        events (List[Tuple[int, Dict[str, Any]]]): (event_id, event) pairs
+
+    Yields:
+        bytes: Concatenated frames, each chunk at most MAX_CHUNK_BYTES unless a
+        single frame is larger
+    """
+    chunk: List[bytes] = []
+    size = 0
+    for event_id, event in events:
+        frame = encode_frame(event_id, event)
+        if chunk and size + len(frame) > MAX_CHUNK_BYTES:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+        chunk.append(frame)
+        size += len(frame)
+    if chunk:
+        yield b"".join(chunk)
+
+
+_timestamp_second = -1
+_timestamp_prefix = ""
+
+
+def now_iso() -> str:
+    """
+    Local time in ISO 8601 format with microseconds.
+
+    Equivalent to datetime.now().isoformat(), but the date and time up to the
+    second are formatted once per second rather than on every event.
+    """
+    global _timestamp_second, _timestamp_prefix
+    now = time.time()
+    second = int(now)
+    if second != _timestamp_second:
+        _timestamp_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+        _timestamp_second = second
+    return f"{_timestamp_prefix}.{int((now - second) * 1e6):06d}"
@@ -0,0 +1,45 @@
+"""
+Shared fixtures: the service modules live at the repository root, and the
+Redis-backed paths run against the in-memory stand-in in fake_redis.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from fake_redis import FakeAsyncRedis, FakeRedis  # noqa: E402
+
+
+class Clock:
+    """Manually advanced stand-in for time.monotonic / time.time"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def fake_redis(clock: Clock) -> FakeRedis:
+    server = FakeRedis()
+    server.clock = clock
+    return server
+
+
+@pytest.fixture
+def fake_async_redis() -> FakeAsyncRedis:
+    return FakeAsyncRedis()
@@ -0,0 +1,378 @@
+"""
+In-memory stand-in for the parts of redis-py the services use.
+
+FakeRedis mirrors the synchronous client (financial_cache), FakeAsyncRedis
+the redis.asyncio client (session_store, work_queue). Both store bytes like
+a client without decode_responses. Setting down = True makes every command
+raise ConnectionError, as a client does when the server is unreachable.
+"""
+
+from typing import Dict, List, Optional, Any, Iterable
+import asyncio
+import fnmatch
+import time
+
+
+def _bytes(value: Any) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakeRedis:
+    """Synchronous fake: strings with expiry, lists, hashes, sets and sorted sets"""
+
+    def __init__(self):
+        self.data: Dict[bytes, Any] = {}
+        self.expiry: Dict[bytes, float] = {}
+        self.down = False
+        self.clock = time.monotonic
+
+    # Housekeeping
+
+    def _check(self) -> None:
+        if self.down:
+            raise ConnectionError("Connection refused")
+
+    def _live(self, key: Any) -> bytes:
+        key = _bytes(key)
+        deadline = self.expiry.get(key)
+        if deadline is not None and self.clock() >= deadline:
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return key
+
+    def _get(self, key: Any, kind: type) -> Any:
+        key = self._live(key)
+        value = self.data.get(key)
+        if value is not None and not isinstance(value, kind):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _container(self, key: Any, kind: type) -> Any:
+        value = self._get(key, kind)
+        if value is None:
+            value = self.data[_bytes(key)] = kind()
+        return value
+
+    def _drop_if_empty(self, key: Any) -> None:
+        key = _bytes(key)
+        if key in self.data and not self.data[key]:
+            del self.data[key]
+            self.expiry.pop(key, None)
+
+    # Keys
+
+    def ping(self) -> bool:
+        self._check()
+        return True
+
+    def delete(self, *keys: Any) -> int:
+        self._check()
+        removed = 0
+        for key in keys:
+            key = self._live(key)
+            if self.data.pop(key, None) is not None:
+                removed += 1
+            self.expiry.pop(key, None)
+        return removed
+
+    def exists(self, key: Any) -> int:
+        self._check()
+        return int(self._live(key) in self.data)
+
+    def keys(self, pattern: str = "*") -> List[bytes]:
+        self._check()
+        return [key for key in list(self.data) if self._live(key) in self.data and fnmatch.fnmatchcase(key.decode(), pattern)]
+
+    def expire(self, key: Any, seconds: float) -> bool:
+        self._check()
+        key = self._live(key)
+        if key not in self.data:
+            return False
+        self.expiry[key] = self.clock() + seconds
+        return True
+
+    def pttl(self, key: Any) -> int:
+        self._check()
+        key = self._live(key)
+        if key not in self.data:
+            return -2
+        if key not in self.expiry:
+            return -1
+        return max(0, int((self.expiry[key] - self.clock()) * 1000))
+
+    def flushall(self) -> None:
+        self.data.clear()
+        self.expiry.clear()
+
+    # Strings
+
+    def get(self, key: Any) -> Optional[bytes]:
+        self._check()
+        return self._get(key, bytes)
+
+    def set(self, key: Any, value: Any, ex: Optional[float] = None) -> bool:
+        self._check()
+        key = _bytes(key)
+        self.data[key] = _bytes(value)
+        self.expiry.pop(key, None)
+        if ex is not None:
+            self.expiry[key] = self.clock() + ex
+        return True
+
+    def setex(self, key: Any, seconds: float, value: Any) -> bool:
+        return self.set(key, value, ex=seconds)
+
+    def incr(self, key: Any) -> int:
+        return self.incrby(key, 1)
+
+    def decr(self, key: Any) -> int:
+        return self.incrby(key, -1)
+
+    def incrby(self, key: Any, amount: int) -> int:
+        self._check()
+        value = int(self._get(key, bytes) or 0) + amount
+        self.data[_bytes(key)] = _bytes(str(value))
+        return value
+
+    # Lists
+
+    def rpush(self, key: Any, *values: Any) -> int:
+        self._check()
+        items = self._container(key, list)
+        items.extend(_bytes(value) for value in values)
+        return len(items)
+
+    def lpush(self, key: Any, *values: Any) -> int:
+        self._check()
+        items = self._container(key, list)
+        for value in values:
+            items.insert(0, _bytes(value))
+        return len(items)
+
+    def lpop(self, key: Any) -> Optional[bytes]:
+        self._check()
+        items = self._get(key, list)
+        if not items:
+            return None
+        value = items.pop(0)
+        self._drop_if_empty(key)
+        return value
+
+    def llen(self, key: Any) -> int:
+        self._check()
+        return len(self._get(key, list) or [])
+
+    def lrange(self, key: Any, start: int, end: int) -> List[bytes]:
+        self._check()
+        items = self._get(key, list) or []
+        end = len(items) if end == -1 else end + 1
+        return list(items[start:end])
+
+    def lrem(self, key: Any, count: int, value: Any) -> int:
+        self._check()
+        items = self._get(key, list)
+        if not items:
+            return 0
+        value = _bytes(value)
+        removed = 0
+        kept = []
+        # A negative count removes from the tail
+        for item in (reversed(items) if count < 0 else items):
+            if item == value and (count == 0 or removed < abs(count)):
+                removed += 1
+                continue
+            kept.append(item)
+        items[:] = kept[::-1] if count < 0 else kept
+        self._drop_if_empty(key)
+        return removed
+
+    def lmove(self, source: Any, destination: Any, src: str = "LEFT", dest: str = "RIGHT") -> Optional[bytes]:
+        self._check()
+        items = self._get(source, list)
+        if not items:
+            return None
+        value = items.pop(0 if src == "LEFT" else -1)
+        self._drop_if_empty(source)
+        target = self._container(destination, list)
+        if dest == "LEFT":
+            target.insert(0, value)
+        else:
+            target.append(value)
+        return value
+
+    # Hashes
+
+    def hset(self, key: Any, field: Any = None, value: Any = None, mapping: Optional[Dict[Any, Any]] = None) -> int:
+        self._check()
+        fields = self._container(key, dict)
+        updates = dict(mapping or {})
+        if field is not None:
+            updates[field] = value
+        added = 0
+        for name, item in updates.items():
+            name = _bytes(name)
+            added += name not in fields
+            fields[name] = _bytes(item)
+        return added
+
+    def hgetall(self, key: Any) -> Dict[bytes, bytes]:
+        self._check()
+        return dict(self._get(key, dict) or {})
+
+    # Sets
+
+    def sadd(self, key: Any, *members: Any) -> int:
+        self._check()
+        items = self._container(key, set)
+        before = len(items)
+        items.update(_bytes(member) for member in members)
+        return len(items) - before
+
+    def srem(self, key: Any, *members: Any) -> int:
+        self._check()
+        items = self._get(key, set)
+        if not items:
+            return 0
+        before = len(items)
+        items.difference_update(_bytes(member) for member in members)
+        removed = before - len(items)
+        self._drop_if_empty(key)
+        return removed
+
+    def smembers(self, key: Any) -> set:
+        self._check()
+        return set(self._get(key, set) or ())
+
+    # Sorted sets
+
+    def zadd(self, key: Any, mapping: Dict[Any, float], nx: bool = False, xx: bool = False) -> int:
+        self._check()
+        scores = self._container(key, dict)
+        added = 0
+        for member, score in mapping.items():
+            member = _bytes(member)
+            exists = member in scores
+            if (nx and exists) or (xx and not exists):
+                continue
+            added += not exists
+            scores[member] = float(score)
+        self._drop_if_empty(key)
+        return added
+
+    def zscore(self, key: Any, member: Any) -> Optional[float]:
+        self._check()
+        return (self._get(key, dict) or {}).get(_bytes(member))
+
+    def zrem(self, key: Any, *members: Any) -> int:
+        self._check()
+        scores = self._get(key, dict)
+        if not scores:
+            return 0
+        removed = sum(scores.pop(_bytes(member), None) is not None for member in members)
+        self._drop_if_empty(key)
+        return removed
+
+    # Pub/sub
+
+    def publish(self, channel: Any, message: Any) -> int:
+        self._check()
+        return 0
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them together on execute(), like a redis-py pipeline"""
+
+    def __init__(self, server: FakeRedis):
+        self.server = server
+        self.commands: List[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.server, name)
+
+        def queue(*args: Any, **kwargs: Any) -> "FakePipeline":
+            self.commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> List[Any]:
+        commands, self.commands = self.commands, []
+        return [method(*args, **kwargs) for method, args, kwargs in commands]
+
+
+class FakePubSub:
+    """Async pub/sub connection fed by FakeAsyncRedis.publish"""
+
+    def __init__(self, server: "FakeAsyncRedis"):
+        self.server = server
+        self.channels: set = set()
+        self.messages: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def subscribe(self, *channels: Any) -> None:
+        self.server.sync._check()
+        for channel in channels:
+            self.channels.add(_bytes(channel))
+        self.server.subscribers.add(self)
+
+    async def unsubscribe(self, *channels: Any) -> None:
+        for channel in channels:
+            self.channels.discard(_bytes(channel))
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0) -> Optional[Dict[str, Any]]:
+        self.server.sync._check()
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class FakeAsyncRedis:
+    """redis.asyncio-style fake over a FakeRedis, with BLPOP and pub/sub"""
+
+    def __init__(self, sync: Optional[FakeRedis] = None):
+        self.sync = sync or FakeRedis()
+        self.subscribers: set = set()
+        self._changed = asyncio.Condition()
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.sync, name)
+
+        async def command(*args: Any, **kwargs: Any) -> Any:
+            result = method(*args, **kwargs)
+            async with self._changed:
+                self._changed.notify_all()
+            return result
+
+        return command
+
+    async def blpop(self, keys: Iterable[Any], timeout: float = 0) -> Optional[tuple]:
+        self.sync._check()
+        keys = list(keys)
+        deadline = asyncio.get_running_loop().time() + timeout
+        async with self._changed:
+            while True:
+                for key in keys:
+                    value = self.sync.lpop(key)
+                    if value is not None:
+                        return (_bytes(key), value)
+                remaining = deadline - asyncio.get_running_loop().time()
+                if timeout and remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining if timeout else None)
+                except asyncio.TimeoutError:
+                    return None
+
+    async def publish(self, channel: Any, message: Any) -> int:
+        self.sync._check()
+        channel = _bytes(channel)
+        receivers = [pubsub for pubsub in self.subscribers if channel in pubsub.channels]
+        for pubsub in receivers:
+            pubsub.messages.put_nowait({"type": "message", "channel": channel, "data": _bytes(message)})
+        return len(receivers)
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
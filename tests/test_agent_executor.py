@@ -0,0 +1,191 @@
+import asyncio
+import time
+
+import pytest
+
+import agent_executor
+from agent_executor import ReActExecutor, infer_dependencies
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def step(number, tool, depends_on=None, **parameters):
+    planned = {"step": number, "thought": f"step {number}", "action": {"tool": tool, "parameters": parameters}}
+    if depends_on is not None:
+        planned["depends_on"] = depends_on
+    return planned
+
+
+def financial_data(delay=0.0, figures=None):
+    figures = figures or {}
+
+    async def get_financial_data(symbol, period=None, **_):
+        await asyncio.sleep(delay)
+        revenue, growth = figures.get(symbol, (1.0e9, 0.1))
+        return {"symbol": symbol, "period": period, "data": {"revenue": revenue, "year_over_year_growth": growth}}
+
+    return get_financial_data
+
+
+def executor(plan, tools, timeouts=None):
+    return ReActExecutor(plan, tools=tools, timeouts=timeouts or {}, streaming_tools={})
+
+
+async def collect(run_events):
+    return [event async for event in run_events]
+
+
+def test_synthesis_waits_on_every_earlier_step_and_depends_on_is_explicit():
+    plan = [
+        step(1, "get_financial_data", symbol="NVDA"),
+        step(2, "get_financial_data", symbol="AMD"),
+        step(3, "analyze_investment_risks", depends_on=[1, 2, 3, 99], symbols=["NVDA", "AMD"]),
+        step(4, "generate_text_output"),
+        step(5, "final_response", depends_on=[]),
+    ]
+    assert infer_dependencies(plan) == {1: set(), 2: set(), 3: {1, 2}, 4: {1, 2, 3}, 5: set()}
+
+
+def test_independent_steps_run_concurrently_and_dependents_wait():
+    plan = [
+        step(1, "get_financial_data", symbol="NVDA"),
+        step(2, "get_financial_data", symbol="AMD"),
+        step(3, "get_financial_data", symbol="INTC"),
+        step(4, "final_response", summary="done"),
+    ]
+
+    async def scenario():
+        started = time.perf_counter()
+        events = await collect(executor(plan, {"get_financial_data": financial_data(delay=0.2)}).run())
+        return events, time.perf_counter() - started
+
+    events, elapsed = run(scenario())
+
+    # Critical path is one 0.2 s fetch, not the 0.6 s sum of all three
+    assert elapsed < 0.45
+    order = [(event["step"], event["status"]) for event in events]
+    assert order.index((4, "in_progress")) > max(order.index((n, "completed")) for n in (1, 2, 3))
+    assert [event["status"] for event in events if event["step"] == 4] == ["in_progress", "completed"]
+
+
+def test_explicit_dependency_orders_otherwise_independent_steps():
+    plan = [
+        step(1, "get_financial_data", symbol="NVDA"),
+        step(2, "get_financial_data", depends_on=[1], symbol="AMD"),
+    ]
+    events = run(collect(executor(plan, {"get_financial_data": financial_data(delay=0.05)}).run()))
+    assert [(event["step"], event["status"]) for event in events] == [
+        (1, "in_progress"), (1, "completed"), (2, "in_progress"), (2, "completed")
+    ]
+
+
+def test_tool_timeout_becomes_an_error_event():
+    plan = [step(1, "get_financial_data", symbol="NVDA"), step(2, "final_response")]
+
+    async def scenario():
+        return await asyncio.wait_for(collect(executor(
+            plan, {"get_financial_data": financial_data(delay=5)}, timeouts={"get_financial_data": 0.05}
+        ).run()), 2)
+
+    events = run(scenario())
+    terminal = {event["step"]: event for event in events if event["status"] != "in_progress"}
+    assert terminal[1]["status"] == "error"
+    assert terminal[1]["observation"] == "get_financial_data timed out"
+    # Synthesis still runs on what the run has
+    assert terminal[2]["status"] == "completed"
+
+
+def test_failing_bookkeeping_still_ends_the_step(monkeypatch):
+    def broken(step, result):
+        raise RuntimeError("cannot render")
+
+    monkeypatch.setattr(agent_executor, "format_observation", broken)
+    plan = [step(1, "get_financial_data", symbol="NVDA"), step(2, "get_financial_data", symbol="AMD")]
+
+    async def scenario():
+        run_executor = executor(plan, {"get_financial_data": financial_data()})
+        return run_executor, await asyncio.wait_for(collect(run_executor.run()), 2)
+
+    run_executor, events = run(scenario())
+    terminal = [event for event in events if event["status"] != "in_progress"]
+    assert [event["status"] for event in terminal] == ["error", "error"]
+    assert terminal[0]["observation"] == "get_financial_data step failed: cannot render"
+    assert run_executor.observations == {}
+    assert [record.status for record in run_executor.trace.by_step()] == ["error", "error"]
+
+
+def test_consumer_stopping_early_cancels_outstanding_tools():
+    cancelled = []
+
+    async def slow(symbol, **_):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(symbol)
+            raise
+
+    plan = [step(1, "get_financial_data", symbol="NVDA"), step(2, "get_financial_data", symbol="AMD")]
+
+    async def scenario():
+        events = executor(plan, {"get_financial_data": slow}).run()
+        first = await events.__anext__()
+        assert first["status"] == "in_progress"
+        await asyncio.wait_for(events.aclose(), 1)
+
+    run(scenario())
+    assert sorted(cancelled) == ["AMD", "NVDA"]
+
+
+def test_unknown_tool_is_an_error_not_a_crash():
+    events = run(collect(executor([step(1, "no_such_tool")], {}).run()))
+    assert events[-1] == {"step": 1, "observation": "Unknown tool: no_such_tool", "status": "error"}
+
+
+def test_final_result_reports_the_symbols_the_plan_used():
+    plan = [
+        step(1, "get_financial_data", symbol="INTC", period="Q2 2024"),
+        step(2, "get_financial_data", symbol="AAPL", period="Q2 2024"),
+        step(3, "analyze_investment_risks", symbols=["INTC", "AAPL"]),
+        step(4, "final_response", summary="Apple grew faster"),
+    ]
+
+    def risks(symbols, **_):
+        return {"risk_scores": {"INTC": 61, "AAPL": 38}, "key_risks": {"INTC": ["Foundry losses"], "AAPL": []}}
+
+    tools = {
+        "get_financial_data": financial_data(figures={"INTC": (12.83e9, -0.01), "AAPL": (85.78e9, 0.05)}),
+        "analyze_investment_risks": risks,
+    }
+    run_executor = executor(plan, tools)
+    run(collect(run_executor.run()))
+    result = run_executor.final_result()
+
+    assert result["comparison"] == [
+        {"symbol": "INTC", "period": "Q2 2024", "revenue": 12.83e9, "growth": -0.01, "risk_score": 61,
+         "key_risk": "Foundry losses"},
+        {"symbol": "AAPL", "period": "Q2 2024", "revenue": 85.78e9, "growth": 0.05, "risk_score": 38},
+    ]
+    assert result["recommendation"]["symbol"] == "AAPL"
+    assert result["recommendation"]["reasoning"] == "Highest year-over-year revenue growth: AAPL +5% vs INTC -1%"
+    assert result["risks_summary"] == {"INTC": "Foundry losses"}
+    assert result["execution_summary"] == {
+        "steps": 4, "completed": 4, "errors": 0, "skipped": 0, "conclusion": "Apple grew faster"
+    }
+    assert "NVIDIA" not in str(result) and "NVDA" not in str(result)
+
+
+async def no_data(**_):
+    return None
+
+
+@pytest.mark.parametrize("tool", [no_data, financial_data(figures={"INTC": (1.0, 0.1), "AAPL": (1.0, 0.1)})],
+                         ids=["no data", "tied growth"])
+def test_no_recommendation_without_a_clear_leader(tool):
+    plan = [step(1, "get_financial_data", symbol="INTC"), step(2, "get_financial_data", symbol="AAPL")]
+    run_executor = executor(plan, {"get_financial_data": tool})
+    run(collect(run_executor.run()))
+    result = run_executor.final_result()
+    assert result["recommendation"] is None
+    assert [company["symbol"] for company in result["comparison"]] == ["INTC", "AAPL"]
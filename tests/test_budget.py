@@ -0,0 +1,166 @@
+import asyncio
+import types
+
+import pytest
+
+import budget
+import financial_cache
+from agent_executor import ReActExecutor
+from budget import DEFAULT_ESTIMATES, RunBudget, ToolCostModel, cheaper_variants
+from financial_cache import FinancialDataCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def costs():
+    return ToolCostModel(cache=None)
+
+
+@pytest.fixture
+def frozen_time(monkeypatch, clock):
+    monkeypatch.setattr(budget, "time", types.SimpleNamespace(time=clock))
+    return clock
+
+
+def action(tool, **parameters):
+    return {"tool": tool, "parameters": parameters}
+
+
+RISKS = action("analyze_investment_risks", symbols=["NVDA", "AMD"])
+EMAIL = action("generate_text_output", content_type="email_draft")
+
+
+def test_planned_variant_is_kept_while_it_fits(frozen_time, costs):
+    run_budget = RunBudget(latency_seconds=10, costs=costs)
+    assert run_budget.choose(1, RISKS, [EMAIL]) == RISKS
+    assert run_budget.degraded == {} and not run_budget.partial
+
+
+def test_cheaper_variant_is_picked_to_leave_room_for_synthesis(frozen_time, costs):
+    # 3 s left; the email's cheapest form (bullet points, 1.5 s) is kept in hand
+    run_budget = RunBudget(latency_seconds=3, costs=costs)
+    chosen = run_budget.choose(1, RISKS, [EMAIL])
+
+    assert chosen["parameters"] == {"symbols": ["NVDA", "AMD"], "include_sentiment": False}
+    assert run_budget.degraded == {1: "analyze_investment_risks:no_sentiment"}
+    assert run_budget.spent_usd == pytest.approx(DEFAULT_ESTIMATES["analyze_investment_risks:no_sentiment"][1])
+
+
+def test_data_step_is_skipped_while_synthesis_is_pending(frozen_time, costs):
+    run_budget = RunBudget(cost_usd=0.008, costs=costs)
+
+    # Neither risk variant fits beside the cheapest email, so the step is skipped...
+    assert run_budget.choose(1, RISKS, [EMAIL]) is None
+    assert run_budget.skipped == {1: "cost budget"}
+    assert not run_budget.exhausted
+
+    # ...and the synthesis step still runs, in the form the money left allows
+    chosen = run_budget.choose(2, EMAIL, [])
+    assert chosen["parameters"]["content_type"] == "bullet_points"
+    assert run_budget.degraded == {2: "generate_text_output:bullet_points"}
+    assert run_budget.partial
+
+
+def test_synthesis_that_cannot_fit_does_not_starve_the_current_step(frozen_time, costs):
+    # The email cannot fit in 1 s whatever happens, so nothing is reserved for it
+    run_budget = RunBudget(latency_seconds=1, costs=costs)
+    chosen = run_budget.choose(1, RISKS, [EMAIL])
+    assert chosen["parameters"]["include_sentiment"] is False
+
+
+def test_budget_is_exhausted_at_the_deadline(frozen_time, costs):
+    run_budget = RunBudget(latency_seconds=2, costs=costs)
+    frozen_time.advance(1.95)
+
+    assert run_budget.deadline_reached()
+    assert run_budget.choose(1, RISKS, []) is None
+    assert run_budget.exhausted
+    assert run_budget.choose(2, EMAIL, []) is None
+    assert run_budget.skipped == {1: "latency budget", 2: "budget exhausted"}
+    # final_response always runs, so the run can still answer
+    assert run_budget.choose(3, action("final_response"), []) is not None
+    assert run_budget.timeout(30) == 0.0
+    assert run_budget.snapshot()["skipped_steps"] == {"1": "latency budget", "2": "budget exhausted"}
+
+
+def test_run_cut_off_at_the_deadline_finishes_as_partial():
+    import main
+
+    async def slow_data(symbol, **_):
+        await asyncio.sleep(5)
+
+    async def text(**_):
+        return {"content": "summary"}
+
+    plan = [
+        {"step": 1, "thought": "", "action": action("get_financial_data", symbol="NVDA")},
+        {"step": 2, "thought": "", "action": action("generate_text_output", content_type="bullet_points")},
+        {"step": 3, "thought": "", "action": action("final_response", summary="done")},
+    ]
+    costs = ToolCostModel(estimates={
+        **DEFAULT_ESTIMATES, "get_financial_data": (0.1, 0.0), "generate_text_output:bullet_points": (0.05, 0.0)
+    }, cache=None)
+    executor = ReActExecutor(
+        plan,
+        tools={"get_financial_data": slow_data, "generate_text_output": text},
+        timeouts={},
+        streaming_tools={},
+        budget=RunBudget(latency_seconds=0.6, costs=costs)
+    )
+
+    async def scenario():
+        return [event async for event in executor.run()]
+
+    events = run(asyncio.wait_for(scenario(), 3))
+    terminal = {event["step"]: event["status"] for event in events if event["status"] != "in_progress"}
+
+    assert terminal == {1: "error", 2: "skipped", 3: "completed"}
+    assert executor.errors[1] == "get_financial_data stopped at the latency budget"
+    assert executor.budget.exhausted
+    final_result = executor.final_result()
+    assert main.budget_outcome(executor, final_result) == "partial"
+    assert final_result["partial"] is True
+    assert final_result["completed_steps"] == [3]
+
+
+def test_stale_variant_is_only_cheap_while_the_cache_can_serve_it(monkeypatch, clock):
+    monkeypatch.setattr(financial_cache, "time", types.SimpleNamespace(monotonic=clock))
+    cache = FinancialDataCache(fetch=lambda *args: None)
+    costs = ToolCostModel(cache=cache)
+    quote = {"symbol": "NVDA", "data_type": "real_time_price", "max_stale": 300}
+    fresh = DEFAULT_ESTIMATES["get_financial_data:real_time_price"]
+
+    assert cheaper_variants("get_financial_data", {**quote, "max_stale": None})[1] == quote
+    assert costs.estimate("get_financial_data", quote) == fresh
+
+    cache.put("NVDA", "real_time_price", None, None, {"symbol": "NVDA", "data": {"price": 140.0}})
+    clock.advance(60)  # expired 55 s ago, within max_stale
+    assert costs.estimate("get_financial_data", quote) == DEFAULT_ESTIMATES["get_financial_data:stale"]
+
+    clock.advance(300)
+    assert costs.estimate("get_financial_data", quote) == fresh
+
+
+def test_observed_latency_moves_the_estimate(costs):
+    costs.observe("analyze_investment_risks", {"symbols": ["NVDA"]}, 4.0)
+    assert costs.estimate("analyze_investment_risks", {"symbols": ["NVDA"]})[0] == pytest.approx(2.4)
+    costs.observe("analyze_investment_risks", {"include_sentiment": False}, 0.3)
+    assert costs.latency["analyze_investment_risks:no_sentiment"] == pytest.approx(0.7)
+
+
+@pytest.mark.parametrize("preferences", [
+    {"latency_budget_seconds": 0}, {"cost_budget_usd": -1}, {"latency_budget_seconds": True},
+    {"cost_budget_usd": "cheap"},
+])
+def test_invalid_budgets_are_rejected(preferences):
+    with pytest.raises(ValueError):
+        RunBudget.from_preferences(preferences)
+
+
+def test_no_budget_preferences_means_no_budget():
+    assert RunBudget.from_preferences({"tone": "formal"}) is None
+    assert RunBudget.from_preferences(None) is None
+    assert RunBudget.from_preferences({"cost_budget_usd": 1}, started=5.0).started == 5.0
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from financial_batch import FinancialDataCoalescer, SingleFlight
+from financial_cache import FinancialDataCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def result_for(symbol, period="Q3 2024"):
+    return {"symbol": symbol, "data_type": "quarterly_financials", "period": period, "data": {"revenue": 1.0}}
+
+
+class SlowFetch:
+    """Blocking get_financial_data stand-in that counts calls and can fail"""
+
+    def __init__(self, delay=0.05, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = []
+
+    def __call__(self, symbol, data_type, period, metrics):
+        self.calls.append(symbol)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return result_for(symbol, period)
+
+
+class SlowFetchMany(SlowFetch):
+    def __call__(self, symbols, data_type, period, metrics):
+        self.calls.append(list(symbols))
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {symbol.lower(): result_for(symbol, period) for symbol in symbols}
+
+
+def coalescer(fetch=None, fetch_many=None, cache=None):
+    return FinancialDataCoalescer(
+        cache=cache or FinancialDataCache(),
+        fetch=fetch or SlowFetch(),
+        fetch_many=fetch_many or SlowFetchMany(),
+        store=None
+    )
+
+
+def test_concurrent_identical_calls_share_one_fetch():
+    async def scenario():
+        fetch = SlowFetch()
+        front = coalescer(fetch=fetch)
+        results = await asyncio.gather(*(front.get_financial_data("NVDA", period="Q3 2024") for _ in range(10)))
+
+        assert fetch.calls == ["NVDA"]
+        assert all(result == result_for("NVDA") for result in results)
+        assert front.flights.stats == {"leaders": 1, "coalesced": 9}
+
+        # Later calls are answered from the cache
+        assert await front.get_financial_data("nvda", period="Q3 2024") == result_for("NVDA")
+        assert fetch.calls == ["NVDA"]
+
+    run(scenario())
+
+
+def test_fetch_error_reaches_every_waiter():
+    async def scenario():
+        fetch = SlowFetch(error=RuntimeError("provider down"))
+        front = coalescer(fetch=fetch)
+        results = await asyncio.gather(
+            *(front.get_financial_data("NVDA", period="Q3 2024") for _ in range(5)), return_exceptions=True
+        )
+
+        assert len(fetch.calls) == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        # Nothing stays in flight, so the next call tries again
+        assert front.flights._inflight == {}
+
+    run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_fetch():
+    async def scenario():
+        fetch = SlowFetch(delay=0.1)
+        front = coalescer(fetch=fetch)
+        impatient = asyncio.create_task(front.get_financial_data("NVDA", period="Q3 2024"))
+        await asyncio.sleep(0.01)
+        patient = asyncio.create_task(front.get_financial_data("NVDA", period="Q3 2024"))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+
+        assert await patient == result_for("NVDA")
+        assert fetch.calls == ["NVDA"]
+
+    run(scenario())
+
+
+def test_bulk_request_fetches_only_symbols_not_cached_or_in_flight():
+    async def scenario():
+        fetch, fetch_many = SlowFetch(), SlowFetchMany()
+        front = coalescer(fetch=fetch, fetch_many=fetch_many)
+        await front.get_financial_data("NVDA", period="Q3 2024")
+
+        single = asyncio.create_task(front.get_financial_data("AMD", period="Q3 2024"))
+        await asyncio.sleep(0.01)
+        results = await front.get_financial_data_many(["nvda", "AMD", "INTC", "TSM", "INTC"], period="Q3 2024")
+        await single
+
+        assert fetch_many.calls == [["INTC", "TSM"]]
+        assert fetch.calls == ["NVDA", "AMD"]
+        assert results == {symbol: result_for(symbol) for symbol in ("NVDA", "AMD", "INTC", "TSM")}
+
+        # Single-symbol callers join a bulk fetch in flight
+        bulk = asyncio.create_task(front.get_financial_data_many(["AAPL", "MSFT"], period="Q3 2024"))
+        await asyncio.sleep(0.01)
+        assert await front.get_financial_data("MSFT", period="Q3 2024") == result_for("MSFT")
+        await bulk
+        assert fetch.calls == ["NVDA", "AMD"]
+
+    run(scenario())
+
+
+def test_bulk_falls_back_to_one_call_per_symbol():
+    async def scenario():
+        fetch = SlowFetch()
+        front = coalescer(fetch=fetch, fetch_many=lambda *args: None)
+        results = await front.get_financial_data_many(["NVDA", "AMD"], period="Q3 2024")
+
+        assert sorted(fetch.calls) == ["AMD", "NVDA"]
+        assert set(results) == {"NVDA", "AMD"}
+
+    run(scenario())
+
+
+def test_bulk_error_reaches_every_symbol_waiter():
+    async def scenario():
+        front = coalescer(fetch_many=SlowFetchMany(error=RuntimeError("provider down")))
+        bulk = asyncio.create_task(front.get_financial_data_many(["NVDA", "AMD"], period="Q3 2024"))
+        await asyncio.sleep(0.01)
+        single = asyncio.create_task(front.get_financial_data("AMD", period="Q3 2024"))
+
+        for task in (bulk, single):
+            with pytest.raises(RuntimeError):
+                await task
+
+    run(scenario())
+
+
+def test_redis_tier_is_read_and_written_off_the_event_loop(fake_redis):
+    loop_threads = set()
+    redis_threads = set()
+
+    class RecordingRedis:
+        def __getattr__(self, name):
+            redis_threads.add(threading.get_ident())
+            return getattr(fake_redis, name)
+
+    async def scenario():
+        loop_threads.add(threading.get_ident())
+        cache = FinancialDataCache(redis_client=RecordingRedis())
+        front = coalescer(cache=cache)
+        await front.get_financial_data("NVDA", period="Q3 2024")
+        await front.get_financial_data_many(["AMD", "INTC"], period="Q3 2024")
+
+        # A second worker's cache only has Redis to answer from
+        other = coalescer(cache=FinancialDataCache(redis_client=RecordingRedis()), fetch=SlowFetch(error=AssertionError()))
+        assert await other.get_financial_data("NVDA", period="Q3 2024") == result_for("NVDA")
+
+    run(scenario())
+    assert redis_threads and not redis_threads & loop_threads
+
+
+def test_single_flight_forgets_finished_work():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            return 42
+
+        assert await asyncio.gather(flights.do("k", work), flights.do("k", work)) == [42, 42]
+        assert flights._inflight == {}
+        assert flights.stats == {"leaders": 1, "coalesced": 1}
+
+    run(scenario())
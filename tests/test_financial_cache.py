@@ -0,0 +1,173 @@
+from datetime import date
+import types
+
+import pytest
+
+import financial_cache
+from financial_cache import (
+    CLOSED_PERIOD_TTL, OPEN_PERIOD_TTL, FinancialDataCache, _covers, _project, is_closed_period,
+    quarter_end_month, ttl_for
+)
+
+FULL_RESULT = {
+    "symbol": "NVDA",
+    "period": "Q3 2024",
+    "data": {"revenue": 35.08, "revenue_growth": 0.17, "year_over_year_growth": 0.94, "eps": 0.81, "currency": "USD"},
+}
+
+
+class RecordingFetch:
+    """get_financial_data stand-in that counts upstream calls"""
+
+    def __init__(self, result=FULL_RESULT):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, symbol, data_type, period, metrics):
+        self.calls.append((symbol, data_type, period, metrics))
+        if self.result is None:
+            return None
+        data = {k: v for k, v in self.result["data"].items() if metrics is None or k in metrics or k == "currency"}
+        return {**self.result, "data": data}
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch, clock):
+    monkeypatch.setattr(financial_cache, "time", types.SimpleNamespace(monotonic=clock))
+
+
+def test_local_tier_answers_repeat_calls():
+    fetch = RecordingFetch()
+    cache = FinancialDataCache(fetch=fetch)
+
+    first = cache.get_financial_data("nvda", "quarterly_financials", "Q3 2024", ["revenue"])
+    second = cache.get_financial_data("NVDA", "quarterly_financials", "Q3 2024", ["revenue"])
+
+    assert first == second
+    assert len(fetch.calls) == 1
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_redis_tier_is_shared_between_caches(fake_redis):
+    fetch = RecordingFetch()
+    writer = FinancialDataCache(fetch=fetch, redis_client=fake_redis)
+    reader = FinancialDataCache(fetch=fetch, redis_client=fake_redis)
+
+    writer.get_financial_data("NVDA", "quarterly_financials", "Q3 2024")
+    result = reader.get_financial_data("NVDA", "quarterly_financials", "Q3 2024")
+
+    assert result == FULL_RESULT
+    assert len(fetch.calls) == 1
+    assert reader.stats["redis_hits"] == 1
+
+    # Promoted to the local tier: the next read does not go to Redis
+    reader.get_financial_data("NVDA", "quarterly_financials", "Q3 2024")
+    assert reader.stats["redis_hits"] == 1
+
+
+def test_redis_hit_expires_locally_with_the_redis_key(fake_redis, clock):
+    today = date.today()
+    open_period = f"Q{(today.month - 1) // 3 + 1} {today.year}"
+    fetch = RecordingFetch()
+    writer = FinancialDataCache(fetch=fetch, redis_client=fake_redis)
+    reader = FinancialDataCache(fetch=fetch, redis_client=fake_redis)
+
+    writer.get_financial_data("NVDA", "quarterly_financials", open_period)
+    clock.advance(OPEN_PERIOD_TTL - 600)
+    reader.get_financial_data("NVDA", "quarterly_financials", open_period)
+    assert len(fetch.calls) == 1
+
+    # A full local TTL from the Redis hit would still answer here
+    clock.advance(601)
+    reader.get_financial_data("NVDA", "quarterly_financials", open_period)
+    assert len(fetch.calls) == 2
+
+
+def test_redis_outage_degrades_to_local_tier(fake_redis):
+    fake_redis.down = True
+    fetch = RecordingFetch()
+    cache = FinancialDataCache(fetch=fetch, redis_client=fake_redis)
+
+    assert cache.get_financial_data("NVDA", "quarterly_financials", "Q3 2024") == FULL_RESULT
+    assert cache.get_financial_data("NVDA", "quarterly_financials", "Q3 2024") == FULL_RESULT
+
+    assert len(fetch.calls) == 1
+    assert cache.stats["redis_errors"] == 2  # the first lookup and the store; the second read is local
+
+
+def test_none_results_are_not_cached():
+    fetch = RecordingFetch(result=None)
+    cache = FinancialDataCache(fetch=fetch)
+
+    assert cache.get_financial_data("ZZZZ", "quarterly_financials", "Q3 2024") is None
+    assert cache.get_financial_data("ZZZZ", "quarterly_financials", "Q3 2024") is None
+    assert len(fetch.calls) == 2
+
+
+@pytest.mark.parametrize("cached, requested, covered", [
+    (None, None, True),
+    (None, ["revenue"], True),
+    (["revenue", "eps"], ["revenue"], True),
+    (["revenue"], ["revenue", "eps"], False),
+    (["revenue"], None, False),
+])
+def test_covers(cached, requested, covered):
+    assert _covers(cached, requested) is covered
+
+
+def test_project_keeps_requested_metrics_and_currency():
+    projected = _project(FULL_RESULT, ["revenue"])
+
+    assert projected["data"] == {"revenue": 35.08, "currency": "USD"}
+    assert projected["symbol"] == "NVDA"
+    assert FULL_RESULT["data"]["eps"] == 0.81  # the cached copy is untouched
+
+
+def test_subset_is_answered_from_cached_superset():
+    fetch = RecordingFetch()
+    cache = FinancialDataCache(fetch=fetch)
+
+    cache.get_financial_data("NVDA", "quarterly_financials", "Q3 2024")
+    subset = cache.get_financial_data("NVDA", "quarterly_financials", "Q3 2024", ["revenue", "eps"])
+
+    assert subset["data"] == {"revenue": 35.08, "eps": 0.81, "currency": "USD"}
+    assert len(fetch.calls) == 1
+
+
+def test_wider_request_fetches_and_widens_the_entry():
+    fetch = RecordingFetch()
+    cache = FinancialDataCache(fetch=fetch)
+
+    cache.get_financial_data("NVDA", "quarterly_financials", "Q3 2024", ["revenue"])
+    cache.get_financial_data("NVDA", "quarterly_financials", "Q3 2024", ["eps"])
+    both = cache.get_financial_data("NVDA", "quarterly_financials", "Q3 2024", ["revenue", "eps"])
+
+    assert both["data"] == {"revenue": 35.08, "eps": 0.81, "currency": "USD"}
+    assert len(fetch.calls) == 2
+
+
+@pytest.mark.parametrize("period, today, closed", [
+    ("Q3 2024", date(2024, 10, 1), True),
+    ("Q3 2024", date(2024, 9, 30), False),
+    ("Q4 2024", date(2025, 1, 2), True),
+    ("2023", date(2024, 1, 1), True),
+    ("FY2024", date(2024, 6, 1), False),
+    ("last quarter", date(2024, 6, 1), False),
+    (None, date(2024, 6, 1), False),
+])
+def test_is_closed_period(period, today, closed):
+    assert is_closed_period(period, today) is closed
+
+
+def test_closed_periods_outlive_open_ones():
+    today = date(2024, 11, 15)
+
+    assert ttl_for("quarterly_financials", "Q3 2024", today) == CLOSED_PERIOD_TTL
+    assert ttl_for("quarterly_financials", "Q4 2024", today) == OPEN_PERIOD_TTL
+    assert ttl_for("annual_financials", "2023", today) == CLOSED_PERIOD_TTL
+    # Closed periods only matter for reported financials
+    assert ttl_for("real_time_price", "Q3 2024", today) == 5
+
+
+def test_quarter_end_month():
+    assert [quarter_end_month(quarter) for quarter in (1, 2, 3, 4)] == [3, 6, 9, 12]
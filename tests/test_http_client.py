@@ -0,0 +1,121 @@
+import asyncio
+import types
+
+import httpx
+import pytest
+
+import http_client
+from http_client import CircuitBreaker, CircuitOpenError, UpstreamClient
+
+
+@pytest.fixture(autouse=True)
+def frozen_time(monkeypatch, clock):
+    monkeypatch.setattr(http_client, "time", types.SimpleNamespace(monotonic=clock))
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("provider", failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("provider", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker("provider", failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+
+    clock.advance(29)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.advance(1)
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # the trial is still in flight
+
+
+def test_half_open_trial_closes_or_reopens(clock):
+    breaker = CircuitBreaker("provider", failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.advance(30)
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.advance(30)
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_abandoned_trial_frees_the_half_open_slot(clock):
+    breaker = CircuitBreaker("provider", failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.advance(30)
+
+    breaker.before_call()
+    breaker.record_abandoned()
+    assert breaker.state == "half_open"
+    assert breaker.failures == 1
+    breaker.before_call()
+
+
+def _client(handler) -> UpstreamClient:
+    upstream = UpstreamClient(retry_attempts=1)
+    upstream._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return upstream
+
+
+def test_server_errors_open_the_providers_circuit():
+    async def run():
+        upstream = _client(lambda request: httpx.Response(503))
+        for _ in range(http_client.BREAKER_FAILURE_THRESHOLD):
+            response = await upstream.request("GET", "https://api.example.com/quote")
+            assert response.status_code == 503
+        with pytest.raises(CircuitOpenError):
+            await upstream.request("GET", "https://api.example.com/quote")
+        assert upstream.stats["short_circuited"] == 1
+        # Other providers are unaffected
+        assert upstream.breaker("other.example.com").state == "closed"
+        await upstream.close()
+
+    asyncio.run(run())
+
+
+def test_cancelled_calls_are_not_failures():
+    async def handler(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    async def run():
+        upstream = _client(handler)
+        for _ in range(http_client.BREAKER_FAILURE_THRESHOLD + 1):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(upstream.request("GET", "https://api.example.com/quote"), 0.01)
+        breaker = upstream.breaker("api.example.com")
+        assert breaker.state == "closed"
+        assert breaker.failures == 0
+        assert upstream.stats["failures"] == 0
+        await upstream.close()
+
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+from plan_cache import PlanCache, compile_plan, extract_entities, query_template
+
+
+def test_company_names_are_not_read_again_as_tickers():
+    assert extract_entities("Compare TSMC and Intel") == (["TSM", "INTC"], [])
+    assert extract_entities("NVIDIA vs AMD in Q3 2024") == (["NVDA", "AMD"], ["Q3 2024"])
+
+
+def test_only_known_symbols_count_as_tickers():
+    tickers, _ = extract_entities("OK, ASAP please: the CEO wants NVDA vs SMCI")
+    assert tickers == ["NVDA", "SMCI"]
+
+
+def test_share_class_tickers_are_recognised():
+    assert extract_entities("Compare BRK.B and JPM.") == (["BRK.B", "JPM"], [])
+    assert query_template("Is BRK.B cheaper than KO?")[0] == "is {t1} cheaper than {t2}"
+
+
+def test_company_names_match_case():
+    tickers, _ = extract_entities("an apple a day; the meta question: oracle or amazon? Ask Apple, Nvidia")
+    assert tickers == ["AAPL", "NVDA"]
+
+
+def test_periods_are_only_slotted_as_whole_words():
+    plan = [{"step": 1, "action": {"tool": "get_financial_data", "parameters": {
+        "symbol": "NVDA", "period": "2024", "as_of": "20241231"
+    }}}]
+    parameters = compile_plan(plan, ["NVDA"], ["2024"])[0]["action"]["parameters"]
+    assert parameters == {"symbol": "{T1}", "period": "{P1}", "as_of": "20241231"}
+
+
+def test_query_template_slots_entities():
+    assert query_template("Compare the Q3 2024 revenue growth of NVIDIA and AMD") == (
+        "compare the {p1} revenue growth of {t1} and {t2}", ["NVDA", "AMD"], ["Q3 2024"]
+    )
+
+
+def test_cached_plan_is_rebound_without_the_planned_runs_content():
+    cache = PlanCache()
+    cache.plan_for("Compare the Q3 2024 revenue growth of NVIDIA and AMD, then email my manager")
+    plan = cache.plan_for("Compare the Q2 2024 revenue growth of Intel and Apple, then email my manager")
+
+    assert cache.stats["hits"] == 1
+    assert [step["action"]["parameters"].get("symbol") for step in plan[:2]] == ["INTC", "AAPL"]
+    assert plan[0]["action"]["parameters"]["period"] == "Q2 2024"
+    assert plan[0]["thought"] == "Running get_financial_data for Intel (INTC), Q2 2024."
+    text = str(plan)
+    assert "NVIDIA" not in text and "NVDA" not in text and "35.08" not in text
+    assert all("observation" not in step for step in plan)
+
+    synthesis = next(step for step in plan if step["action"]["tool"] == "generate_text_output")
+    assert synthesis["action"]["parameters"]["context_data"] == {"symbols": ["INTC", "AAPL"], "periods": ["Q2 2024"]}
@@ -0,0 +1,56 @@
+from response_cache import SemanticResponseCache
+
+QUERY = "Compare the Q3 2024 revenue growth of NVIDIA and AMD, then email my manager"
+
+EVENTS = [
+    {"type": "session_start", "session_id": "original", "query": QUERY},
+    {"type": "step_update", "step": 1, "observation": "Revenue of $35.08B", "status": "completed",
+     "timestamp": "2024-10-26T14:00:00"},
+    {"type": "text_delta", "step": 2, "delta": "Dear manager, "},
+    {"type": "execution_complete", "session_id": "original", "final_result": {"recommendation": "NVDA"},
+     "execution_time": "1.2 seconds", "status": "completed"},
+]
+
+
+def test_stored_events_replay_for_a_new_session():
+    cache = SemanticResponseCache()
+    cache.store(QUERY, "user-1", None, events=EVENTS)
+
+    entry = cache.lookup("Compare NVIDIA and AMD Q3 2024 revenue growth, then email my manager", "user-1")
+    assert entry is not None
+    replayed = cache.replay_events(entry, "new-session")
+
+    assert [event["type"] for event in replayed] == [event["type"] for event in EVENTS]
+    assert replayed[0]["session_id"] == replayed[-1]["session_id"] == "new-session"
+    assert replayed[-1]["cached"] is True
+    assert replayed[2]["delta"] == "Dear manager, "
+    # Replays are independent copies
+    replayed[1]["observation"] = "changed"
+    assert cache.replay_events(entry, "again")[1]["observation"] == "Revenue of $35.08B"
+
+    response = cache.replay_response(entry, "new-session", QUERY)
+    assert response["final_result"] == {"recommendation": "NVDA"}
+    assert response["steps"][0]["observation"] == "Revenue of $35.08B"
+
+
+def test_scope_and_size_bound():
+    cache = SemanticResponseCache(max_bytes=4096)
+    cache.store(QUERY, "user-1", None, events=EVENTS)
+
+    assert cache.lookup(QUERY, "user-2") is None
+    assert cache.lookup("Compare the Q3 2024 revenue growth of Intel and AMD, then email my manager", "user-1") is None
+    assert 0 < cache.size_bytes <= 4096
+
+
+def test_disabled_cache_stores_and_finds_nothing():
+    cache = SemanticResponseCache(enabled=False)
+    cache.store(QUERY, "user-1", None, events=EVENTS)
+    assert cache.size_bytes == 0
+    assert cache.lookup(QUERY, "user-1") is None
+    assert cache.stats["misses"] == 0
+
+    cache.enabled = True
+    cache.store(QUERY, "user-1", None, events=EVENTS)
+    assert cache.lookup(QUERY, "user-1") is not None
+    cache.enabled = False
+    assert cache.lookup(QUERY, "user-1") is None
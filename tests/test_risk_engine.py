@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from risk_engine import ELEVATED_RISK_SCORE, RiskAnalyzer, mean_correlation, score_risks
+from sentiment_index import SentimentIndex
+
+
+def off_diagonal_means(matrix):
+    n = len(matrix)
+    return (matrix.sum(axis=1) - np.diag(matrix)) / (n - 1)
+
+
+@pytest.mark.parametrize("n_symbols, n_days", [(2, 63), (5, 21), (40, 252)])
+def test_mean_correlation_matches_corrcoef(n_symbols, n_days):
+    rng = np.random.default_rng(n_symbols)
+    market = rng.normal(0, 0.02, n_days)
+    returns = market * rng.uniform(0.5, 1.5, (n_symbols, 1)) + rng.normal(0, 0.01, (n_symbols, n_days))
+
+    np.testing.assert_allclose(mean_correlation(returns), off_diagonal_means(np.corrcoef(returns)), atol=1e-12)
+
+
+def test_constant_series_is_uncorrelated():
+    rng = np.random.default_rng(0)
+    returns = np.vstack([rng.normal(0, 0.02, (2, 30)), np.zeros((1, 30))])
+
+    correlation = mean_correlation(returns)
+    assert correlation[2] == 0.0
+    # The others average their correlation with each other and a 0 for the flat series
+    np.testing.assert_allclose(correlation[:2], np.corrcoef(returns[:2])[0, 1] / 2, atol=1e-12)
+    assert mean_correlation(returns[:1]).tolist() == [0.0]
+
+
+def test_tied_scores_name_no_lowest_or_highest_risk():
+    result = score_risks(["NVDA", "AMD", "INTC"], None)
+    assert result["risk_scores"] == {"NVDA": 50, "AMD": 50, "INTC": 50}
+    assert result["risk_comparison"]["lowest_risk"] is None
+    assert result["risk_comparison"]["highest_risk"] is None
+
+    # A tie at one end only leaves the other end named
+    result = score_risks(["NVDA", "AMD", "INTC"], None, sentiment=[0.5, 0.5, 0.0])
+    assert result["risk_comparison"]["lowest_risk"] is None
+    assert result["risk_comparison"]["highest_risk"] == "INTC"
+
+
+def test_key_risks_and_recommendations_follow_flagged_factors():
+    signals = {"regulatory_risk": [0.9, 0.2], "competitive_risk": [0.7, 0.2]}
+    result = score_risks(["NVDA", "AMD"], None, category_signals=signals, sentiment=[0.8, 0.1])
+
+    assert result["key_risks"] == {
+        "NVDA": ["Regulatory exposure (score 90)", "Competitive pressure (score 70)"],
+        "AMD": ["Negative news sentiment (sentiment 0.10)"],
+    }
+    assert result["recommendations"]["NVDA"] == [
+        "Track pending regulation and export rules", "Watch market share and pricing in the next reports"
+    ]
+    assert len(result["recommendations"]["AMD"]) == 1
+
+    neutral = score_risks(["NVDA", "AMD"], None)
+    assert neutral["key_risks"] == {"NVDA": [], "AMD": []}
+    assert neutral["recommendations"] == {"NVDA": [], "AMD": []}
+
+
+def test_volatile_symbol_is_flagged_from_its_returns():
+    rng = np.random.default_rng(1)
+    returns = np.vstack([rng.normal(0, 0.08, 63), rng.normal(0, 0.005, 63)])
+    result = score_risks(["MEME", "UTIL"], returns)
+
+    assert result["category_scores"]["MEME"]["market_risk"] >= ELEVATED_RISK_SCORE
+    assert result["key_risks"]["MEME"][0].startswith("High price volatility")
+    assert result["risk_comparison"]["highest_risk"] == "MEME"
+    assert result["risk_comparison"]["lowest_risk"] == "UTIL"
+
+
+@pytest.mark.parametrize("n_days", [0, 1])
+def test_fewer_than_two_days_of_returns_is_rejected(n_days):
+    with pytest.raises(ValueError, match="at least 2 days"):
+        score_risks(["NVDA", "AMD"], np.zeros((2, n_days)))
+
+
+def test_invalid_inputs_are_rejected():
+    with pytest.raises(ValueError):
+        score_risks(["NVDA"], None, analysis_timeframe="2_weeks")
+    with pytest.raises(ValueError):
+        score_risks(["NVDA", "AMD"], np.zeros((3, 30)))
+    with pytest.raises(ValueError):
+        RiskAnalyzer(sentiment=SentimentIndex()).analyze_investment_risks([])
+
+
+def test_analyzer_without_a_price_feed_reports_neutral_scores_and_no_ranking():
+    result = RiskAnalyzer(sentiment=SentimentIndex()).analyze_investment_risks(["nvda", "intc"])
+
+    assert result["symbols"] == ["NVDA", "INTC"]
+    assert result["risk_scores"] == {"NVDA": 50, "INTC": 50}
+    assert result["risk_comparison"]["lowest_risk"] is None
+    assert result["risk_comparison"]["highest_risk"] is None
+    assert set(result["key_risks"]) == set(result["recommendations"]) == {"NVDA", "INTC"}
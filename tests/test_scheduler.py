@@ -0,0 +1,172 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from scheduler import AgentScheduler, QueueFullError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_per_user_cap_counts_queued_and_running_runs():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrent=1, max_queue=10, max_per_user=2)
+        running = scheduler.admit("heavy")
+        queued = scheduler.admit("heavy")
+        with pytest.raises(QueueFullError):
+            scheduler.admit("heavy")
+        # Other users are unaffected
+        other = scheduler.admit("light")
+
+        running.release()
+        assert queued.state == "running"
+        again = scheduler.admit("heavy")
+        for ticket in (queued, other, again):
+            ticket.release()
+        assert scheduler._per_user == {}
+
+    run(scenario())
+
+
+def test_waiting_users_are_served_round_robin():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrent=1, max_queue=10)
+        first = scheduler.admit("heavy")
+        queued = [scheduler.admit(user) for user in ("heavy", "heavy", "heavy", "light", "other")]
+        served = []
+        running = first
+        for _ in queued:
+            running.release()
+            running = next(ticket for ticket in queued if ticket.state == "running")
+            served.append(queued.index(running))
+        running.release()
+        return served
+
+    # heavy's burst takes every other turn rather than all the first ones
+    assert run(scenario()) == [0, 3, 4, 1, 2]
+
+
+def test_position_follows_round_robin_service_order():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrent=1, max_queue=10)
+        scheduler.admit("a")
+        a1, a2, a3 = (scheduler.admit("a") for _ in range(3))
+        b1 = scheduler.admit("b")
+        c1, c2 = scheduler.admit("c"), scheduler.admit("c")
+        assert [scheduler.position(t) for t in (a1, b1, c1, a2, c2, a3)] == [1, 2, 3, 4, 5, 6]
+        assert scheduler.queue_depth == 6
+
+        b1.release()
+        assert [scheduler.position(t) for t in (a1, c1, a2, c2, a3)] == [1, 2, 3, 4, 5]
+        assert scheduler.position(b1) == 0
+
+    run(scenario())
+
+
+def test_wait_turn_yields_each_new_position():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrent=1, max_queue=10)
+        running = scheduler.admit("a")
+        ahead = scheduler.admit("b")
+        ticket = scheduler.admit("c")
+        positions = []
+
+        async def wait():
+            async for position in ticket.wait_turn():
+                positions.append(position)
+
+        waiter = asyncio.create_task(wait())
+        await asyncio.sleep(0)
+        running.release()
+        await asyncio.sleep(0)
+        ahead.release()
+        await asyncio.wait_for(waiter, 1)
+        assert ticket.state == "running"
+        return positions
+
+    assert run(scenario()) == [2, 1]
+
+
+def test_full_queue_raises_with_a_retry_after_estimate():
+    scheduler = AgentScheduler(max_concurrent=2, max_queue=2, expected_run_seconds=10.0)
+    for user in ("a", "b", "c", "d"):
+        scheduler.admit(user)
+    with pytest.raises(QueueFullError) as raised:
+        scheduler.admit("e")
+    # Three waves of two runs ahead, ten seconds each
+    assert raised.value.retry_after == 15
+    assert scheduler.stats["rejected"] == 1
+
+
+def test_full_queue_is_a_429_with_retry_after(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    scheduler = AgentScheduler(max_concurrent=1, max_queue=0, expected_run_seconds=10.0)
+    scheduler.admit("someone")
+    monkeypatch.setattr(main, "agent_scheduler", scheduler)
+    monkeypatch.setattr(main.response_cache, "lookup", lambda *args: None)
+
+    response = TestClient(main.app).post("/api/agent/run", json={"query": "Compare NVDA and AMD", "streaming": False})
+    assert response.status_code == 429
+    # One run ahead of the next free place, ten seconds each
+    assert response.headers["Retry-After"] == "10"
+
+
+def test_client_disconnect_releases_a_queued_ticket():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrent=1, max_queue=10)
+        running = scheduler.admit("a")
+        abandoned = scheduler.admit("b")
+        behind = scheduler.admit("c")
+
+        # A request handler waiting its turn is cancelled when its client goes away
+        waiter = asyncio.create_task(abandoned.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert abandoned.state == "done"
+        assert scheduler.queue_depth == 1
+        assert scheduler.position(behind) == 1
+        running.release()
+        assert behind.state == "running"
+        assert scheduler.stats["granted"] == 2
+
+    run(scenario())
+
+
+def test_gauges_are_set_when_the_scheduler_changes():
+    async def scenario():
+        scheduler = AgentScheduler(max_concurrent=1, max_queue=10)
+        readings = []
+        scheduler.gauges = [lambda: readings.append((scheduler.running, scheduler.queue_depth))]
+        first = scheduler.admit("a")
+        second = scheduler.admit("b")
+        first.release()
+        second.release()
+        return readings
+
+    assert run(scenario()) == [(1, 0), (1, 1), (1, 0), (0, 0)]
+
+
+def test_scheduler_gauges_are_scraped_in_multiprocess_mode(tmp_path):
+    script = (
+        "import scheduler, metrics\n"
+        "scheduler.agent_scheduler.admit('a')\n"
+        "print(metrics.render_latest()[0].decode())\n"
+    )
+    environment = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": ROOT}
+    scrape = subprocess.run(
+        [sys.executable, "-c", script], env=environment, cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    assert "nexus_scheduler_running 1.0" in scrape
+    assert "nexus_scheduler_queue_depth 0.0" in scrape
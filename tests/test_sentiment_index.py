@@ -0,0 +1,129 @@
+from datetime import date, timedelta
+import json
+
+import pytest
+
+from sentiment_index import NEUTRAL_SENTIMENT, NewsFeedIngestor, RollingSentiment, SentimentIndex
+
+TODAY = date(2024, 11, 1)
+
+
+def _day(days_ago: int) -> int:
+    return (TODAY - timedelta(days=days_ago)).toordinal()
+
+
+def test_article_counts_in_every_window_that_contains_it():
+    rolling = RollingSentiment()
+    rolling.add(_day(45), 1.0, "NVIDIA beats estimates", TODAY.toordinal())
+
+    assert rolling.summary("1_month", TODAY.toordinal())["articles"] == 0
+    assert rolling.summary("3_months", TODAY.toordinal())["articles"] == 1
+    assert rolling.summary("1_year", TODAY.toordinal())["articles"] == 1
+
+
+def test_articles_age_out_of_windows():
+    rolling = RollingSentiment()
+    today = TODAY.toordinal()
+    rolling.add(_day(0), 1.0, "", today)
+    rolling.add(_day(20), -1.0, "", today)
+
+    summary = rolling.summary("1_month", today)
+    assert summary["articles"] == 2
+    assert summary["sentiment"] == 0.5
+
+    # Ten days on, the older article has left the 30-day window
+    summary = rolling.summary("1_month", today + 10)
+    assert summary["articles"] == 1
+    assert summary["sentiment"] == 1.0
+    assert summary["positive_share"] == 1.0
+    assert rolling.summary("3_months", today + 10)["articles"] == 2
+
+    assert rolling.summary("1_year", today + 400)["articles"] == 0
+
+
+def test_late_article_for_a_passed_day_stays_out_of_short_windows():
+    rolling = RollingSentiment()
+    today = TODAY.toordinal()
+    rolling.add(_day(0), 1.0, "", today)
+    rolling.add(_day(40), -1.0, "", today)
+
+    assert rolling.summary("1_month", today)["articles"] == 1
+    assert rolling.summary("3_months", today)["articles"] == 2
+
+
+def test_articles_older_than_every_window_are_ignored():
+    rolling = RollingSentiment()
+    rolling.add(_day(400), -1.0, "", TODAY.toordinal())
+    assert rolling.summary("1_year", TODAY.toordinal())["articles"] == 0
+
+
+def test_index_lookup_and_neutral_default():
+    index = SentimentIndex()
+    assert index.add({"symbols": ["nvda"], "published": f"{TODAY.isoformat()}T14:00:00Z",
+                      "headline": "NVIDIA beats estimates on record data center growth"}, TODAY)
+
+    summaries = index.lookup(["NVDA", "AMD"], "3_months", TODAY)
+    assert summaries["NVDA"]["sentiment"] == 1.0
+    assert summaries["NVDA"]["headlines"] == ["NVIDIA beats estimates on record data center growth"]
+    assert summaries["AMD"]["sentiment"] == NEUTRAL_SENTIMENT
+    assert summaries["AMD"]["articles"] == 0
+
+    with pytest.raises(ValueError):
+        index.lookup(["NVDA"], "2_weeks", TODAY)
+
+
+def test_index_rejects_malformed_articles():
+    index = SentimentIndex()
+    assert not index.add({"symbols": ["NVDA"], "headline": "no publication time"}, TODAY)
+    assert not index.add({"published": TODAY.isoformat(), "headline": "no symbols"}, TODAY)
+    assert index.snapshot() == {"articles": 0, "rejected": 2, "symbols": 0}
+
+
+def _write(path, *lines, mode="a"):
+    with open(path, mode) as f:
+        f.write("".join(lines))
+
+
+def _article(symbol: str, headline: str) -> str:
+    return json.dumps({"symbol": symbol, "published": date.today().isoformat(), "headline": headline}) + "\n"
+
+
+def test_feed_is_read_incrementally(tmp_path):
+    feed = tmp_path / "feed.jsonl"
+    index = SentimentIndex()
+    ingestor = NewsFeedIngestor(str(feed), index)
+
+    assert ingestor.poll() == 0  # no feed yet
+
+    _write(feed, _article("NVDA", "NVIDIA beats estimates"), "not json\n")
+    assert ingestor.poll() == 1
+    assert index.snapshot()["rejected"] == 1
+
+    _write(feed, _article("AMD", "AMD slumps on weak guidance"))
+    assert ingestor.poll() == 1
+    assert ingestor.poll() == 0
+    assert index.snapshot()["articles"] == 2
+
+
+def test_feed_waits_for_partially_written_lines(tmp_path):
+    feed = tmp_path / "feed.jsonl"
+    ingestor = NewsFeedIngestor(str(feed), SentimentIndex())
+    line = _article("NVDA", "NVIDIA beats estimates")
+
+    _write(feed, line[:20])
+    assert ingestor.poll() == 0
+    _write(feed, line[20:])
+    assert ingestor.poll() == 1
+
+
+def test_truncated_feed_is_read_again_into_a_fresh_index(tmp_path):
+    feed = tmp_path / "feed.jsonl"
+    index = SentimentIndex()
+    ingestor = NewsFeedIngestor(str(feed), index)
+
+    _write(feed, _article("NVDA", "NVIDIA beats estimates"), _article("AMD", "AMD gains"))
+    assert ingestor.poll() == 2
+
+    _write(feed, _article("INTC", "Intel cuts jobs"), mode="w")
+    assert ingestor.poll() == 1
+    assert index.snapshot() == {"articles": 1, "rejected": 0, "symbols": 1}
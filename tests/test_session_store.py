@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from fake_redis import FakeAsyncRedis
+from session_store import InMemorySessionStore, RedisSessionStore
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.mark.parametrize("pubsub", [True, False])
+def test_events_and_meta_round_trip(pubsub):
+    async def scenario():
+        redis = FakeAsyncRedis()
+        store = RedisSessionStore(redis, ttl=60, pubsub=pubsub)
+        await store.create("s1", "Compare NVDA and AMD", user_id=None, status="queued")
+
+        assert await store.append("s1", {"type": "session_start"}) == 1
+        assert await store.append("s1", {"type": "step_update", "step": 1}) == 2
+        assert await store.read("s1") == [(1, {"type": "session_start"}), (2, {"type": "step_update", "step": 1})]
+        assert await store.read("s1", after_id=1) == [(2, {"type": "step_update", "step": 1})]
+
+        await store.update_meta("s1", status="running")
+        meta = await store.get_meta("s1")
+        assert meta["status"] == "running"
+        assert meta["query"] == "Compare NVDA and AMD"
+        assert meta["user_id"] is None
+        assert await store.get_meta("missing") is None
+
+        # Keys expire with the session's TTL
+        assert 0 < redis.sync.pttl("nexus:session:s1:events") <= 60_000
+        assert 0 < redis.sync.pttl("nexus:session:s1:meta") <= 60_000
+
+    run(scenario())
+
+
+def test_pubsub_wakes_a_reader_on_another_worker():
+    async def scenario():
+        redis = FakeAsyncRedis()
+        reader = RedisSessionStore(redis)
+        writer = RedisSessionStore(redis)
+        await writer.create("s1", "query")
+
+        waiting = asyncio.create_task(reader.wait("s1", after_id=0, timeout=5))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        await writer.append("s1", {"type": "session_start"})
+        assert await asyncio.wait_for(waiting, 1) is True
+
+        # Unsubscribed once no local reader is waiting
+        assert reader._waiters == {}
+        assert reader._pubsub.channels == set()
+
+    run(scenario())
+
+
+def test_wait_returns_at_once_when_events_are_already_there():
+    async def scenario():
+        store = RedisSessionStore(FakeAsyncRedis())
+        await store.create("s1", "query")
+        await store.append("s1", {"type": "session_start"})
+        assert await asyncio.wait_for(store.wait("s1", after_id=0, timeout=5), 1) is True
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("pubsub", [True, False])
+def test_wait_times_out_without_changes(pubsub):
+    async def scenario():
+        store = RedisSessionStore(FakeAsyncRedis(), poll_interval=0.01, pubsub=pubsub)
+        await store.create("s1", "query")
+        assert await store.wait("s1", after_id=0, timeout=0.1) is False
+
+    run(scenario())
+
+
+def test_tail_follows_events_from_another_worker_until_completion():
+    async def scenario():
+        redis = FakeAsyncRedis()
+        reader = RedisSessionStore(redis)
+        writer = RedisSessionStore(redis)
+        await writer.create("s1", "query")
+        await writer.append("s1", {"type": "session_start"})
+
+        async def produce():
+            await asyncio.sleep(0.05)
+            await writer.append("s1", {"type": "step_update", "step": 1})
+            await asyncio.sleep(0.05)
+            await writer.append("s1", {"type": "execution_complete"})
+            await writer.update_meta("s1", status="completed")
+
+        producer = asyncio.create_task(produce())
+        seen = [event["type"] async for _, event in reader.tail("s1")]
+        await producer
+        assert seen == ["session_start", "step_update", "execution_complete"]
+
+        # A reconnecting client gets only what it missed
+        assert [event_id async for event_id, _ in reader.tail("s1", after_id=2)] == [3]
+
+    run(scenario())
+
+
+def test_redis_outage_surfaces_to_the_caller():
+    async def scenario():
+        redis = FakeAsyncRedis()
+        redis.sync.down = True
+        store = RedisSessionStore(redis)
+        with pytest.raises(ConnectionError):
+            await store.append("s1", {"type": "session_start"})
+
+    run(scenario())
+
+
+def test_in_memory_store_reads_encoded_events_back():
+    async def scenario():
+        store = InMemorySessionStore()
+        await store.create("s1", "query")
+        for step in range(1, 4):
+            assert await store.append("s1", {"type": "text_delta", "step": step, "delta": f"word{step} "}) == step
+
+        assert [event["step"] for _, event in await store.read("s1")] == [1, 2, 3]
+        assert await store.read("s1", after_id=2) == [(3, {"type": "text_delta", "step": 3, "delta": "word3 "})]
+        assert await store.read("s1", after_id=3) == []
+        assert await store.read("missing") == []
+
+        waiting = asyncio.create_task(store.wait("s1", after_id=3, timeout=5))
+        await asyncio.sleep(0.01)
+        await store.append("s1", {"type": "execution_complete"})
+        assert await asyncio.wait_for(waiting, 1) is True
+
+    run(scenario())
@@ -0,0 +1,135 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from timeseries_store import ColumnarStore, FinancialStore, period_slot, slot_period
+
+
+def quarters(count, first_year=2020):
+    return [f"Q{q} {year}" for year in range(first_year, first_year + 8) for q in range(1, 5)][:count]
+
+
+def test_period_slots_round_trip():
+    assert period_slot("Q3 2024", "quarterly") == 138
+    assert period_slot("2023", "quarterly") == period_slot("Q4 2023", "quarterly")
+    assert slot_period(period_slot("FY 2023", "annual"), "annual") == "2023"
+    for period in ("Q1 1990", "Q4 2053"):
+        assert slot_period(period_slot(period, "quarterly"), "quarterly") == period
+    for bad in ("Q5 2024", "last year", "Q1 1989", "2054"):
+        with pytest.raises(ValueError):
+            period_slot(bad, "quarterly")
+
+
+def test_ingest_then_read_and_lookup(tmp_path):
+    store = ColumnarStore("quarterly_financials", str(tmp_path))
+    written = store.ingest({
+        "nvda": {"Q2 2024": {"revenue": 30.04e9, "eps": 0.67, "currency": "USD"}, "Q3 2024": {"revenue": 35.08e9}},
+        "AMD": {"Q3 2024": {"revenue": 6.82e9}},
+    })
+    assert written == 4
+    assert store.latest_period == "Q3 2024"
+    assert sorted(store.metrics) == ["eps", "revenue"]
+
+    values, periods = store.read(["NVDA", "AMD", "INTC"], "revenue", last=2)
+    assert periods == ["Q2 2024", "Q3 2024"]
+    np.testing.assert_array_equal(values, [[30.04e9, 35.08e9], [np.nan, 6.82e9], [np.nan, np.nan]])
+
+    values, _ = store.read(["AMD"], "revenue", periods=["Q3 2024", "Q2 2024"])
+    np.testing.assert_array_equal(values, [[6.82e9, np.nan]])
+
+    assert store.lookup("nvda", "Q2 2024", ["revenue", "eps"]) == {"revenue": 30.04e9, "eps": 0.67}
+    assert store.lookup("AMD", "Q3 2024", ["revenue", "eps"]) is None  # eps missing
+    assert store.lookup("INTC", "Q3 2024", ["revenue"]) is None
+    assert store.lookup("NVDA", "not a period", ["revenue"]) is None
+
+    with pytest.raises(ValueError):
+        store.ingest({"NVDA": {"Q3 2024": {"bad metric": 1.0}}})
+
+
+def test_another_process_sees_new_data(tmp_path):
+    reader = ColumnarStore("quarterly_financials", str(tmp_path))
+    writer = ColumnarStore("quarterly_financials", str(tmp_path))
+    assert reader.read(["NVDA"], "revenue", last=1)[0].tolist() == [[]]
+
+    writer.ingest({"NVDA": {"Q3 2024": {"revenue": 35.08e9}}})
+    assert reader.lookup("NVDA", "Q3 2024", ["revenue"]) == {"revenue": 35.08e9}
+
+    writer.ingest({"AMD": {"Q4 2024": {"revenue": 7.66e9, "eps": 0.29}}})
+    values, periods = reader.read(["NVDA", "AMD"], "revenue", last=2)
+    assert periods == ["Q3 2024", "Q4 2024"]
+    np.testing.assert_array_equal(values, [[35.08e9, np.nan], [np.nan, 7.66e9]])
+
+
+def test_files_never_shrink_under_an_open_map(tmp_path):
+    store = ColumnarStore("quarterly_financials", str(tmp_path))
+    store.ingest({symbol: {"Q3 2024": {"revenue": float(i)}} for i, symbol in enumerate(["NVDA", "AMD", "INTC"])})
+    path = os.path.join(store.path, "revenue.f64")
+    old_map = store._column(store._view, "revenue")
+
+    # An ingest that died after extending the files but before recording its symbols
+    with open(path, "ab") as f:
+        f.write(np.full(store.capacity * 5, 7.0).tobytes())
+    size = os.path.getsize(path)
+
+    store.ingest({"TSM": {"Q3 2024": {"revenue": 3.0}}})
+    assert os.path.getsize(path) == size
+    assert old_map[2, period_slot("Q3 2024", "quarterly")] == 2.0
+    # The left-over row is reused and blanked, not read as TSM's history
+    values, _ = store.read(["TSM"], "revenue", last=4)
+    np.testing.assert_array_equal(values, [[np.nan, np.nan, np.nan, 3.0]])
+
+
+def test_readers_stay_consistent_while_rows_are_appended(tmp_path):
+    store = ColumnarStore("quarterly_financials", str(tmp_path))
+    store.ingest({"S0": {period: {"revenue": 0.0} for period in quarters(8)}})
+    errors = []
+    done = threading.Event()
+
+    universe = [f"S{n}" for n in range(60)]
+
+    def read_continuously():
+        try:
+            while not done.is_set():
+                values, _ = store.read(universe, "revenue", last=8)
+                # A symbol is either not stored yet or has its full row
+                for n, row in enumerate(values):
+                    assert np.isnan(row).all() or (row == n).all(), (n, row)
+                found = store.lookup("S59", "Q1 2020", ["revenue"])
+                assert found is None or found == {"revenue": 59.0}
+        except Exception as e:  # surfaced in the main thread
+            errors.append(e)
+
+    readers = [threading.Thread(target=read_continuously) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for n in range(1, 60):
+        store.ingest({f"S{n}": {period: {"revenue": float(n)} for period in quarters(8)}})
+    done.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert len(store.symbols) == 60
+
+
+def test_financial_store_answers_only_complete_requests(tmp_path):
+    financial = FinancialStore(str(tmp_path))
+    assert financial.ingest_results([
+        {"symbol": "NVDA", "data_type": "quarterly_financials", "period": "Q3 2024",
+         "data": {"revenue": 35.08e9, "currency": "USD"}},
+        {"symbol": "NVDA", "data_type": "real_time_price", "data": {"price": 140.0}},
+        None,
+    ]) == 1
+
+    hit = financial.lookup("nvda", "quarterly_financials", "Q3 2024", ["revenue"])
+    assert hit["data"] == {"revenue": 35.08e9}
+    assert hit["source"] == "local_timeseries_store"
+    assert financial.lookup("NVDA", "quarterly_financials", "Q3 2024", None) is None
+    assert financial.lookup("NVDA", "quarterly_financials", None, ["revenue"]) is None
+    assert financial.lookup("NVDA", "real_time_price", "Q3 2024", ["price"]) is None
+
+    history = financial.get_financial_history(["NVDA", "AMD"], "revenue", last=2)
+    assert history["periods"] == ["Q2 2024", "Q3 2024"]
+    assert history["data"] == {"NVDA": [None, 35.08e9], "AMD": [None, None]}
@@ -0,0 +1,278 @@
+import asyncio
+import types
+
+import pytest
+
+import work_queue
+from fake_redis import FakeAsyncRedis
+from work_queue import MAX_DELIVERIES, AgentWorkerPool, InMemoryWorkQueue, RedisWorkQueue
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def take_all(queue, count):
+    jobs = []
+    for _ in range(count):
+        job = await queue.take(1)
+        jobs.append(job["n"])
+        await queue.ack(job)
+    return jobs
+
+
+@pytest.mark.parametrize("make_queue", [lambda: RedisWorkQueue(FakeAsyncRedis()), InMemoryWorkQueue])
+def test_users_are_served_round_robin(make_queue):
+    async def scenario():
+        queue = make_queue()
+        for i in range(3):
+            await queue.submit({"user_id": "heavy", "n": f"heavy-{i}"})
+        await queue.submit({"user_id": "light", "n": "light-0"})
+        await queue.submit({"user_id": None, "n": "anonymous-0"})
+        assert await queue.depth() == 5
+
+        assert await take_all(queue, 5) == ["heavy-0", "light-0", "anonymous-0", "heavy-1", "heavy-2"]
+        assert await queue.depth() == 0
+        assert await queue.take(0.01) is None
+
+    run(scenario())
+
+
+def test_acknowledged_jobs_leave_no_keys_behind():
+    async def scenario():
+        redis = FakeAsyncRedis()
+        queue = RedisWorkQueue(redis)
+        await queue.submit({"user_id": "u", "n": 1})
+
+        job = await queue.take(1)
+        assert await redis.llen(queue.processing_key) == 1
+        await queue.ack(job)
+        assert redis.sync.data == {}
+
+    run(scenario())
+
+
+def test_unacknowledged_job_is_requeued_after_its_lease(monkeypatch, clock):
+    monkeypatch.setattr(work_queue, "time", types.SimpleNamespace(time=clock))
+
+    async def scenario():
+        redis = FakeAsyncRedis()
+        crashed = RedisWorkQueue(redis, lease_seconds=60)
+        survivor = RedisWorkQueue(redis, lease_seconds=60)
+        await crashed.submit({"user_id": "u", "n": "lost"})
+        await crashed.submit({"user_id": "u", "n": "next"})
+        await crashed.take(1)  # the worker dies holding this job
+
+        clock.advance(59)
+        assert await survivor.requeue_expired() == 0
+        clock.advance(2)
+        assert await survivor.requeue_expired() == 1
+        assert await survivor.requeue_expired() == 0
+
+        # The lost job goes back to the front of its user's list
+        job = await survivor.take(1)
+        assert (job["n"], job["deliveries"]) == ("lost", 2)
+        await survivor.ack(job)
+        assert await take_all(survivor, 1) == ["next"]
+
+    run(scenario())
+
+
+def test_extended_lease_is_not_requeued(monkeypatch, clock):
+    monkeypatch.setattr(work_queue, "time", types.SimpleNamespace(time=clock))
+
+    async def scenario():
+        queue = RedisWorkQueue(FakeAsyncRedis(), lease_seconds=60)
+        await queue.submit({"user_id": "u", "n": "slow"})
+        job = await queue.take(1)
+        for _ in range(3):
+            clock.advance(40)
+            await queue.extend(job)
+            assert await queue.requeue_expired() == 0
+
+    run(scenario())
+
+
+def test_poison_job_is_dropped_after_max_deliveries(monkeypatch, clock):
+    monkeypatch.setattr(work_queue, "time", types.SimpleNamespace(time=clock))
+
+    async def scenario():
+        queue = RedisWorkQueue(FakeAsyncRedis(), lease_seconds=60)
+        await queue.submit({"user_id": "u", "n": "poison"})
+        for delivery in range(1, MAX_DELIVERIES + 1):
+            job = await queue.take(1)
+            assert job.get("deliveries", 1) == delivery
+            clock.advance(61)
+            await queue.requeue_expired()
+        assert await queue.depth() == 0
+        assert await queue.take(0.01) is None
+
+    run(scenario())
+
+
+def test_redis_outage_is_counted_and_retried():
+    async def scenario():
+        redis = FakeAsyncRedis()
+        queue = RedisWorkQueue(redis)
+        handled = []
+
+        async def handler(job):
+            handled.append(job["n"])
+
+        redis.sync.down = True
+        pool = AgentWorkerPool(queue, handler, concurrency=1)
+        await pool.start()
+        await asyncio.sleep(0.05)
+        assert pool.stats["queue_errors"] >= 1
+
+        redis.sync.down = False
+        await queue.submit({"user_id": "u", "n": 1})
+        for _ in range(100):
+            if handled:
+                break
+            await asyncio.sleep(0.02)
+        await pool.stop()
+        assert handled == [1]
+
+    run(scenario())
+
+
+def test_pool_acknowledges_finished_and_failed_jobs():
+    async def scenario():
+        redis = FakeAsyncRedis()
+        queue = RedisWorkQueue(redis)
+
+        async def handler(job):
+            if job["n"] == "bad":
+                raise RuntimeError("run failed")
+
+        pool = AgentWorkerPool(queue, handler, concurrency=2)
+        await pool.start()
+        await queue.submit({"user_id": "a", "n": "good"})
+        await queue.submit({"user_id": "b", "n": "bad"})
+        for _ in range(100):
+            if pool.stats["completed"] + pool.stats["failed"] == 2:
+                break
+            await asyncio.sleep(0.01)
+        await pool.stop()
+
+        assert (pool.stats["completed"], pool.stats["failed"]) == (1, 1)
+        assert redis.sync.data == {}
+
+    run(scenario())
+
+
+def test_pool_keeps_long_runs_leased_and_leaves_cut_off_runs_for_others():
+    async def scenario():
+        redis = FakeAsyncRedis()
+        queue = RedisWorkQueue(redis, lease_seconds=0.15)
+        started = asyncio.Event()
+
+        async def slow(job):
+            started.set()
+            await asyncio.sleep(0.5)
+
+        pool = AgentWorkerPool(queue, slow, concurrency=1)
+        await pool.start()
+        await queue.submit({"user_id": "u", "n": "slow"})
+        await asyncio.wait_for(started.wait(), 1)
+        await asyncio.sleep(0.3)  # two leases long; renewed by the pool meanwhile
+        assert pool.stats["requeued"] == 0
+        assert await redis.llen(queue.processing_key) == 1
+
+        # Shutting down mid-run leaves the job unacknowledged for another worker
+        await pool.stop()
+        await asyncio.sleep(0.2)
+        other = RedisWorkQueue(redis, lease_seconds=0.15)
+        assert await other.requeue_expired() == 1
+        assert (await other.take(1))["n"] == "slow"
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("make_queue", [lambda: RedisWorkQueue(FakeAsyncRedis()), InMemoryWorkQueue])
+def test_user_limit_counts_queued_and_running_jobs(make_queue):
+    async def scenario():
+        queue = make_queue()
+        assert await queue.submit({"user_id": "u", "n": 1}, user_limit=2)
+        assert await queue.submit({"user_id": "u", "n": 2}, user_limit=2)
+        assert not await queue.submit({"user_id": "u", "n": 3}, user_limit=2)
+        assert await queue.submit({"user_id": "other", "n": 4}, user_limit=2)
+
+        # Taken but unacknowledged still counts
+        job = await queue.take(1)
+        assert not await queue.submit({"user_id": "u", "n": 5}, user_limit=2)
+        await queue.ack(job)
+        assert await queue.submit({"user_id": "u", "n": 6}, user_limit=2)
+        assert await queue.depth() == 3
+
+    run(scenario())
+
+
+def test_user_limit_holds_across_workers():
+    async def scenario():
+        redis = FakeAsyncRedis()
+        workers = [RedisWorkQueue(redis) for _ in range(4)]
+        accepted = await asyncio.gather(*(
+            worker.submit({"user_id": "u", "n": n}, user_limit=3)
+            for n, worker in enumerate(workers * 2)
+        ))
+        assert sum(accepted) == 3
+
+        for worker in workers[:3]:
+            await worker.ack(await worker.take(1))
+        assert redis.sync.data == {}
+
+    run(scenario())
+
+
+def test_requeued_and_dropped_jobs_keep_the_user_count_right(monkeypatch, clock):
+    monkeypatch.setattr(work_queue, "time", types.SimpleNamespace(time=clock))
+
+    async def scenario():
+        redis = FakeAsyncRedis()
+        crashed = RedisWorkQueue(redis, lease_seconds=60)
+        survivor = RedisWorkQueue(redis, lease_seconds=60)
+        await crashed.submit({"user_id": "u", "n": "lost"}, user_limit=1)
+        job = await crashed.take(1)
+        clock.advance(61)
+        assert await survivor.requeue_expired() == 1
+
+        # The late acknowledgement of the lost delivery does not free the user's place
+        await crashed.ack(job)
+        assert not await survivor.submit({"user_id": "u", "n": "next"}, user_limit=1)
+
+        # Dropping the job as poison does
+        for _ in range(MAX_DELIVERIES - 1):
+            await survivor.take(1)
+            clock.advance(61)
+            await survivor.requeue_expired()
+        assert redis.sync.data == {}
+        assert await survivor.submit({"user_id": "u", "n": "next"}, user_limit=1)
+
+    run(scenario())
+
+
+def test_redelivered_session_announces_its_restart(monkeypatch):
+    import main
+    from session_store import InMemorySessionStore
+
+    store = InMemorySessionStore()
+    executed = []
+
+    async def execute(session_id, request, budget=None):
+        executed.append(session_id)
+        await store.append(session_id, {"type": "session_start", "session_id": session_id})
+
+    monkeypatch.setattr(main, "session_store", store)
+    monkeypatch.setattr(main, "execute_agent_session", execute)
+    job = {"session_id": "s1", "user_id": "u", "request": {"query": "Compare NVDA and AMD"}}
+
+    async def scenario():
+        await store.create("s1", "Compare NVDA and AMD", "u", status="queued")
+        await main.run_queued_session(job)
+        await main.run_queued_session({**job, "deliveries": 2})
+        return [event["type"] for _, event in await store.read("s1")]
+
+    assert run(scenario()) == ["session_start", "session_restart", "session_start"]
+    assert executed == ["s1", "s1"]
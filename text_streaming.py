@@ -0,0 +1,126 @@
+"""
+Nexus Agent - Streaming Text Generation
+Token-level streaming variant of generate_text_output
+"""
+
+from typing import Dict, List, Optional, Any, AsyncIterator
+from datetime import datetime
+import asyncio
+import json
+import os
+
+import agent_tools
+from http_client import upstream
+
+# OpenAI-compatible chat completions endpoint; unset disables streaming
+LLM_API_URL = os.getenv("LLM_API_URL")
+LLM_API_KEY = os.getenv("LLM_API_KEY")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+
+CONTENT_TYPE_INSTRUCTIONS: Dict[str, str] = {
+    "email_draft": "Write a concise email with a subject line.",
+    "executive_summary": "Write a high-level business summary.",
+    "technical_report": "Write a detailed analytical report.",
+    "bullet_points": "Summarize the key points as bullet points.",
+}
+
+
+def build_prompt(
+    content_type: str,
+    context_data: Dict[str, Any],
+    recipient: Optional[str] = None,
+    tone: str = "professional",
+    format_requirements: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, str]]:
+    """Build chat messages for a generate_text_output request"""
+    instructions = CONTENT_TYPE_INSTRUCTIONS.get(content_type, f"Write a {content_type}.")
+    system = f"You are a financial analyst. {instructions} Use a {tone} tone."
+    if recipient:
+        system += f" The audience is the user's {recipient}."
+    if format_requirements:
+        system += f" Formatting requirements: {json.dumps(format_requirements)}"
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": json.dumps(context_data, default=str)},
+    ]
+
+
+async def stream_chat_completion(messages: List[Dict[str, str]], url: str = LLM_API_URL) -> AsyncIterator[str]:
+    """
+    Stream content deltas from an OpenAI-compatible chat completions endpoint.
+
+    Yields:
+        str: Text chunks in the order the model produced them
+    """
+    headers = {"Authorization": f"Bearer {LLM_API_KEY}"} if LLM_API_KEY else {}
+    payload = {"model": LLM_MODEL, "messages": messages, "stream": True}
+    async with upstream.stream("POST", url, provider="llm", json=payload, headers=headers) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return
+            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+async def stream_text_output(
+    content_type: str,
+    context_data: Dict[str, Any],
+    recipient: Optional[str] = None,
+    tone: str = "professional",
+    format_requirements: Optional[Dict[str, Any]] = None,
+    llm_url: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of agent_tools.generate_text_output.
+
+    Chunks are yielded as the LLM generates them. Without an LLM endpoint the
+    non-streaming tool is called and its text, if any, is yielded in one chunk.
+
+    Args:
+        content_type (str): Type of content to generate, as for generate_text_output
+        context_data (Dict[str, Any]): Input data and context for generation
+        recipient (Optional[str]): Target recipient (e.g., "manager", "client", "team")
+        tone (str): Writing tone ("professional", "casual", "urgent", "analytical")
+        format_requirements (Optional[Dict[str, Any]]): Specific formatting needs
+        llm_url (Optional[str]): Chat completions endpoint, defaults to LLM_API_URL
+
+    Yields:
+        str: Generated text chunks
+    """
+    url = llm_url or LLM_API_URL
+    if url is None:
+        result = await asyncio.to_thread(
+            agent_tools.generate_text_output, content_type, context_data, recipient, tone, format_requirements
+        )
+        if result and result.get("generated_text"):
+            yield result["generated_text"]
+        return
+
+    messages = build_prompt(content_type, context_data, recipient, tone, format_requirements)
+    async for chunk in stream_chat_completion(messages, url):
+        yield chunk
+
+
+def finish_text_output(content_type: str, tone: str, chunks: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Assemble streamed chunks into the generate_text_output result format.
+
+    Returns:
+        Optional[Dict[str, Any]]: content_type, generated_text, word_count,
+        tone_applied and generation_timestamp; None if nothing was generated
+    """
+    text = "".join(chunks)
+    if not text:
+        return None
+    return {
+        "content_type": content_type,
+        "generated_text": text,
+        "word_count": len(text.split()),
+        "tone_applied": tone,
+        "generation_timestamp": datetime.now().isoformat(),
+    }
@@ -0,0 +1,495 @@
+"""
+Nexus Agent - Columnar Time-Series Store for Historical Financials
+One memory-mapped array per metric, indexed by symbol and reporting period
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Iterable, Iterator, Tuple
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import math
+import os
+import re
+import threading
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: writers are only serialized within one process
+    fcntl = None
+
+if TYPE_CHECKING:
+    import numpy as np
+
+STORE_DIR = os.getenv("FINANCIAL_STORE_DIR", os.path.join("data", "financials"))
+
+# Periods map to fixed column slots counted from BASE_YEAR, so a new period
+# is written into its preallocated slot and no existing file is rewritten
+BASE_YEAR = 1990
+PERIODS_PER_YEAR = {"quarterly": 4, "annual": 1}
+PERIOD_CAPACITY = {"quarterly": 256, "annual": 64}  # through 2053
+DATA_TYPE_FREQUENCY = {
+    "quarterly_financials": "quarterly",
+    "annual_financials": "annual",
+    "key_metrics": "quarterly",
+}
+
+_QUARTER_PATTERN = re.compile(r"^\s*Q([1-4])\s+(\d{4})\s*$", re.IGNORECASE)
+_YEAR_PATTERN = re.compile(r"^\s*(?:FY\s*)?(\d{4})\s*$", re.IGNORECASE)
+_METRIC_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
+_DTYPE = "<f8"  # numpy is imported on first use; see ColumnarStore
+
+
+def period_slot(period: str, frequency: str) -> int:
+    """
+    Column index of a reporting period.
+
+    Example:
+        >>> period_slot("Q3 2024", "quarterly")
+        138
+
+    Raises:
+        ValueError: If the period is not a quarter ("Q3 2024") or a year
+        ("2023", "FY 2023"), or falls outside the store's range
+    """
+    match = _QUARTER_PATTERN.match(period)
+    if match and frequency == "quarterly":
+        slot = (int(match.group(2)) - BASE_YEAR) * 4 + int(match.group(1)) - 1
+    else:
+        match = _YEAR_PATTERN.match(period)
+        if not match:
+            raise ValueError(f"Unrecognised {frequency} period: {period!r}")
+        slot = (int(match.group(1)) - BASE_YEAR) * PERIODS_PER_YEAR[frequency]
+        if frequency == "quarterly":
+            slot += 3  # a bare year means its fourth quarter
+    if not 0 <= slot < PERIOD_CAPACITY[frequency]:
+        raise ValueError(f"Period {period!r} is outside the store's range")
+    return slot
+
+
+def slot_period(slot: int, frequency: str) -> str:
+    """Inverse of period_slot"""
+    if frequency == "quarterly":
+        return f"Q{slot % 4 + 1} {BASE_YEAR + slot // 4}"
+    return str(BASE_YEAR + slot)
+
+
+class _View:
+    """
+    One consistent snapshot of a store: its symbols, metadata and memory maps.
+
+    symbols, index and meta never change once the view is published; maps
+    only gains entries. Writers build a new view and swap it in, so a reader
+    holding a view keeps row indices that match its maps.
+    """
+
+    __slots__ = ("symbols", "index", "meta", "maps", "version")
+
+    def __init__(
+        self,
+        symbols: List[str],
+        meta: Dict[str, Any],
+        version: Optional[Tuple[int, int, int]]
+    ):
+        self.symbols = symbols
+        self.index: Dict[str, int] = {symbol: i for i, symbol in enumerate(symbols)}
+        self.meta = meta
+        # Maps opened for this view, all of shape (len(symbols), capacity)
+        self.maps: Dict[str, "np.memmap"] = {}
+        self.version = version
+
+
+class ColumnarStore:
+    """
+    On-disk columnar store of numeric financial metrics for one data_type.
+
+    Layout under root/<data_type>/:
+        symbols.txt     one symbol per line; the line number is the row index
+        meta.json       metric names, latest period slot, last update time
+        <metric>.f64    float64 matrix of rows x PERIOD_CAPACITY, NaN if absent
+        .lock           flock()ed exclusively by a writer for the whole of an
+                        ingest, and shared by a reader while it loads
+
+    Reads go through read-only memory maps, so a range query is a slice of
+    the page cache with no parsing. Ingest is incremental: new symbols are
+    appended as rows at the end of each file, new periods are written into
+    their preallocated columns, and new metrics get a new file. Files only
+    ever grow, so a map another reader or process holds stays valid.
+
+    Every uvicorn worker has its own ColumnarStore over the same files.
+    Writers take an exclusive lock on .lock and reload symbols.txt and
+    meta.json under it, so row indices and metric files are never assigned
+    from one process's outdated view. Readers notice a newer meta.json
+    (rewritten by every ingest) and reload before answering. Within a
+    process, read() and lookup() run in worker threads without the writer
+    lock: each works from one _View, and ingest publishes a new _View
+    instead of changing the current one.
+
+    Example:
+        >>> store = ColumnarStore("quarterly_financials")
+        >>> store.ingest({"NVDA": {"Q3 2024": {"revenue": 35082000000}}})
+        >>> values, periods = store.read(["NVDA", "AMD"], "revenue", last=12)
+        >>> values.shape
+        (2, 12)
+    """
+
+    def __init__(self, data_type: str, root: str = STORE_DIR):
+        if data_type not in DATA_TYPE_FREQUENCY:
+            raise ValueError(f"No columnar layout for data_type {data_type!r}")
+        self.data_type = data_type
+        self.frequency = DATA_TYPE_FREQUENCY[data_type]
+        self.capacity = PERIOD_CAPACITY[self.frequency]
+        self.path = os.path.join(root, data_type)
+        self._lock = threading.Lock()
+        self._view = self._load_shared()
+
+    @property
+    def symbols(self) -> List[str]:
+        return self._view.symbols
+
+    @property
+    def index(self) -> Dict[str, int]:
+        return self._view.index
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        return self._view.meta
+
+    def _meta_version(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(os.path.join(self.path, "meta.json"))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> _View:
+        version = self._meta_version()
+        symbols: List[str] = []
+        meta: Dict[str, Any] = {"metrics": [], "latest_slot": -1, "updated": None}
+        symbols_path = os.path.join(self.path, "symbols.txt")
+        if os.path.exists(symbols_path):
+            with open(symbols_path) as f:
+                symbols = [line.strip() for line in f if line.strip()]
+        meta_path = os.path.join(self.path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        return _View(symbols, meta, version)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """flock() .lock, across worker processes"""
+        with open(os.path.join(self.path, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_shared(self) -> _View:
+        """Load under a shared lock, so an ingest in another process is never seen half done"""
+        if not os.path.isdir(self.path):
+            return self._load()
+        with self._file_lock(exclusive=False):
+            return self._load()
+
+    def refresh(self) -> None:
+        """Pick up periods and symbols ingested by another process"""
+        self._view = self._load_shared()
+
+    def _current(self) -> _View:
+        # Every ingest replaces meta.json, so a new inode or mtime means another writer
+        view = self._view
+        if self._meta_version() != view.version:
+            view = self._view = self._load_shared()
+        return view
+
+    @contextmanager
+    def _writer(self) -> Iterator[_View]:
+        """Exclusive write access across threads and worker processes, with a current view of the files"""
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            with self._file_lock(exclusive=True):
+                yield self._load()
+
+    @property
+    def metrics(self) -> List[str]:
+        return list(self.meta["metrics"])
+
+    @property
+    def latest_period(self) -> Optional[str]:
+        slot = self.meta["latest_slot"]
+        return slot_period(slot, self.frequency) if slot >= 0 else None
+
+    def _file(self, metric: str) -> str:
+        return os.path.join(self.path, f"{metric}.f64")
+
+    def _column(self, view: _View, metric: str) -> Optional["np.memmap"]:
+        """Read-only map of a metric's matrix, sized for the view's rows"""
+        import numpy as np
+
+        column = view.maps.get(metric)
+        if column is not None:
+            return column
+        if metric not in view.meta["metrics"] or not view.symbols:
+            return None
+        column = np.memmap(self._file(metric), dtype=_DTYPE, mode="r", shape=(len(view.symbols), self.capacity))
+        view.maps[metric] = column
+        return column
+
+    def _slots(self, view: _View, periods: Optional[List[str]], last: Optional[int], end: Optional[str]) -> List[int]:
+        if periods is not None:
+            return [period_slot(period, self.frequency) for period in periods]
+        stop = period_slot(end, self.frequency) if end else view.meta["latest_slot"]
+        count = last if last is not None else stop + 1
+        return list(range(max(stop - count + 1, 0), stop + 1))
+
+    def read(
+        self,
+        symbols: List[str],
+        metric: str,
+        periods: Optional[List[str]] = None,
+        last: Optional[int] = None,
+        end: Optional[str] = None
+    ) -> Tuple["np.ndarray", List[str]]:
+        """
+        Values of one metric for many symbols over a range of periods.
+
+        Args:
+            symbols (List[str]): Tickers, one output row each
+            metric (str): Metric name, e.g. "revenue"
+            periods (Optional[List[str]]): Explicit periods; otherwise a range
+            last (Optional[int]): Number of periods ending at end (default all)
+            end (Optional[str]): Last period of the range, defaults to the latest stored
+
+        Returns:
+            Tuple[np.ndarray, List[str]]: float64 array of len(symbols) x
+            periods, NaN where a value is missing, and the period labels
+        """
+        import numpy as np
+
+        view = self._current()
+        slots = self._slots(view, periods, last, end)
+        labels = [slot_period(slot, self.frequency) for slot in slots]
+        values = np.full((len(symbols), len(slots)), np.nan)
+        column = self._column(view, metric)
+        if column is None or not slots:
+            return values, labels
+
+        rows = [view.index.get(symbol.upper(), -1) for symbol in symbols]
+        known = [i for i, row in enumerate(rows) if row >= 0]
+        if known:
+            row_index = np.array([rows[i] for i in known])
+            if periods is None:
+                # Contiguous period range: one slice per row, no gather on columns
+                values[known] = column[row_index, slots[0]:slots[-1] + 1]
+            else:
+                values[known] = column[np.ix_(row_index, np.array(slots))]
+        return values, labels
+
+    def lookup(self, symbol: str, period: str, metrics: List[str]) -> Optional[Dict[str, float]]:
+        """Stored values for one symbol and period, or None unless every metric is present"""
+        view = self._current()
+        row = view.index.get(symbol.upper())
+        if row is None:
+            return None
+        try:
+            slot = period_slot(period, self.frequency)
+        except ValueError:
+            return None
+        found: Dict[str, float] = {}
+        for metric in metrics:
+            column = self._column(view, metric)
+            value = float(column[row, slot]) if column is not None else math.nan
+            if math.isnan(value):
+                return None
+            found[metric] = value
+        return found
+
+    def ingest(self, records: Dict[str, Dict[str, Dict[str, Any]]]) -> int:
+        """
+        Write values into the store, appending symbols and metrics as needed.
+
+        Non-numeric values (such as "currency") are skipped.
+
+        Args:
+            records (Dict[str, Dict[str, Dict[str, Any]]]): symbol -> period -> metric -> value
+
+        Returns:
+            int: Number of values written
+        """
+        cells: Dict[str, List[Tuple[str, int, float]]] = {}
+        for symbol, by_period in records.items():
+            for period, values in by_period.items():
+                slot = period_slot(period, self.frequency)
+                for metric, value in values.items():
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    if not _METRIC_PATTERN.match(metric):
+                        raise ValueError(f"Invalid metric name: {metric!r}")
+                    cells.setdefault(metric, []).append((symbol.upper(), slot, float(value)))
+        if not cells:
+            return 0
+
+        with self._writer() as view:
+            symbols = list(view.symbols)
+            known = set(symbols)
+            new_symbols = [
+                symbol for symbol in dict.fromkeys(s for metric_cells in cells.values() for s, _, _ in metric_cells)
+                if symbol not in known
+            ]
+            meta = {**view.meta, "metrics": list(view.meta["metrics"])}
+            if new_symbols:
+                self._append_rows(meta["metrics"], len(symbols), new_symbols)
+                symbols.extend(new_symbols)
+            for metric in cells:
+                if metric not in meta["metrics"]:
+                    self._create_metric(metric, len(symbols))
+                    meta["metrics"].append(metric)
+
+            import numpy as np
+
+            index = {symbol: i for i, symbol in enumerate(symbols)}
+            written = 0
+            for metric, metric_cells in cells.items():
+                column = np.memmap(self._file(metric), dtype=_DTYPE, mode="r+", shape=(len(symbols), self.capacity))
+                for symbol, slot, value in metric_cells:
+                    column[index[symbol], slot] = value
+                    written += 1
+                column.flush()
+                del column
+
+            latest = max(slot for metric_cells in cells.values() for _, slot, _ in metric_cells)
+            meta["latest_slot"] = max(meta["latest_slot"], latest)
+            meta["updated"] = datetime.now().isoformat()
+            self._write_meta(meta)
+            # Published in one assignment; readers holding the old view are unaffected
+            self._view = _View(symbols, meta, self._meta_version())
+        return written
+
+    def _append_rows(self, metrics: List[str], rows: int, symbols: List[str]) -> None:
+        import numpy as np
+
+        blank = np.full(self.capacity * len(symbols), np.nan, dtype=_DTYPE).tobytes()
+        # Written at the end of the rows symbols.txt accounts for, so rows left
+        # behind by an ingest that died before recording its symbols are reused.
+        # Files are never truncated: other readers may have them mapped.
+        offset = rows * self.capacity * np.dtype(_DTYPE).itemsize
+        for metric in metrics:
+            with open(self._file(metric), "r+b") as f:
+                f.seek(offset)
+                f.write(blank)
+        with open(os.path.join(self.path, "symbols.txt"), "a") as f:
+            f.writelines(symbol + "\n" for symbol in symbols)
+
+    def _create_metric(self, metric: str, rows: int) -> None:
+        import numpy as np
+
+        path = self._file(metric)
+        # A file left by an ingest that died before recording the metric is
+        # overwritten in place rather than truncated
+        with open(path, "r+b" if os.path.exists(path) else "wb") as f:
+            f.write(np.full(self.capacity * rows, np.nan, dtype=_DTYPE).tobytes())
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def ingest_result(self, result: Optional[Dict[str, Any]]) -> int:
+        """Ingest one get_financial_data result; results without a period are ignored"""
+        if not result or not result.get("period") or not result.get("data"):
+            return 0
+        try:
+            return self.ingest({result["symbol"]: {result["period"]: result["data"]}})
+        except ValueError:
+            return 0
+
+
+class FinancialStore:
+    """
+    The columnar stores for every period-indexed data_type.
+
+    Example:
+        >>> financial_store.get_financial_history(["NVDA", "AMD"], "revenue", last=12)
+        {"data_type": "quarterly_financials", "metric": "revenue", "periods": ["Q4 2021", ...],
+         "data": {"NVDA": [...], "AMD": [...]}, "source": "local_timeseries_store"}
+    """
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        self._stores: Dict[str, ColumnarStore] = {}
+        self._lock = threading.Lock()
+
+    def store(self, data_type: str) -> ColumnarStore:
+        store = self._stores.get(data_type)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(data_type)
+                if store is None:
+                    store = self._stores[data_type] = ColumnarStore(data_type, self.root)
+        return store
+
+    def lookup(
+        self,
+        symbol: str,
+        data_type: str,
+        period: Optional[str],
+        metrics: Optional[List[str]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Answer a get_financial_data request from disk.
+
+        Only requests naming both a period and explicit metrics can be
+        answered, since the store cannot tell whether a full metric set is
+        complete. Returns None if anything is missing.
+        """
+        if data_type not in DATA_TYPE_FREQUENCY or not period or not metrics:
+            return None
+        store = self.store(data_type)
+        values = store.lookup(symbol, period, metrics)
+        if values is None:
+            return None
+        return {
+            "symbol": symbol.upper(),
+            "data_type": data_type,
+            "period": period,
+            "data": values,
+            "last_updated": store.meta["updated"],
+            "source": "local_timeseries_store",
+        }
+
+    def ingest_results(self, results: Iterable[Optional[Dict[str, Any]]]) -> int:
+        written = 0
+        for result in results:
+            if result and result.get("data_type") in DATA_TYPE_FREQUENCY:
+                written += self.store(result["data_type"]).ingest_result(result)
+        return written
+
+    def get_financial_history(
+        self,
+        symbols: List[str],
+        metric: str,
+        data_type: str = "quarterly_financials",
+        last: int = 12,
+        end: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Tool implementation of agent_tools.get_financial_history"""
+        store = self.store(data_type)
+        values, periods = store.read(symbols, metric, last=last, end=end)
+        return {
+            "data_type": data_type,
+            "metric": metric,
+            "periods": periods,
+            "data": {
+                symbol.upper(): [None if math.isnan(v) else v for v in row.tolist()]
+                for symbol, row in zip(symbols, values)
+            },
+            "last_updated": store.meta["updated"],
+            "source": "local_timeseries_store",
+        }
+
+
+financial_store = FinancialStore()
@@ -0,0 +1,314 @@
+"""
+Nexus Agent - ReAct Trace Compaction
+Keeps recent steps verbatim and older steps as structured digests for LLM prompts
+"""
+
+from typing import Dict, List, Optional, Any
+from datetime import datetime
+import hashlib
+import re
+import sys
+import time
+
+from sse import dumps
+
+# Steps kept verbatim at the end of the trace
+RECENT_STEPS = 3
+
+# Results whose JSON encoding is larger than this are stored out of line
+INLINE_LIMIT_BYTES = 2048
+
+DIGEST_SUMMARY_CHARS = 160
+MAX_DIGEST_FIELDS = 16
+
+# Parameter strings up to this length (tickers, periods, enum values) are interned
+INTERN_MAX_CHARS = 32
+
+# Money amounts, percentages and scores quoted in free-text observations
+_FIGURE_PATTERN = re.compile(r"\$\d[\d,]*(?:\.\d+)?[KMBT]?\b|\b\d[\d,]*(?:\.\d+)?(?:%|/100|[KMBT]\b)")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English and JSON)"""
+    return max(1, len(text) // 4)
+
+
+def _first_sentence(text: str) -> str:
+    sentence = _SENTENCE_END.split(text.strip(), 1)[0]
+    if len(sentence) > DIGEST_SUMMARY_CHARS:
+        sentence = sentence[:DIGEST_SUMMARY_CHARS - 3].rstrip() + "..."
+    return sentence
+
+
+def numeric_fields(value: Any, prefix: str = "", limit: int = MAX_DIGEST_FIELDS) -> Dict[str, float]:
+    """Numeric leaves of a nested result, keyed by dotted path, at most limit of them"""
+    fields: Dict[str, float] = {}
+
+    def walk(node: Any, path: str, depth: int) -> None:
+        if len(fields) >= limit or depth > 3:
+            return
+        if isinstance(node, bool):
+            return
+        if isinstance(node, (int, float)):
+            fields[path] = node
+        elif isinstance(node, dict):
+            for key, item in node.items():
+                walk(item, f"{path}.{key}" if path else str(key), depth + 1)
+        elif isinstance(node, (list, tuple)):
+            for index, item in enumerate(node):
+                walk(item, f"{path}.{index}" if path else str(index), depth + 1)
+
+    walk(value, prefix, 0)
+    return fields
+
+
+def digest_result(tool: str, result: Any, observation: str) -> Dict[str, Any]:
+    """
+    Compact summary of a step's outcome.
+
+    Financial data keeps the symbol, period and numeric metrics, risk analysis
+    keeps its scores, and text generation keeps its size. Steps without a
+    structured result keep the first sentence of the observation and the
+    figures quoted in it.
+
+    Example:
+        >>> digest_result("get_financial_data", {"symbol": "NVDA", "period": "Q3 2024",
+        ...     "data": {"revenue": 35082000000, "revenue_growth": 0.94, "currency": "USD"}}, "...")
+        {"symbol": "NVDA", "period": "Q3 2024", "data": {"revenue": 35082000000, "revenue_growth": 0.94}}
+    """
+    if isinstance(result, dict):
+        if tool == "get_financial_data":
+            return {
+                "symbol": result.get("symbol"),
+                "period": result.get("period"),
+                "data": numeric_fields(result.get("data", {})),
+            }
+        if tool == "get_financial_data_many":
+            per_symbol = max(1, MAX_DIGEST_FIELDS // max(len(result), 1))
+            return {
+                symbol: numeric_fields(item.get("data", {}) if isinstance(item, dict) else item, limit=per_symbol)
+                for symbol, item in result.items()
+            }
+        if tool == "analyze_investment_risks":
+            return {
+                "risk_scores": result.get("risk_scores"),
+                "risk_comparison": numeric_fields(result.get("risk_comparison", {})),
+            }
+        if tool == "generate_text_output":
+            return {"content_type": result.get("content_type"), "word_count": result.get("word_count")}
+        fields = numeric_fields(result)
+        if fields:
+            return {"fields": fields}
+
+    return {
+        "summary": _first_sentence(observation),
+        "figures": list(dict.fromkeys(m.group(0) for m in _FIGURE_PATTERN.finditer(observation)))[:MAX_DIGEST_FIELDS],
+    }
+
+
+def intern_parameters(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of an action's parameters with short strings interned.
+
+    Every session asking about NVDA for Q3 2024 then shares one "NVDA" and
+    one "Q3 2024" object. Nested values (such as context_data) are kept by
+    reference.
+    """
+    interned: Dict[str, Any] = {}
+    for key, value in parameters.items():
+        if isinstance(value, str) and len(value) <= INTERN_MAX_CHARS:
+            value = sys.intern(value)
+        elif isinstance(value, list) and all(isinstance(item, str) and len(item) <= INTERN_MAX_CHARS for item in value):
+            value = [sys.intern(item) for item in value]
+        interned[sys.intern(key)] = value
+    return interned
+
+
+class StepRecord:
+    """
+    One finished ReAct step, as held for the lifetime of a session.
+
+    Slotted, with the tool name and short parameter strings interned and
+    times kept as time.monotonic_ns() integers; TraceManager.timestamp()
+    converts them to datetimes. observation is the full text (or "" for a
+    failed or skipped step, which has error set instead); handle names the out-of-line
+    copy of a large result. digest is None when it is rebuilt from the
+    observation on demand.
+    """
+
+    __slots__ = ("step", "thought", "tool", "parameters", "status", "observation", "error",
+                 "handle", "digest", "started_ns", "finished_ns")
+
+    def __init__(
+        self,
+        step: int,
+        thought: str,
+        tool: str,
+        parameters: Dict[str, Any],
+        observation: str,
+        error: Optional[str],
+        handle: Optional[str],
+        digest: Optional[Dict[str, Any]],
+        started_ns: int,
+        finished_ns: int,
+        status: Optional[str] = None
+    ):
+        self.step = step
+        self.thought = thought
+        self.tool = sys.intern(tool)
+        self.parameters = intern_parameters(parameters)
+        self.status = status or ("error" if error is not None else "completed")
+        self.observation = observation
+        self.error = error
+        self.handle = handle
+        self.digest = digest
+        self.started_ns = started_ns
+        self.finished_ns = finished_ns
+
+    @property
+    def action(self) -> Dict[str, Any]:
+        return {"tool": self.tool, "parameters": self.parameters}
+
+    @property
+    def inline_observation(self) -> str:
+        """The observation as shown in prompts; large ones are replaced by their handle"""
+        if self.handle is None:
+            return self.observation
+        return f"[{len(self.observation)} bytes stored as {self.handle}]"
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.finished_ns - self.started_ns) / 1e6
+
+
+class TraceManager:
+    """
+    Step history of one ReAct run, rendered compactly for LLM prompts.
+
+    The last recent_steps steps are rendered verbatim (thought, action and
+    observation). Older steps are reduced to their tool, parameters and a
+    digest of the result (see digest_result), so the prompt grows by a small,
+    roughly constant amount per step instead of by whole observations.
+    Results larger than inline_limit bytes are never inlined: they are kept
+    out of line and referenced by handle, and can be fetched with resolve().
+
+    Steps are kept as StepRecord objects; API models are built from them only
+    when a response is returned (see main.execute_agent_workflow).
+
+    Example:
+        >>> trace = TraceManager()
+        >>> trace.record(step, result, observation)
+        >>> messages = build_prompt(..., {"trace": trace.render()})
+    """
+
+    def __init__(self, recent_steps: int = RECENT_STEPS, inline_limit: int = INLINE_LIMIT_BYTES):
+        self.recent_steps = recent_steps
+        self.inline_limit = inline_limit
+        self.entries: List[StepRecord] = []
+        self.artifacts: Dict[str, Any] = {}
+        # Anchors for turning monotonic step times into wall-clock timestamps
+        self.origin_ns = time.monotonic_ns()
+        self.origin_wall_ns = time.time_ns()
+
+    def record(
+        self,
+        step: Dict[str, Any],
+        result: Any,
+        observation: str,
+        error: Optional[str] = None,
+        started_ns: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> StepRecord:
+        """Add a finished (or skipped) step, in completion order"""
+        action = step.get("action", {})
+        finished_ns = time.monotonic_ns()
+        handle = digest = None
+        if error is None:
+            handle = self._store(step, result, observation)
+            # A digest of free text can be rebuilt from the observation when rendered
+            if isinstance(result, dict):
+                digest = digest_result(action.get("tool"), result, observation)
+        else:
+            observation = ""
+        entry = StepRecord(
+            step=step.get("step"),
+            thought=step.get("thought", ""),
+            tool=action.get("tool", ""),
+            parameters=action.get("parameters", {}),
+            observation=observation,
+            error=error,
+            handle=handle,
+            digest=digest,
+            started_ns=started_ns if started_ns is not None else finished_ns,
+            finished_ns=finished_ns,
+            status=status
+        )
+        self.entries.append(entry)
+        return entry
+
+    def _store(self, step: Dict[str, Any], result: Any, observation: str) -> Optional[str]:
+        """Keep a large result out of line and return its handle"""
+        if len(observation) <= self.inline_limit:
+            return None
+        handle = f"artifact:{step.get('step')}:{hashlib.sha1(observation.encode()).hexdigest()[:12]}"
+        self.artifacts[handle] = result if result is not None else observation
+        return handle
+
+    def timestamp(self, ns: int) -> datetime:
+        """Wall-clock time of a monotonic_ns() reading taken during this run"""
+        return datetime.fromtimestamp((self.origin_wall_ns + ns - self.origin_ns) / 1e9)
+
+    def _digest(self, entry: StepRecord) -> Dict[str, Any]:
+        if entry.digest is not None:
+            return entry.digest
+        return digest_result(entry.tool, None, entry.observation)
+
+    def by_step(self) -> List[StepRecord]:
+        """Finished steps in step-number order"""
+        return sorted(self.entries, key=lambda entry: entry.step)
+
+    def resolve(self, handle: str) -> Any:
+        """Full result behind a handle"""
+        return self.artifacts[handle]
+
+    def render(self) -> List[Dict[str, Any]]:
+        """The trace as prompt-ready entries, oldest first"""
+        cutoff = len(self.entries) - self.recent_steps
+        rendered = []
+        for index, entry in enumerate(self.entries):
+            if entry.error is not None:
+                rendered.append({"step": entry.step, "tool": entry.tool, "error": entry.error})
+            elif index >= cutoff:
+                item = {"step": entry.step, "thought": entry.thought, "tool": entry.tool,
+                        "parameters": entry.parameters, "observation": entry.inline_observation}
+                if entry.handle:
+                    item["digest"] = self._digest(entry)
+                    item["handle"] = entry.handle
+                rendered.append(item)
+            else:
+                item = {"step": entry.step, "tool": entry.tool, "parameters": entry.parameters, "digest": self._digest(entry)}
+                if entry.handle:
+                    item["handle"] = entry.handle
+                rendered.append(item)
+        return rendered
+
+    def render_verbatim(self) -> List[Dict[str, Any]]:
+        """The uncompacted trace, for comparison"""
+        return [
+            {
+                "step": entry.step,
+                "thought": entry.thought,
+                "tool": entry.tool,
+                "parameters": entry.parameters,
+                "observation": self.artifacts.get(entry.handle, entry.error if entry.error is not None else entry.observation),
+            }
+            for entry in self.entries
+        ]
+
+    def prompt_tokens(self) -> Dict[str, int]:
+        """Estimated tokens of the compacted and verbatim renderings"""
+        return {
+            "compacted": estimate_tokens(dumps(self.render()).decode()),
+            "verbatim": estimate_tokens(dumps(self.render_verbatim()).decode()),
+        }
@@ -0,0 +1,369 @@
+"""
+Nexus Agent - Shared Agent Work Queue
+Distributes agent runs across uvicorn workers and nodes
+"""
+
+from typing import Dict, Optional, Any, Awaitable, Callable, List
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from lazy_imports import LazyClient, module_available
+from scheduler import ANONYMOUS_USER
+from sse import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_KEY = "nexus:agent:jobs"
+
+# How long an idle consumer blocks on the queue before checking again
+TAKE_TIMEOUT_SECONDS = 5.0
+
+# A taken job not acknowledged (or its lease extended) within this many
+# seconds is assumed lost with its worker and handed out again
+LEASE_SECONDS = 60.0
+
+# Deliveries of one job before it is dropped as poison
+MAX_DELIVERIES = 3
+
+# A user's count of outstanding jobs expires this long after their last
+# submission, so counts leaked by a lost process cannot lock them out
+ACTIVE_TTL_SECONDS = 3600
+
+Job = Dict[str, Any]
+
+
+class WorkQueue:
+    """
+    Base class for agent run queues.
+
+    A job is a JSON-serialisable dict naming its "user_id"; users' jobs are
+    taken round-robin, each user's in submission order. A taken job is
+    leased to its consumer until ack(); queues shared between processes
+    hand out jobs whose lease ran out again (see requeue_expired()), so a
+    job is delivered at least once.
+    """
+
+    async def submit(self, job: Job, user_limit: Optional[int] = None) -> bool:
+        """
+        Queue a job.
+
+        Returns False, without queueing it, if the job's user already has
+        user_limit jobs queued or running (taken and not yet acknowledged).
+        """
+        raise NotImplementedError
+
+    async def take(self, timeout: float) -> Optional[Job]:
+        """Next job, or None if none arrived within timeout"""
+        raise NotImplementedError
+
+    async def ack(self, job: Job) -> None:
+        """Mark a taken job as finished, whatever its outcome"""
+
+    async def extend(self, job: Job) -> None:
+        """Renew the lease on a job that is still running"""
+
+    async def requeue_expired(self) -> int:
+        """Hand out again jobs whose lease ran out; returns how many"""
+        return 0
+
+    async def depth(self) -> int:
+        raise NotImplementedError
+
+
+class InMemoryWorkQueue(WorkQueue):
+    """Process-local queue, for a single worker; jobs die with the process"""
+
+    def __init__(self):
+        self._users: Dict[str, "asyncio.Queue[Job]"] = {}
+        self._ready = asyncio.Semaphore(0)
+        self._active: Dict[str, int] = {}
+
+    async def submit(self, job: Job, user_limit: Optional[int] = None) -> bool:
+        user_id = job.get("user_id") or ANONYMOUS_USER
+        if user_limit is not None and self._active.get(user_id, 0) >= user_limit:
+            return False
+        self._active[user_id] = self._active.get(user_id, 0) + 1
+        self._users.setdefault(user_id, asyncio.Queue()).put_nowait(job)
+        self._ready.release()
+        return True
+
+    async def take(self, timeout: float) -> Optional[Job]:
+        try:
+            await asyncio.wait_for(self._ready.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        # Serve the user at the head of the rotation, then move them to the back
+        user_id = next(iter(self._users))
+        jobs = self._users.pop(user_id)
+        job = jobs.get_nowait()
+        if not jobs.empty():
+            self._users[user_id] = jobs
+        return job
+
+    async def ack(self, job: Job) -> None:
+        user_id = job.get("user_id") or ANONYMOUS_USER
+        remaining = self._active.pop(user_id, 0) - 1
+        if remaining > 0:
+            self._active[user_id] = remaining
+
+    async def depth(self) -> int:
+        return sum(jobs.qsize() for jobs in self._users.values())
+
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Work queue shared by every worker, kept in Redis.
+
+    Keys under the queue's prefix:
+        {key}:user:<user_id>   list of the user's waiting jobs
+        {key}:users            set of users with waiting jobs
+        {key}:ring             the same users in round-robin order
+        {key}:ready            one token per waiting job; BLPOP blocks on it
+        {key}:processing       list of taken, unacknowledged jobs
+        {key}:leases           sorted set of processing jobs by lease expiry
+        {key}:active:<user_id> count of the user's queued and processing jobs
+
+    take() waits for a token, rotates the ring (LMOVE) to pick the next
+    user and moves that user's oldest job to the processing list (LMOVE),
+    so no job is ever held only in a consumer's memory. ack() removes it.
+    requeue_expired() puts processing jobs whose lease ran out back at the
+    front of their user's list, up to MAX_DELIVERIES times. The active
+    count is what submit() checks a user_limit against, so the limit holds
+    across every worker; it drops when a job is acknowledged or dropped.
+    """
+
+    def __init__(self, client: Any, key: str = JOB_QUEUE_KEY, lease_seconds: float = LEASE_SECONDS):
+        self.redis = client
+        self.key = key
+        self.lease_seconds = lease_seconds
+        self.users_key = f"{key}:users"
+        self.ring_key = f"{key}:ring"
+        self.ready_key = f"{key}:ready"
+        self.processing_key = f"{key}:processing"
+        self.leases_key = f"{key}:leases"
+        # Raw payloads of the jobs this process holds, by job_id, for ack()
+        self._taken: Dict[str, bytes] = {}
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.key}:user:{user_id}"
+
+    def _active_key(self, user_id: str) -> str:
+        return f"{self.key}:active:{user_id}"
+
+    async def _finished(self, user_id: str) -> None:
+        """Count one of the user's jobs as gone from the queue"""
+        active_key = self._active_key(user_id)
+        # A submission racing the DELETE goes uncounted, which errs towards admitting
+        if await self.redis.decr(active_key) <= 0:
+            await self.redis.delete(active_key)
+
+    async def _activate(self, user_id: str) -> None:
+        """Put a user with waiting jobs into the rotation, once"""
+        if await self.redis.sadd(self.users_key, user_id):
+            await self.redis.rpush(self.ring_key, user_id)
+
+    async def _retire(self, user_id: str) -> None:
+        """Take a user whose list is empty out of the rotation"""
+        await self.redis.lrem(self.ring_key, 0, user_id)
+        await self.redis.srem(self.users_key, user_id)
+        # A job submitted meanwhile may have found the user still active
+        if await self.redis.llen(self._user_key(user_id)):
+            await self._activate(user_id)
+
+    async def submit(self, job: Job, user_limit: Optional[int] = None) -> bool:
+        job = {**job, "job_id": job.get("job_id") or uuid.uuid4().hex}
+        user_id = job.get("user_id") or ANONYMOUS_USER
+        # Count first, so concurrent submissions on different workers cannot all pass
+        active_key = self._active_key(user_id)
+        active = await self.redis.incr(active_key)
+        await self.redis.expire(active_key, ACTIVE_TTL_SECONDS)
+        if user_limit is not None and active > user_limit:
+            await self._finished(user_id)
+            return False
+        await self.redis.rpush(self._user_key(user_id), dumps(job))
+        await self._activate(user_id)
+        # Signal last, so a token never precedes its job
+        await self.redis.rpush(self.ready_key, b"1")
+        return True
+
+    async def take(self, timeout: float) -> Optional[Job]:
+        token = await self.redis.blpop([self.ready_key], timeout=max(1, int(timeout)))
+        if not token:
+            return None
+        for _ in range(max(1, await self.redis.llen(self.ring_key))):
+            user_id = await self.redis.lmove(self.ring_key, self.ring_key, "LEFT", "RIGHT")
+            if user_id is None:
+                break
+            user_id = _decode(user_id)
+            payload = await self.redis.lmove(self._user_key(user_id), self.processing_key, "LEFT", "RIGHT")
+            if payload is None:
+                await self._retire(user_id)
+                continue
+            await self.redis.zadd(self.leases_key, {payload: time.time() + self.lease_seconds})
+            if not await self.redis.llen(self._user_key(user_id)):
+                await self._retire(user_id)
+            job = loads(payload)
+            self._taken[job["job_id"]] = payload
+            return job
+        # The token's job is mid-way through a rotation change; leave it for the next take
+        await self.redis.rpush(self.ready_key, b"1")
+        return None
+
+    async def ack(self, job: Job) -> None:
+        payload = self._taken.pop(job["job_id"], None)
+        if payload is None:
+            return
+        removed = await self.redis.lrem(self.processing_key, 1, payload)
+        await self.redis.zrem(self.leases_key, payload)
+        # Not removed: the lease ran out and the job was requeued, so it is still outstanding
+        if removed:
+            await self._finished(job.get("user_id") or ANONYMOUS_USER)
+
+    async def extend(self, job: Job) -> None:
+        payload = self._taken.get(job["job_id"])
+        if payload is not None:
+            await self.redis.zadd(self.leases_key, {payload: time.time() + self.lease_seconds}, xx=True)
+
+    async def requeue_expired(self) -> int:
+        now = time.time()
+        requeued = 0
+        for payload in await self.redis.lrange(self.processing_key, 0, -1):
+            # A job moved to processing by a consumer that has not yet leased
+            # it gets a full lease from now rather than being taken as lost
+            await self.redis.zadd(self.leases_key, {payload: now + self.lease_seconds}, nx=True)
+            expiry = await self.redis.zscore(self.leases_key, payload)
+            if expiry is None or expiry > now:
+                continue
+            # Only the worker whose LREM removes the job requeues it
+            if not await self.redis.lrem(self.processing_key, 1, payload):
+                continue
+            await self.redis.zrem(self.leases_key, payload)
+            job = loads(payload)
+            user_id = job.get("user_id") or ANONYMOUS_USER
+            job["deliveries"] = job.get("deliveries", 1) + 1
+            if job["deliveries"] > MAX_DELIVERIES:
+                logger.error("Dropping job %s after %d deliveries", job.get("job_id"), MAX_DELIVERIES)
+                await self._finished(user_id)
+                continue
+            await self.redis.lpush(self._user_key(user_id), dumps(job))
+            await self._activate(user_id)
+            await self.redis.rpush(self.ready_key, b"1")
+            requeued += 1
+        return requeued
+
+    async def depth(self) -> int:
+        return await self.redis.llen(self.ready_key)
+
+
+def _decode(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class AgentWorkerPool:
+    """
+    Runs jobs from a WorkQueue with at most concurrency in flight.
+
+    Each worker process starts one pool; together they drain the shared
+    queue, so a run submitted on one worker may execute on any other. A job
+    is acknowledged once its handler returns or raises; while it runs, a
+    maintenance task renews its lease and requeues jobs of dead workers.
+
+    Example:
+        >>> pool = AgentWorkerPool(work_queue, run_queued_session, concurrency=32)
+        >>> await pool.start()
+    """
+
+    def __init__(self, queue: WorkQueue, handler: Callable[[Job], Awaitable[None]], concurrency: int):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self._consumers: List["asyncio.Task[None]"] = []
+        self._running: Dict[int, Job] = {}
+        self.stats: Dict[str, int] = {"running": 0, "completed": 0, "failed": 0, "requeued": 0, "queue_errors": 0}
+
+    async def start(self) -> None:
+        if not self._consumers:
+            self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+            self._consumers.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self) -> None:
+        # Jobs cut off here are not acknowledged; their leases run out and
+        # another worker picks them up
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+
+    async def _consume(self) -> None:
+        while True:
+            try:
+                job = await self.queue.take(TAKE_TIMEOUT_SECONDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Queue backend unavailable; back off rather than spin
+                self.stats["queue_errors"] += 1
+                await asyncio.sleep(1.0)
+                continue
+            if job is None:
+                continue
+
+            self.stats["running"] += 1
+            self._running[id(job)] = job
+            try:
+                await self.handler(job)
+                self.stats["completed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats["failed"] += 1
+            finally:
+                self.stats["running"] -= 1
+                self._running.pop(id(job), None)
+            # A run that failed has recorded its error; delivering it again would not help
+            await self._ack(job)
+
+    async def _ack(self, job: Job) -> None:
+        try:
+            await self.queue.ack(job)
+        except Exception:
+            # Unacknowledged: the job is handed out again when its lease runs out
+            self.stats["queue_errors"] += 1
+
+    async def _maintain(self) -> None:
+        """Keep running jobs leased and hand out jobs whose workers died"""
+        interval = getattr(self.queue, "lease_seconds", LEASE_SECONDS) / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                for job in list(self._running.values()):
+                    await self.queue.extend(job)
+                self.stats["requeued"] += await self.queue.requeue_expired()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats["queue_errors"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "concurrency": self.concurrency}
+
+
+def create_work_queue() -> Optional[WorkQueue]:
+    """
+    Shared queue for multi-worker mode, enabled with AGENT_WORK_QUEUE=redis.
+
+    Returns None (runs execute on the worker that received them) unless
+    REDIS_URL is also set and redis is installed.
+    """
+    if os.getenv("AGENT_WORK_QUEUE", "").lower() != "redis":
+        return None
+    url = os.getenv("REDIS_URL")
+    if not url or not module_available("redis"):
+        return None
+    return RedisWorkQueue(LazyClient("redis.asyncio", lambda redis: redis.Redis.from_url(url)))
+
+
+work_queue = create_work_queue()